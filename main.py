@@ -4,7 +4,10 @@ Punto de entrada principal de Sayen.
 """
 import sys
 from src.ui.gui import main as gui_main
+from src.core.profiling import profiled, profile_requested
 
 
 if __name__ == "__main__":
-    gui_main()
\ No newline at end of file
+    # --profile perfila la interfaz y los scripts que se lancen desde ella
+    with profiled("gui", enabled=profile_requested()):
+        gui_main()
@@ -22,6 +22,7 @@ class Settings:
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     DATA_DIR: Path = BASE_DIR / "data"
     LOG_DIR: Path = BASE_DIR / "logs"
+    CACHE_DIR: Path = DATA_DIR / "cache"
     
     # Rayen credentials
     RAYEN_LOCATION: str = os.getenv("RAYEN_LOCATION", "")
@@ -31,15 +32,49 @@ class Settings:
     # Selenium
     HEADLESS: bool = os.getenv("HEADLESS", "false").lower() in {"1", "true", "yes"}
     SELENIUM_TIMEOUT: int = 20
+    PATIENT_PAUSE: int = int(os.getenv("PATIENT_PAUSE", "5"))
+    VALIDATE_RUN: bool = os.getenv("VALIDATE_RUN", "true").lower() in {"1", "true", "yes"}
+    BROWSER_METRICS: bool = os.getenv("BROWSER_METRICS", "false").lower() in {"1", "true", "yes"}
+    RECORD_SESSION: str = os.getenv("RECORD_SESSION", "")
+    REPLAY_SESSION: str = os.getenv("REPLAY_SESSION", "")
+    
+    # Ejecución paralela
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    HEDGING: bool = os.getenv("HEDGING", "false").lower() in {"1", "true", "yes"}
+    
+    # Caché de días extraídos
+    DAY_CACHE: bool = os.getenv("DAY_CACHE", "true").lower() in {"1", "true", "yes"}
+    DAY_CACHE_RECENT_DAYS: int = int(os.getenv("DAY_CACHE_RECENT_DAYS", "7"))
+    DAY_CACHE_TTL_DAYS: int = int(os.getenv("DAY_CACHE_TTL_DAYS", "90"))
+    FORCE_REFRESH: bool = os.getenv("FORCE_REFRESH", "false").lower() in {"1", "true", "yes"}
+    
+    # Registro local de pacientes (sexo y edad por RUN)
+    PATIENT_REGISTRY: bool = os.getenv("PATIENT_REGISTRY", "true").lower() in {"1", "true", "yes"}
+    PATIENT_REGISTRY_TTL_DAYS: int = int(os.getenv("PATIENT_REGISTRY_TTL_DAYS", "180"))
+    
+    # Textos de anamnesis por RUN y fecha
+    ANAMNESIS_CACHE: bool = os.getenv("ANAMNESIS_CACHE", "true").lower() in {"1", "true", "yes"}
+    ANAMNESIS_CACHE_TTL_DAYS: int = int(os.getenv("ANAMNESIS_CACHE_TTL_DAYS", "90"))
+    
+    # Planificación de fechas
+    SKIP_HOLIDAYS: bool = os.getenv("SKIP_HOLIDAYS", "true").lower() in {"1", "true", "yes"}
+    EXTRA_HOLIDAYS: str = os.getenv("EXTRA_HOLIDAYS", "")
+    EMPTY_DAYS_TTL_DAYS: int = int(os.getenv("EMPTY_DAYS_TTL_DAYS", "30"))
     
     # URLs
-    BASE_URL: str = "https://clinico.rayenaps.cl/"
+    BASE_URL: str = os.getenv("RAYEN_BASE_URL", "https://clinico.rayenaps.cl/")
     
     # Excel
     DEFAULT_SHEET_NAME: str = "Sheet1"
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON: bool = os.getenv("LOG_JSON", "false").lower() in {"1", "true", "yes"}
+    TRACE: bool = os.getenv("TRACE", "false").lower() in {"1", "true", "yes"}
+    NETWORK_LOG: bool = os.getenv("NETWORK_LOG", "false").lower() in {"1", "true", "yes"}
+    METRICS: bool = os.getenv("METRICS", "false").lower() in {"1", "true", "yes"}
+    METRICS_INTERVAL: int = int(os.getenv("METRICS_INTERVAL", "15"))
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
     def __post_init__(self):
@@ -58,8 +93,19 @@ class Settings:
     
     def update_env_file(self, data: dict) -> None:
         """Actualiza el archivo .env con nuevos valores."""
+        # Conserva las variables existentes que no se están actualizando
+        merged = {}
+        if self.env_file_path.exists():
+            with open(self.env_file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#") and "=" in line:
+                        key, value = line.split("=", 1)
+                        merged[key.strip()] = value.strip().strip('"')
+        merged.update(data)
+        
         lines = []
-        for key, value in data.items():
+        for key, value in merged.items():
             # Escapa valores con espacios o caracteres especiales
             if isinstance(value, str) and any(c in value for c in [" ", "#", "=", "\t"]):
                 value = f'"{value}"'
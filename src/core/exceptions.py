@@ -25,4 +25,13 @@ class DataValidationError(SayenException):
 
 class ExcelProcessingError(SayenException):
     """Error procesando archivos Excel."""
-    pass
\ No newline at end of file
+    pass
+
+
+class OperationCancelled(SayenException):
+    """La operación fue cancelada porque otra sesión ya la completó."""
+    pass
+
+class ReplayError(ScrapingError):
+    """La sesión reproducida no contiene el comando solicitado."""
+    pass
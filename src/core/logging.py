@@ -1,13 +1,24 @@
 """
 Sistema de logging centralizado.
 """
-import logging
+import os
 import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
 from src.config.settings import settings
+from src.core.timing import stage_timer
+
+
+# Identificador de la ejecución, compartido por todos los registros del proceso
+RUN_ID = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
 
 
 class ColoredFormatter(logging.Formatter):
@@ -23,9 +34,53 @@ class ColoredFormatter(logging.Formatter):
     RESET = '\033[0m'
     
     def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.RESET)
-        record.levelname = f"{log_color}{record.levelname}{self.RESET}"
-        return super().format(record)
+        # El registro es compartido con los demás handlers: se restaura el nivel
+        levelname = record.levelname
+        log_color = self.COLORS.get(levelname, self.RESET)
+        record.levelname = f"{log_color}{levelname}{self.RESET}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formatter de un objeto JSON por línea con ejecución, hilo y etapa."""
+    
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run": getattr(record, "run", RUN_ID),
+            "worker": record.threadName,
+            "step": getattr(record, "step", ""),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class ContextFilter(logging.Filter):
+    """Agrega la ejecución y la etapa en curso del hilo que registra."""
+    
+    def filter(self, record):
+        record.run = RUN_ID
+        record.step = stage_timer.current_stage()
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo que registra.
+    
+    El formateo (mensaje, colores, JSON) ocurre en el hilo del QueueListener;
+    los argumentos viajan tal cual, por lo que no deben mutarse después de registrar.
+    """
+    
+    def prepare(self, record):
+        return copy.copy(record)
 
 
 class LoggerManager:
@@ -45,20 +100,41 @@ class LoggerManager:
             self.setup_root_logger()
     
     def setup_root_logger(self):
-        """Configura el logger raíz."""
+        """
+        Configura el logger raíz.
+        
+        Los registros pasan por una cola y un QueueListener los escribe en
+        consola, archivo y (si LOG_JSON) archivo JSON-lines desde su propio hilo.
+        """
         root_logger = logging.getLogger()
         root_logger.setLevel(settings.LOG_LEVEL)
         
         # Handler para consola con colores
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(ColoredFormatter(settings.LOG_FORMAT))
-        root_logger.addHandler(console_handler)
         
         # Handler para archivo
         log_file = settings.LOG_DIR / f"sayen_{datetime.now():%Y%m%d}.log"
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
-        root_logger.addHandler(file_handler)
+        
+        handlers = [console_handler, file_handler]
+        
+        # Handler estructurado (un JSON por línea)
+        if settings.LOG_JSON:
+            json_file = settings.LOG_DIR / f"sayen_{datetime.now():%Y%m%d}.jsonl"
+            json_handler = logging.FileHandler(json_file, encoding='utf-8')
+            json_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(json_handler)
+        
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        root_logger.addHandler(queue_handler)
+        
+        self.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
     
     def get_logger(self, name: str) -> logging.Logger:
         """Obtiene o crea un logger con el nombre especificado."""
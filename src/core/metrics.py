@@ -0,0 +1,198 @@
+"""
+Métricas operacionales en formato de texto de Prometheus.
+
+Las métricas se actualizan desde los mismos puntos que registran en el log
+y se publican reescribiendo periódicamente un archivo .prom en LOG_DIR
+(para el textfile collector de node_exporter) y, opcionalmente, en un
+endpoint HTTP local.
+"""
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.config.settings import settings
+from src.core.timing import stage_timer
+
+
+# Errores que siempre se publican, aunque no hayan ocurrido
+KNOWN_ERRORS = ("ScrapingError", "AuthenticationError", "ExcelProcessingError")
+
+HELP = {
+    "sayen_patients_processed_total": ("counter", "Pacientes procesados por etapa"),
+    "sayen_cells_filled_total": ("counter", "Celdas completadas por columna"),
+    "sayen_invalid_runs_total": ("counter", "RUN con dígito verificador inválido omitidos"),
+    "sayen_errors_total": ("counter", "Errores por clase de excepción"),
+    "sayen_active_sessions": ("gauge", "Sesiones de navegador abiertas"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Contadores y medidores con etiquetas."""
+    
+    def __init__(self):
+        self._values: Dict[str, Dict[LabelKey, float]] = {name: {} for name in HELP}
+        self._lock = threading.Lock()
+        
+        for error in KNOWN_ERRORS:
+            self._values["sayen_errors_total"][(("exception", error),)] = 0.0
+    
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """
+        Incrementa una métrica.
+        
+        Args:
+            name: Nombre de la métrica (ver HELP)
+            value: Incremento (negativo para bajar un medidor)
+            labels: Etiquetas de la serie
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0.0) + value
+    
+    def record_error(self, error: BaseException) -> None:
+        """Cuenta un error según su clase de excepción."""
+        self.inc("sayen_errors_total", exception=type(error).__name__)
+    
+    def render(self) -> str:
+        """
+        Genera las métricas en formato de texto de Prometheus.
+        
+        Incluye la latencia por etapa registrada por stage_timer.
+        
+        Returns:
+            Texto de exposición
+        """
+        lines = []
+        with self._lock:
+            values = {name: dict(series) for name, series in self._values.items()}
+        
+        for name, (kind, description) in HELP.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            series = values[name] or {(): 0.0}
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(key)} {value:g}")
+        
+        lines.append("# HELP sayen_stage_latency_seconds Latencia por etapa")
+        lines.append("# TYPE sayen_stage_latency_seconds summary")
+        for stage, stats in stage_timer.summary().items():
+            for quantile, field in (("0.5", "p50"), ("0.95", "p95")):
+                key = (("quantile", quantile), ("stage", stage))
+                lines.append(f"sayen_stage_latency_seconds{_labels(key)} {stats[field]:g}")
+            key = (("stage", stage),)
+            lines.append(f"sayen_stage_latency_seconds_sum{_labels(key)} {stats['total']:g}")
+            lines.append(f"sayen_stage_latency_seconds_count{_labels(key)} {stats['count']}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: Optional[Path] = None) -> Path:
+        """
+        Reescribe el archivo .prom de forma atómica.
+        
+        Args:
+            path: Archivo destino (por defecto LOG_DIR/sayen.prom)
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = path or settings.LOG_DIR / "sayen.prom"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        tmp_path.replace(path)
+        return path
+
+
+def _labels(key: LabelKey) -> str:
+    """Formatea las etiquetas de una serie."""
+    if not key:
+        return ""
+    escaped = []
+    for name, value in key:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsExporter:
+    """Publica las métricas mientras dura una ejecución."""
+    
+    def __init__(self, registry: MetricsRegistry, interval: float, port: int = 0):
+        """
+        Inicializa el exportador.
+        
+        Args:
+            registry: Métricas a publicar
+            interval: Segundos entre reescrituras del archivo .prom
+            port: Puerto del endpoint HTTP local (0 = sin endpoint)
+        """
+        self.registry = registry
+        self.interval = interval
+        self.port = port
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    def start(self) -> None:
+        """Inicia la reescritura periódica y el endpoint HTTP."""
+        self._thread = threading.Thread(target=self._loop, name="sayen-metrics", daemon=True)
+        self._thread.start()
+        
+        if self.port:
+            registry = self.registry
+            
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = registry.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                
+                def log_message(self, format, *args):
+                    pass
+            
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            threading.Thread(
+                target=self._server.serve_forever, name="sayen-metrics-http", daemon=True
+            ).start()
+    
+    def stop(self) -> None:
+        """Detiene el exportador dejando escrito el estado final."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        self.registry.write()
+    
+    def _loop(self) -> None:
+        """Reescribe el archivo .prom cada `interval` segundos."""
+        while not self._stop.wait(self.interval):
+            self.registry.write()
+
+
+@contextmanager
+def metrics_exporter() -> Iterator[None]:
+    """Publica las métricas durante el bloque si METRICS está habilitado."""
+    if not settings.METRICS:
+        yield
+        return
+    
+    exporter = MetricsExporter(metrics, settings.METRICS_INTERVAL, settings.METRICS_PORT)
+    exporter.start()
+    try:
+        yield
+    finally:
+        exporter.stop()
+
+
+# Instancia global
+metrics = MetricsRegistry()
@@ -0,0 +1,103 @@
+"""
+Perfilado de CPU y memoria de una ejecución (opción --profile).
+"""
+import sys
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from src.config.settings import settings
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+PROFILE_FLAG = "--profile"
+
+
+def profile_requested(argv: Optional[List[str]] = None) -> bool:
+    """Verifica si se pidió perfilar la ejecución desde la línea de comandos."""
+    return PROFILE_FLAG in (sys.argv[1:] if argv is None else argv)
+
+
+@contextmanager
+def profiled(name: str, enabled: bool = True, top: int = 20, directory: Optional[Path] = None) -> Iterator[None]:
+    """
+    Perfila el bloque con cProfile y tracemalloc.
+    
+    Guarda en LOG_DIR el perfil (profile_<name>_<ts>.prof, abrir con
+    snakeviz o pstats) y los principales sitios de asignación de memoria
+    (alloc_<name>_<ts>.txt), e imprime las funciones más costosas.
+    
+    cProfile solo mide el hilo que ejecuta el bloque; con WORKERS > 1 el
+    trabajo de las sesiones paralelas queda fuera del perfil.
+    
+    Args:
+        name: Nombre del script perfilado
+        enabled: Si perfilar (si no, el bloque se ejecuta sin costo)
+        top: Cantidad de funciones y sitios de asignación a reportar
+        directory: Directorio destino (por defecto settings.LOG_DIR)
+    """
+    if not enabled:
+        yield
+        return
+    
+    directory = directory or settings.LOG_DIR
+    stamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+    profiler = cProfile.Profile()
+    
+    tracemalloc.start(25)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        profile_path = directory / f"profile_{name}_{stamp}.prof"
+        profiler.dump_stats(str(profile_path))
+        
+        alloc_path = directory / f"alloc_{name}_{stamp}.txt"
+        _write_allocations(snapshot, peak, alloc_path, top)
+        
+        print_hot_functions(pstats.Stats(profiler), top)
+        logger.info("Perfil de CPU guardado en %s", profile_path)
+        logger.info("Sitios de asignación guardados en %s", alloc_path)
+
+
+def _write_allocations(snapshot: tracemalloc.Snapshot, peak: int, path: Path, top: int) -> None:
+    """Escribe los sitios que más memoria retienen al terminar."""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Pico de memoria trazada: {peak / 1024 / 1024:.1f} MiB\n\n")
+        for stat in snapshot.statistics("traceback")[:top]:
+            f.write(f"{stat.size / 1024:.1f} KiB en {stat.count} bloques\n")
+            for line in stat.traceback.format(limit=5):
+                f.write(f"{line}\n")
+            f.write("\n")
+
+
+def print_hot_functions(stats: pstats.Stats, top: int = 20) -> None:
+    """
+    Imprime las funciones con mayor tiempo propio.
+    
+    Args:
+        stats: Estadísticas de cProfile
+        top: Cantidad de funciones a mostrar
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    
+    print(f"\n{'Función':<60}  {'llamadas':>9}  {'propio':>9}  {'acumulado':>9}")
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in rows:
+        location = f"{Path(filename).name}:{line}({function})"
+        print(f"{location[-60:]:<60}  {ncalls:>9}  {tottime:>8.2f}s  {cumtime:>8.2f}s")
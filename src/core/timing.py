@@ -0,0 +1,148 @@
+"""
+Medición de tiempos por etapa.
+"""
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+from src.core.tracing import tracer
+
+
+class Histogram:
+    """Muestras de latencia de una etapa."""
+    
+    def __init__(self):
+        self._samples: List[float] = []
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float) -> None:
+        """Registra una muestra."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Resume las muestras registradas.
+        
+        Returns:
+            Diccionario con count, total, p50, p95 y max (segundos)
+        """
+        with self._lock:
+            ordered = sorted(self._samples)
+        
+        if not ordered:
+            return {"count": 0, "total": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        
+        def percentile(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        
+        return {
+            "count": len(ordered),
+            "total": round(sum(ordered), 4),
+            "p50": round(percentile(0.50), 4),
+            "p95": round(percentile(0.95), 4),
+            "max": round(ordered[-1], 4),
+        }
+
+
+class StageTimer:
+    """Registro de histogramas de latencia por etapa."""
+    
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started_at = datetime.now()
+    
+    def current_stage(self) -> str:
+        """Etapa más interna en curso en el hilo actual ("" si no hay ninguna)."""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else ""
+    
+    def histogram(self, stage: str) -> Histogram:
+        """Obtiene (o crea) el histograma de una etapa."""
+        with self._lock:
+            if stage not in self._histograms:
+                self._histograms[stage] = Histogram()
+            return self._histograms[stage]
+    
+    @contextmanager
+    def span(self, stage: str, **args) -> Iterator[None]:
+        """
+        Mide la duración de un bloque.
+        
+        Si el tracer está habilitado, el bloque también queda en la traza.
+        
+        Args:
+            stage: Nombre de la etapa (ej: "scraper.login")
+            args: Datos adicionales para la traza (ej: fecha, run)
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        
+        self._local.stack.append(stage)
+        start = time.perf_counter()
+        try:
+            with tracer.span(stage, cat=stage.split(".")[0], **args):
+                yield
+        finally:
+            self.histogram(stage).add(time.perf_counter() - start)
+            self._local.stack.pop()
+    
+    def timed(self, stage: str) -> Callable:
+        """Decorador que mide cada llamada a la función como la etapa indicada."""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Resumen de todas las etapas, ordenado por nombre."""
+        with self._lock:
+            stages = sorted(self._histograms.items())
+        return {stage: hist.summary() for stage, hist in stages}
+    
+    def reset(self) -> None:
+        """Descarta las muestras registradas."""
+        with self._lock:
+            self._histograms = {}
+        self.started_at = datetime.now()
+    
+    def write_report(self, name: str, directory: Optional[Path] = None) -> Path:
+        """
+        Escribe el resumen como JSON junto al log.
+        
+        Args:
+            name: Nombre del script que se ejecutó
+            directory: Directorio destino (por defecto settings.LOG_DIR)
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = (directory or settings.LOG_DIR) / f"timings_{name}_{self.started_at:%Y%m%d_%H%M%S}.json"
+        data = {
+            "script": name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "stages": self.summary(),
+        }
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        return path
+
+
+# Instancia global
+stage_timer = StageTimer()
+timed = stage_timer.timed
+span = stage_timer.span
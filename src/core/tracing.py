@@ -0,0 +1,113 @@
+"""
+Registro de la línea de tiempo de una ejecución en formato Trace Event.
+
+El archivo generado se abre en chrome://tracing o en https://ui.perfetto.dev.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+
+
+class Tracer:
+    """Recolector de spans anidados por hilo."""
+    
+    def __init__(self, enabled: bool = False):
+        """
+        Inicializa el tracer.
+        
+        Args:
+            enabled: Si registrar spans (si no, span() no tiene costo)
+        """
+        self.enabled = enabled
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    def _now_us(self) -> float:
+        """Microsegundos desde el inicio de la ejecución."""
+        return (time.perf_counter() - self._t0) * 1_000_000
+    
+    @contextmanager
+    def span(self, name: str, cat: str = "step", **args) -> Iterator[None]:
+        """
+        Registra un span alrededor de un bloque.
+        
+        Args:
+            name: Nombre del span
+            cat: Categoría (run, step, webdriver, ...)
+            args: Datos adicionales visibles en el visor
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._add(name, cat, start, self._now_us() - start, args)
+    
+    def _add(self, name: str, cat: str, start: float, duration: float, args: Dict) -> None:
+        """Agrega un evento completo ("X") del hilo actual."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start, 1),
+            "dur": round(duration, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        
+        with self._lock:
+            self._events.append(event)
+            self._threads[thread.ident] = thread.name
+    
+    def write(self, name: str, directory: Optional[Path] = None) -> Path:
+        """
+        Escribe la traza en formato JSON de Trace Event.
+        
+        Agrega un span "run" que cubre toda la ejecución en el hilo principal.
+        
+        Args:
+            name: Nombre del script que se ejecutó
+            directory: Directorio destino (por defecto settings.LOG_DIR)
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        self._add(name, "run", 0.0, self._now_us(), {})
+        
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        
+        # Metadatos con el nombre de cada hilo (MainThread, sayen-worker_0, ...)
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in threads.items()
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"sayen {name}"}})
+        
+        path = (directory or settings.LOG_DIR) / f"trace_{name}_{self.started_at:%Y%m%d_%H%M%S}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        
+        return path
+
+
+# Instancia global
+tracer = Tracer(enabled=settings.TRACE)
@@ -3,7 +3,68 @@ Utilidades generales del proyecto.
 """
 import re
 import unicodedata
-from typing import Optional, Any
+from functools import lru_cache
+from typing import Optional, Any, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.domain.validators import digito_verificador
+
+
+# Caracteres con traducción precalculada: ASCII, Latin-1 y Latin Extended-A
+_FAST_LIMIT = "\u0180"
+# Textos de hasta este largo (encabezados, estados) se guardan en caché
+_CACHE_MAX_LEN = 64
+
+_YEARS_PATTERN = re.compile(r"(\d+)\s*años?", re.IGNORECASE)
+_MONTHS_PATTERN = re.compile(r"(\d+)\s*mes(es)?", re.IGNORECASE)
+_RUT_CLEAN_PATTERN = re.compile(r"[^\dkK]")
+# Cuerpo de hasta 9 dígitos: cabe en int64 y cubre cualquier RUN real
+_RUT_BODY_PATTERN = re.compile(r"[0-9]{1,9}")
+
+# Textos que se consideran celdas vacías (tras strip y en minúsculas)
+_EMPTY_STRINGS = frozenset({"", "nan", "none", "null"})
+
+
+def _normalize_slow(text: str) -> str:
+    """Normalización completa con unicodedata (válida para cualquier texto)."""
+    # Elimina acentos
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    
+    # Convierte a mayúsculas y limpia espacios
+    text = text.upper()
+    text = re.sub(r"\s+", " ", text)
+    
+    return text.strip()
+
+
+# Cada carácter acentuado del rango rápido → su versión sin acento en mayúsculas
+_ACCENT_TABLE = {
+    chr(code): _normalize_slow(chr(code))
+    for code in range(0x80, ord(_FAST_LIMIT))
+    if not chr(code).isspace() and _normalize_slow(chr(code)) != chr(code).upper()
+}
+_ACCENT_PATTERN = re.compile("[" + re.escape("".join(_ACCENT_TABLE)) + "]")
+
+
+def _replace_accent(match: "re.Match") -> str:
+    return _ACCENT_TABLE[match.group()]
+
+
+def _normalize(text: str) -> str:
+    """Normaliza con la tabla precalculada si todos los caracteres están en el rango rápido."""
+    if text.isascii():
+        return " ".join(text.upper().split())
+    if max(text) < _FAST_LIMIT:
+        return " ".join(_ACCENT_PATTERN.sub(_replace_accent, text).upper().split())
+    return _normalize_slow(text)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_cached(text: str) -> str:
+    return _normalize(text)
 
 
 def normalize_text(text: str) -> str:
@@ -19,15 +80,50 @@ def normalize_text(text: str) -> str:
     if not text:
         return ""
     
-    # Elimina acentos
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    if len(text) <= _CACHE_MAX_LEN:
+        return _normalize_cached(text)
+    return _normalize(text)
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """
+    Normaliza una columna completa (cada valor distinto se procesa una vez).
     
-    # Convierte a mayúsculas y limpia espacios
-    text = text.upper()
-    text = re.sub(r"\s+", " ", text)
+    Args:
+        series: Columna de pandas
     
-    return text.strip()
+    Returns:
+        Series con los textos normalizados ("" para valores vacíos), mismo índice
+    """
+    return map_distinct(series, normalize_text, empty="")
+
+
+def map_distinct(series: pd.Series, func, empty: Any, dtype: str = "object", text: bool = True) -> pd.Series:
+    """
+    Aplica una función de texto a una columna evaluándola una vez por valor distinto.
+    
+    Las columnas de Excel repiten mucho sus valores (edades, estados, sectores),
+    por lo que factorizar y mapear los valores únicos es mucho más rápido que
+    recorrer fila por fila.
+    
+    Args:
+        series: Columna de pandas
+        func: Función que recibe el texto de un valor
+        empty: Resultado para los valores vacíos (None, NaN)
+        dtype: Tipo de la Series resultante
+        text: Si convertir a texto los valores que no lo son antes de llamar a func
+    
+    Returns:
+        Series con los resultados, mismo índice
+    """
+    codes, uniques = pd.factorize(series)
+    if text:
+        results = [func(value if isinstance(value, str) else str(value)) for value in uniques]
+    else:
+        results = [func(value) for value in uniques]
+    # El código -1 (valores vacíos) toma el resultado agregado al final
+    results.append(empty)
+    return pd.Series(np.array(results, dtype=object)[codes], index=series.index).astype(dtype)
 
 
 def is_empty(value: Any) -> bool:
@@ -44,17 +140,38 @@ def is_empty(value: Any) -> bool:
         return True
     
     if isinstance(value, str):
-        return value.strip().lower() in {"", "nan", "none", "null"}
+        return value.strip().lower() in _EMPTY_STRINGS
+    
+    if isinstance(value, float):
+        return value != value
     
     try:
-        import math
-        import pandas as pd
-        if pd.isna(value) or (isinstance(value, float) and math.isnan(value)):
-            return True
-    except:
-        pass
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def empty_mask(data: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
+    """
+    Aplica is_empty a una columna o tabla completa.
+    
+    Args:
+        data: Series o DataFrame
+    
+    Returns:
+        Máscara booleana con la misma forma (True en las celdas vacías)
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.apply(empty_mask)
     
-    return False
+    if not (pd.api.types.is_object_dtype(data) or pd.api.types.is_string_dtype(data)
+            or isinstance(data.dtype, pd.CategoricalDtype)):
+        return data.isna()
+    
+    # Texto: is_empty se evalúa una vez por valor distinto (código -1 = None/NaN)
+    codes, uniques = pd.factorize(data)
+    flags = np.fromiter((is_empty(value) for value in uniques), dtype=bool, count=len(uniques))
+    return pd.Series(np.append(flags, True)[codes], index=data.index)
 
 
 def format_rut(rut: str) -> str:
@@ -68,7 +185,7 @@ def format_rut(rut: str) -> str:
         RUT formateado (ej: "12.345.678-9")
     """
     # Limpia el RUT
-    rut = re.sub(r"[^\dkK]", "", rut)
+    rut = _RUT_CLEAN_PATTERN.sub("", rut)
     
     if len(rut) < 2:
         return rut
@@ -85,6 +202,90 @@ def format_rut(rut: str) -> str:
     return f"{cuerpo_formateado}-{dv}"
 
 
+def run_text(value: Any) -> str:
+    """
+    Convierte una celda de RUN en texto.
+    
+    Args:
+        value: Valor de la celda (texto, número o vacío)
+    
+    Returns:
+        RUN sin espacios alrededor ("" para celdas vacías); los números
+        enteros que Excel guarda como decimales pierden el ".0"
+    """
+    if isinstance(value, str):
+        return value.strip()
+    if is_empty(value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def rut_key(rut: str) -> Optional[int]:
+    """
+    Obtiene la clave entera de un RUT válido.
+    
+    Args:
+        rut: RUT con o sin formato
+    
+    Returns:
+        Cuerpo del RUT como entero, o None si el cuerpo no es numérico (o es
+        cero) o el dígito verificador no corresponde
+    """
+    cuerpo, digito = _split_rut(rut)
+    if cuerpo and digito_verificador(cuerpo) == digito:
+        return cuerpo
+    return None
+
+
+def _split_rut(value: Any) -> Tuple[int, str]:
+    """Separa una celda de RUN en (cuerpo, dígito verificador); (0, "") si no es numérico."""
+    rut = _RUT_CLEAN_PATTERN.sub("", run_text(value)).upper()
+    cuerpo = rut[:-1]
+    if _RUT_BODY_PATTERN.fullmatch(cuerpo):
+        return int(cuerpo), rut[-1]
+    return 0, ""
+
+
+def parse_rut_series(series: pd.Series) -> pd.DataFrame:
+    """
+    Normaliza y valida una columna completa de RUN/RUT.
+    
+    Cada valor distinto se separa y se valida una sola vez; el resultado se
+    expande a las filas con los códigos de pd.factorize.
+    
+    Args:
+        series: Columna con RUN en cualquier formato (texto o número)
+    
+    Returns:
+        DataFrame con el mismo índice y las columnas:
+        - RUN: RUN formateado ("12.345.678-9"), "" si no es válido
+        - RUN_KEY: cuerpo como entero (nulo si no es numérico o es cero)
+        - VALIDO: si el dígito verificador corresponde
+    """
+    codes, uniques = pd.factorize(series)
+    # El código -1 (valores vacíos) toma la entrada agregada al final
+    partes = [_split_rut(value) for value in uniques] + [(0, "")]
+    cuerpos = np.fromiter((cuerpo for cuerpo, _ in partes), dtype=np.int64, count=len(partes))
+    digitos = np.array([digito for _, digito in partes], dtype=object)
+    
+    numerico = cuerpos > 0
+    valido = np.fromiter(
+        (cuerpo > 0 and digito_verificador(cuerpo) == digito for cuerpo, digito in partes),
+        dtype=bool, count=len(partes)
+    )
+    
+    runs = np.full(len(partes), "", dtype=object)
+    runs[valido] = [f"{c:,}".replace(",", ".") + "-" + d for c, d in zip(cuerpos[valido], digitos[valido])]
+    
+    return pd.DataFrame({
+        "RUN": runs[codes],
+        "RUN_KEY": pd.arrays.IntegerArray(cuerpos[codes], mask=~numerico[codes]),
+        "VALIDO": valido[codes],
+    }, index=series.index)
+
+
 def clean_name(name: str) -> str:
     """
     Limpia un nombre eliminando paréntesis y contenido.
@@ -121,13 +322,26 @@ def parse_age_to_months(age_str: str) -> int:
     months = 0
     
     # Busca años
-    match_years = re.search(r"(\d+)\s*años?", age_str, re.IGNORECASE)
+    match_years = _YEARS_PATTERN.search(age_str)
     if match_years:
         years = int(match_years.group(1))
     
     # Busca meses
-    match_months = re.search(r"(\d+)\s*mes(es)?", age_str, re.IGNORECASE)
+    match_months = _MONTHS_PATTERN.search(age_str)
     if match_months:
         months = int(match_months.group(1))
     
-    return years * 12 + months
\ No newline at end of file
+    return years * 12 + months
+
+
+def parse_age_series(series: pd.Series) -> pd.Series:
+    """
+    Convierte una columna de edades ("X años Y meses", "N días") a meses totales.
+    
+    Args:
+        series: Columna con textos de edad
+    
+    Returns:
+        Series de enteros (0 para valores vacíos o sin años ni meses), mismo índice
+    """
+    return map_distinct(series, parse_age_to_months, empty=0, dtype="int64")
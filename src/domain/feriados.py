@@ -0,0 +1,106 @@
+"""
+Calendario de feriados nacionales de Chile.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import FrozenSet
+
+
+# Feriados de fecha fija (mes, día)
+FERIADOS_FIJOS = [
+    (1, 1),    # Año Nuevo
+    (5, 1),    # Día del Trabajo
+    (5, 21),   # Glorias Navales
+    (7, 16),   # Virgen del Carmen
+    (8, 15),   # Asunción de la Virgen
+    (9, 18),   # Independencia Nacional
+    (9, 19),   # Glorias del Ejército
+    (11, 1),   # Todos los Santos
+    (12, 8),   # Inmaculada Concepción
+    (12, 25),  # Navidad
+]
+
+# Día Nacional de los Pueblos Indígenas (solsticio de invierno, Ley 21.357)
+SOLSTICIO_INVIERNO = {
+    2021: 21, 2022: 21, 2023: 21, 2024: 20, 2025: 20,
+    2026: 21, 2027: 21, 2028: 20, 2029: 20, 2030: 21,
+}
+
+
+def _domingo_de_pascua(anio: int) -> date:
+    """Calcula el domingo de Pascua (algoritmo gregoriano anónimo)."""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def _trasladar_a_lunes(fecha: date) -> date:
+    """
+    Aplica el traslado de la Ley 19.668.
+    
+    Martes a jueves pasan al lunes de la misma semana y viernes al lunes siguiente.
+    """
+    weekday = fecha.weekday()
+    if 1 <= weekday <= 3:
+        return fecha - timedelta(days=weekday)
+    if weekday == 4:
+        return fecha + timedelta(days=3)
+    return fecha
+
+
+@lru_cache(maxsize=64)
+def feriados_chile(anio: int) -> FrozenSet[date]:
+    """
+    Obtiene los feriados nacionales de un año.
+    
+    No incluye feriados regionales ni elecciones; esos se agregan por configuración.
+    
+    Args:
+        anio: Año a calcular
+    
+    Returns:
+        Conjunto de fechas feriadas
+    """
+    feriados = {date(anio, mes, dia) for mes, dia in FERIADOS_FIJOS}
+    
+    # Semana Santa
+    pascua = _domingo_de_pascua(anio)
+    feriados.add(pascua - timedelta(days=2))
+    feriados.add(pascua - timedelta(days=1))
+    
+    # Feriados trasladables
+    feriados.add(_trasladar_a_lunes(date(anio, 6, 29)))   # San Pedro y San Pablo
+    feriados.add(_trasladar_a_lunes(date(anio, 10, 12)))  # Encuentro de Dos Mundos
+    
+    # Iglesias Evangélicas: martes pasa al viernes anterior, miércoles al viernes siguiente
+    evangelicas = date(anio, 10, 31)
+    if evangelicas.weekday() == 1:
+        evangelicas -= timedelta(days=4)
+    elif evangelicas.weekday() == 2:
+        evangelicas += timedelta(days=2)
+    feriados.add(evangelicas)
+    
+    # Pueblos Indígenas
+    if anio >= 2021:
+        feriados.add(date(anio, 6, SOLSTICIO_INVIERNO.get(anio, 21)))
+    
+    # Fiestas Patrias extendidas
+    if date(anio, 9, 17).weekday() == 0:
+        feriados.add(date(anio, 9, 17))
+    if date(anio, 9, 20).weekday() == 4:
+        feriados.add(date(anio, 9, 20))
+    
+    return frozenset(feriados)
+
+
+def es_feriado(fecha: date) -> bool:
+    """Verifica si una fecha es feriado nacional."""
+    return fecha in feriados_chile(fecha.year)
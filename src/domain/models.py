@@ -1,11 +1,21 @@
 """
 Modelos de dominio.
 """
+import re
+import sys
+import calendar
 from dataclasses import dataclass, field
-from datetime import date, datetime
-from typing import Optional, List
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Set
 from enum import Enum
 
+from src.domain.feriados import feriados_chile
+from src.core.utils import format_rut, clean_name
+
+
+# RUN con el formato de format_rut ("12.345.678-9"): formatearlo no lo cambia
+_RUN_FORMATTED = re.compile(r"\d{1,3}(?:\.\d{3})*-[\dK]")
+
 
 class TipoAtencion(Enum):
     """Tipos de atención posibles."""
@@ -28,9 +38,15 @@ class Sexo(Enum):
     NO_ESPECIFICADO = "NO ESPECIFICADO"
 
 
-@dataclass
+@dataclass(slots=True)
 class Paciente:
-    """Modelo de paciente."""
+    """
+    Modelo de paciente.
+    
+    Usa __slots__ y comparte (sys.intern) los textos que se repiten entre
+    pacientes, como sector, edad y déficit, para que las extracciones de
+    muchos meses ocupen poca memoria.
+    """
     run: str
     nombre: str
     fecha: Optional[date] = None
@@ -43,12 +59,16 @@ class Paciente:
     
     def __post_init__(self):
         """Valida y normaliza datos después de la inicialización."""
-        from src.core.utils import format_rut, clean_name
-        
-        if self.run:
+        # Los valores que ya vienen limpios (get_patients los limpia) no se reprocesan
+        if self.run and not _RUN_FORMATTED.fullmatch(self.run):
             self.run = format_rut(self.run)
-        if self.nombre:
+        if self.nombre and not _is_clean_name(self.nombre):
             self.nombre = clean_name(self.nombre)
+        
+        self.sector = _intern(self.sector)
+        self.edad_rango = _intern(self.edad_rango)
+        self.deficit = _intern(self.deficit)
+        self.consejeria = _intern(self.consejeria)
     
     @property
     def is_complete(self) -> bool:
@@ -74,39 +94,151 @@ class Paciente:
             "DÉFICIT": self.deficit or "",
             "CONSEJERIA": self.consejeria or ""
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Paciente":
+        """Crea un paciente desde el diccionario generado por to_dict."""
+        fecha = data.get("FECHA")
+        sexo = data.get("SEXO")
+        tipo_atencion = data.get("TIPO DE ATENCIÓN")
+        
+        return cls(
+            run=data.get("RUN", ""),
+            nombre=data.get("NOMBRE", ""),
+            fecha=datetime.strptime(fecha, "%d-%m-%Y").date() if fecha else None,
+            sector=data.get("SECTOR") or None,
+            edad_rango=data.get("EDAD") or None,
+            sexo=Sexo(sexo) if sexo else None,
+            tipo_atencion=TipoAtencion(tipo_atencion) if tipo_atencion else None,
+            deficit=data.get("DÉFICIT") or None,
+            consejeria=data.get("CONSEJERIA") or None
+        )
+
+
+def _intern(value):
+    """Devuelve la copia compartida de un texto (los demás valores no cambian)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _is_clean_name(nombre: str) -> bool:
+    """Indica si clean_name dejaría el nombre igual (sin paréntesis ni espacios de más)."""
+    # isprintable descarta tabs, saltos y espacios que no sean " "
+    return (
+        nombre.isprintable()
+        and "  " not in nombre
+        and nombre[0] != " "
+        and nombre[-1] != " "
+        and "(" not in nombre
+        and "（" not in nombre
+    )
 
 
 @dataclass
 class RangoFechas:
-    """Rango de fechas para búsqueda."""
+    """
+    Rango de fechas para búsqueda.
+    
+    Por defecto cubre días de un mismo mes; con anio_fin y mes_fin puede
+    abarcar varios meses o años.
+    """
     anio: int
     mes: int
     dia_inicio: int
     dia_fin: int
+    anio_fin: Optional[int] = None
+    mes_fin: Optional[int] = None
     
     def __post_init__(self):
         """Valida el rango de fechas."""
+        if self.anio_fin is None:
+            self.anio_fin = self.anio
+        if self.mes_fin is None:
+            self.mes_fin = self.mes
+        
         if not 1 <= self.mes <= 12:
             raise ValueError(f"Mes inválido: {self.mes}")
         
+        if not 1 <= self.mes_fin <= 12:
+            raise ValueError(f"Mes de fin inválido: {self.mes_fin}")
+        
         if not 1 <= self.dia_inicio <= 31:
             raise ValueError(f"Día de inicio inválido: {self.dia_inicio}")
         
         if not 1 <= self.dia_fin <= 31:
             raise ValueError(f"Día de fin inválido: {self.dia_fin}")
         
-        if self.dia_inicio > self.dia_fin:
+        if (self.anio_fin, self.mes_fin) < (self.anio, self.mes):
+            raise ValueError("El mes de inicio no puede ser posterior al mes de fin")
+        
+        if not self.multiples_meses and self.dia_inicio > self.dia_fin:
             raise ValueError("El día de inicio no puede ser mayor al día de fin")
     
-    def get_dates(self) -> List[date]:
-        """Obtiene lista de fechas en el rango (excluyendo fines de semana)."""
+    @classmethod
+    def entre(cls, inicio: date, fin: date) -> "RangoFechas":
+        """Crea un rango entre dos fechas cualquiera (inclusive)."""
+        return cls(
+            anio=inicio.year,
+            mes=inicio.month,
+            dia_inicio=inicio.day,
+            dia_fin=fin.day,
+            anio_fin=fin.year,
+            mes_fin=fin.month
+        )
+    
+    @property
+    def multiples_meses(self) -> bool:
+        """Indica si el rango abarca más de un mes."""
+        return (self.anio_fin, self.mes_fin) != (self.anio, self.mes)
+    
+    @property
+    def inicio(self) -> date:
+        """Primera fecha del rango (días inexistentes pasan al mes siguiente)."""
+        ultimo = calendar.monthrange(self.anio, self.mes)[1]
+        if self.dia_inicio > ultimo:
+            return date(self.anio, self.mes, ultimo) + timedelta(days=1)
+        return date(self.anio, self.mes, self.dia_inicio)
+    
+    @property
+    def fin(self) -> date:
+        """Última fecha del rango (días inexistentes se ajustan al fin de mes)."""
+        ultimo = calendar.monthrange(self.anio_fin, self.mes_fin)[1]
+        return date(self.anio_fin, self.mes_fin, min(self.dia_fin, ultimo))
+    
+    @property
+    def sufijo_archivo(self) -> str:
+        """Sufijo para nombres de archivo generados a partir del rango."""
+        if not self.multiples_meses:
+            return f"{self.anio}_{self.mes:02d}_{self.dia_inicio:02d}_{self.dia_fin:02d}"
+        return f"{self.inicio:%Y_%m_%d}_{self.fin:%Y_%m_%d}"
+    
+    def get_dates(
+        self,
+        excluir_feriados: bool = True,
+        omitir: Optional[Set[date]] = None
+    ) -> List[date]:
+        """
+        Obtiene lista de fechas hábiles en el rango.
+        
+        Excluye fines de semana y, opcionalmente, feriados y fechas adicionales.
+        
+        Args:
+            excluir_feriados: Si excluir feriados nacionales
+            omitir: Fechas adicionales a excluir
+        
+        Returns:
+            Fechas ordenadas
+        """
+        omitidas = set(omitir or ())
+        inicio, fin = self.inicio, self.fin
+        
+        if excluir_feriados:
+            for anio in range(inicio.year, fin.year + 1):
+                omitidas |= feriados_chile(anio)
+        
+        # Excluye sábados (5) y domingos (6)
         dates = []
-        for dia in range(self.dia_inicio, self.dia_fin + 1):
-            try:
-                fecha = date(self.anio, self.mes, dia)
-                # Excluye sábados (5) y domingos (6)
-                if fecha.weekday() < 5:
-                    dates.append(fecha)
-            except ValueError:
-                continue
-        return dates
\ No newline at end of file
+        for ordinal in range(inicio.toordinal(), fin.toordinal() + 1):
+            fecha = date.fromordinal(ordinal)
+            if fecha.weekday() < 5 and fecha not in omitidas:
+                dates.append(fecha)
+        return dates
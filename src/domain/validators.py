@@ -0,0 +1,28 @@
+"""
+Validadores de datos del dominio.
+"""
+
+
+def digito_verificador(cuerpo: int) -> str:
+    """
+    Calcula el dígito verificador de un RUN (módulo 11).
+    
+    Args:
+        cuerpo: RUN sin dígito verificador (ej: 12345678)
+    
+    Returns:
+        Dígito verificador ("0"-"9" o "K")
+    """
+    total = 0
+    factor = 2
+    while cuerpo:
+        cuerpo, digito = divmod(cuerpo, 10)
+        total += digito * factor
+        factor = 2 if factor == 7 else factor + 1
+    
+    resto = 11 - total % 11
+    if resto == 11:
+        return "0"
+    if resto == 10:
+        return "K"
+    return str(resto)
@@ -2,9 +2,8 @@
 Script para completar datos faltantes en Excel (p2).
 """
 import sys
-import time
 import re
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Optional, Tuple, Dict
 from tkinter import Tk, filedialog
@@ -19,10 +18,16 @@ from src.domain.models import Paciente, TipoAtencion, Sexo
 from src.services.scraper_service import WebScraperService
 from src.services.patient_service import PatientService
 from src.services.excel_service import ExcelService
+from src.services.parallel_service import SessionPool, ParallelExecutor, worker_count
 from src.ui.console import ConsoleUI
 from src.config.settings import settings
 from src.core.logging import get_logger
-from src.core.utils import is_empty, normalize_text, parse_age_to_months
+from src.core.timing import timed, span
+from src.core.metrics import metrics, metrics_exporter
+from src.core.profiling import profiled, profile_requested
+from src.services.registry_service import patient_registry
+from src.services.anamnesis_service import anamnesis_store, Anamnesis
+from src.core.utils import is_empty, normalize_text, normalize_series, parse_age_to_months, parse_rut_series, empty_mask, rut_key
 
 
 logger = get_logger(__name__)
@@ -70,9 +75,12 @@ class FillDataScript:
             self.ui.print_warning("\nProceso interrumpido por el usuario")
             sys.exit(0)
         except Exception as e:
-            logger.error(f"Error en script: {e}", exc_info=True)
+            logger.error("Error en script: %s", e, exc_info=True)
+            metrics.record_error(e)
             self.ui.print_error(f"Error: {e}")
             sys.exit(1)
+        finally:
+            self.ui.report_run("fill_data")
     
     def _select_excel_file(self) -> Optional[str]:
         """
@@ -106,12 +114,10 @@ class FillDataScript:
         # Normaliza nombres de columnas
         df.columns = df.columns.str.strip().str.upper()
         
-        # Asegura columnas de texto
+        # Asegura las columnas que se completan
         for col in ["SEXO", "CONSEJERIA", "TIPO DE ATENCIÓN", "DÉFICIT"]:
             if col not in df.columns:
                 df[col] = None
-            else:
-                df[col] = df[col].astype("object")
         
         # Maneja variantes de nombres de columnas
         if "TIPO DE ATENCIÓN" not in df.columns and "TIPO DE ATENCION" in df.columns:
@@ -120,7 +126,8 @@ class FillDataScript:
         if "DÉFICIT" not in df.columns and "DEFICIT" in df.columns:
             df["DÉFICIT"] = df["DEFICIT"]
         
-        return df
+        # Categóricas, FECHA como fecha y RUN limpio con su clave entera
+        return self.excel_service.apply_schema(df)
     
     def _process_patients(
         self, 
@@ -151,6 +158,22 @@ class FillDataScript:
         if not run_col:
             raise ValueError("No se encontró columna RUN o RUT en el archivo")
         
+        # Antes de abrir el navegador: descarta los RUN mal digitados y
+        # completa desde los datos locales las filas que no necesitan Rayen
+        runs = parse_rut_series(df[run_col])
+        invalid = self._invalid_runs(df, run_col, runs)
+        keys = runs["RUN_KEY"].where(runs["VALIDO"])
+        nsp = self._nsp_mask(df)
+        skip = invalid | self._fill_from_cache(df, keys, invalid | nsp)
+        
+        pending = ~skip & ~nsp & ~empty_mask(df[run_col])
+        if not pending.any():
+            self.ui.print_info("No quedan pacientes por consultar en Rayen")
+            return df
+        
+        if settings.WORKERS > 1:
+            return self._process_patients_parallel(df, run_col, skip, location, username, password)
+        
         with WebScraperService(headless=settings.HEADLESS) as scraper:
             # Login
             scraper.login(location, username, password)
@@ -161,10 +184,9 @@ class FillDataScript:
             # Procesa cada paciente
             total = len(df)
             for idx, row in df.iterrows():
-                run = str(row.get(run_col, "")).strip() if not pd.isna(row.get(run_col)) else ""
-                nombre = str(row.get("NOMBRE", "")).strip() if not pd.isna(row.get("NOMBRE")) else ""
+                run, nombre = self._row_identity(row, run_col)
                 
-                if not run:
+                if not run or skip[idx]:
                     continue
                 
                 # Muestra progreso
@@ -173,61 +195,305 @@ class FillDataScript:
                 self.ui.print_info(f"Nombre: {nombre}")
                 
                 # Verifica si ya es NSP para saltar anamnesis
-                tipo_actual = row.get("TIPO DE ATENCIÓN", "")
-                if not is_empty(tipo_actual) and normalize_text(tipo_actual) == "NSP":
+                if nsp[idx]:
                     self.ui.print_warning("Tipo = NSP, omitiendo análisis de anamnesis")
-                    self.ui.pause_or_timeout(3)
+                    self.ui.pause_or_timeout(min(3, settings.PATIENT_PAUSE))
+                    continue
+                
+                # RUN repetido cuya ficha ya se leyó en esta ejecución
+                updates = self._cached_updates(row, keys[idx])
+                if updates is not None:
+                    self.ui.print_info("  → Datos desde la caché local")
+                    if updates:
+                        self._apply_updates(df, idx, updates)
+                    metrics.inc("sayen_patients_processed_total", stage="fill_data")
                     continue
                 
                 try:
-                    # Busca el paciente
-                    if not self._search_patient(scraper, run):
+                    updates = self._fill_patient(scraper, run, row)
+                    
+                    if updates is None:
                         self.ui.print_warning("Paciente no encontrado")
-                        self.ui.pause_or_timeout(3)
+                        self.ui.pause_or_timeout(min(3, settings.PATIENT_PAUSE))
                         continue
                     
-                    # Extrae información general (SEXO, CONSEJERIA)
-                    patient_data = self._extract_patient_data(scraper, row)
-                    
-                    # Actualiza DataFrame con datos generales
-                    for key, value in patient_data.items():
-                        if key in df.columns and not is_empty(value):
-                            if is_empty(df.at[idx, key]):
-                                df.at[idx, key] = value
-                                self.ui.print_success(f"  → {key}: {value}")
-                    
-                    # Procesa anamnesis para TIPO DE ATENCIÓN y DÉFICIT
-                    fecha = row.get("FECHA")
-                    if fecha and not is_empty(fecha):
-                        # Intenta obtener anamnesis con timeout corto
-                        anamnesis_data = self._process_anamnesis_quick(scraper, fecha)
-                        
-                        if anamnesis_data:
-                            # Actualiza TIPO DE ATENCIÓN
-                            if "TIPO DE ATENCIÓN" in anamnesis_data:
-                                if is_empty(df.at[idx, "TIPO DE ATENCIÓN"]):
-                                    df.at[idx, "TIPO DE ATENCIÓN"] = anamnesis_data["TIPO DE ATENCIÓN"]
-                                    self.ui.print_success(f"  → TIPO DE ATENCIÓN: {anamnesis_data['TIPO DE ATENCIÓN']}")
-                            
-                            # Actualiza DÉFICIT (solo si no es NSP)
-                            if "DÉFICIT" in anamnesis_data:
-                                if is_empty(df.at[idx, "DÉFICIT"]):
-                                    df.at[idx, "DÉFICIT"] = anamnesis_data["DÉFICIT"]
-                                    self.ui.print_success(f"  → DÉFICIT: {anamnesis_data['DÉFICIT']}")
-                        else:
-                            self.ui.print_warning("  → No se pudo analizar anamnesis (no disponible)")
-                    else:
-                        self.ui.print_warning("  → Sin fecha, omitiendo análisis de anamnesis")
+                    self._apply_updates(df, idx, updates)
+                    metrics.inc("sayen_patients_processed_total", stage="fill_data")
                     
                 except Exception as e:
-                    logger.error(f"Error procesando paciente {run}: {e}")
+                    logger.error("Error procesando paciente %s: %s", run, e)
+                    metrics.record_error(e)
                     self.ui.print_error(f"Error: {e}")
                 
                 # Pausa entre pacientes
-                self.ui.pause_or_timeout(5)
+                self.ui.pause_or_timeout(settings.PATIENT_PAUSE)
         
         return df
     
+    def _process_patients_parallel(
+        self,
+        df: pd.DataFrame,
+        run_col: str,
+        skip: pd.Series,
+        location: str,
+        username: str,
+        password: str
+    ) -> pd.DataFrame:
+        """
+        Procesa los pacientes repartiéndolos entre varias sesiones.
+        
+        Args:
+            df: DataFrame con pacientes
+            run_col: Columna con el RUN
+            skip: Filas que no se consultan (RUN inválido o completadas desde la caché local)
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+        
+        Returns:
+            DataFrame actualizado
+        """
+        units = []
+        nsp = self._nsp_mask(df)
+        for idx, row in df.iterrows():
+            run, _ = self._row_identity(row, run_col)
+            if run and not nsp[idx] and not skip[idx]:
+                units.append((idx, run, row))
+        
+        if not units:
+            return df
+        
+        total = len(df)
+        with SessionPool(
+            worker_count(len(units)), location, username, password,
+            menu=("Box", "Agregar documentos"), headless=settings.HEADLESS
+        ) as pool:
+            executor = ParallelExecutor(pool.sessions, hedge=settings.HEDGING)
+            
+            for result in executor.map(self._fill_unit, units):
+                idx, run, _ = result.unit
+                self.ui.print_header(f"Paciente {idx + 1}/{total} - RUN: {run}")
+                
+                if result.error is not None:
+                    logger.error("Error procesando paciente %s: %s", run, result.error)
+                    metrics.record_error(result.error)
+                    self.ui.print_error(f"Error: {result.error}")
+                elif result.value is None:
+                    self.ui.print_warning("Paciente no encontrado")
+                else:
+                    self._apply_updates(df, idx, result.value)
+                    metrics.inc("sayen_patients_processed_total", stage="fill_data")
+        
+        return df
+    
+    def _fill_unit(self, scraper: WebScraperService, unit: Tuple) -> Optional[Dict[str, str]]:
+        """Adaptador de _fill_patient para el ejecutor paralelo."""
+        _, run, row = unit
+        return self._fill_patient(scraper, run, row)
+    
+    def _row_identity(self, row: pd.Series, run_col: str) -> Tuple[str, str]:
+        """Obtiene RUN y nombre de una fila."""
+        run = str(row.get(run_col, "")).strip() if not pd.isna(row.get(run_col)) else ""
+        nombre = str(row.get("NOMBRE", "")).strip() if not pd.isna(row.get("NOMBRE")) else ""
+        return run, nombre
+    
+    def _invalid_runs(self, df: pd.DataFrame, run_col: str, runs: pd.DataFrame) -> pd.Series:
+        """
+        Informa las filas cuyo RUN no tiene un dígito verificador válido.
+        
+        Las filas sin RUN no se consideran inválidas (se omiten como siempre).
+        
+        Args:
+            df: DataFrame con pacientes
+            run_col: Columna con el RUN
+            runs: Resultado de parse_rut_series sobre la columna
+        
+        Returns:
+            Máscara de las filas con RUN inválido
+        """
+        if not settings.VALIDATE_RUN:
+            return pd.Series(False, index=df.index)
+        
+        invalid = ~runs["VALIDO"] & ~empty_mask(df[run_col])
+        
+        if invalid.any():
+            metrics.inc("sayen_invalid_runs_total", int(invalid.sum()))
+            self.ui.print_warning(f"{invalid.sum()} filas con RUN inválido se omitirán:")
+            for idx in df.index[invalid]:
+                # Fila del Excel: encabezado en la fila 1
+                self.ui.print_warning(f"  → Fila {idx + 2}: {df.at[idx, run_col]}")
+            logger.warning("RUN inválidos omitidos: %s", df.loc[invalid, run_col].tolist())
+        
+        return invalid
+    
+    def _fill_from_cache(self, df: pd.DataFrame, keys: pd.Series, skip: pd.Series) -> pd.Series:
+        """
+        Completa sin abrir Rayen las filas cuyos datos ya están guardados localmente.
+        
+        Usa el registro de pacientes (SEXO, CONSEJERIA) y los textos de
+        anamnesis guardados por RUN y fecha (TIPO DE ATENCIÓN, DÉFICIT).
+        
+        Args:
+            df: DataFrame con pacientes
+            keys: Clave de RUN de cada fila (nula si el RUN no es válido)
+            skip: Filas que no se deben completar
+        
+        Returns:
+            Máscara de las filas completadas
+        """
+        served = pd.Series(False, index=df.index)
+        if not settings.PATIENT_REGISTRY or settings.FORCE_REFRESH:
+            return served
+        
+        candidates = keys.notna() & ~skip
+        # Una sola consulta por RUN distinto, aunque se repita en el archivo
+        if not patient_registry.get_many(keys[candidates].unique()):
+            return served
+        
+        if settings.ANAMNESIS_CACHE and "FECHA" in df.columns:
+            dated = candidates & ~empty_mask(df["FECHA"])
+            anamnesis_store.get_many(
+                (key, self._as_date(fecha)) for key, fecha in zip(keys[dated], df.loc[dated, "FECHA"])
+            )
+        
+        for idx in df.index[candidates]:
+            updates = self._cached_updates(df.loc[idx], keys[idx])
+            if updates is not None:
+                if updates:
+                    self._apply_updates(df, idx, updates)
+                metrics.inc("sayen_patients_processed_total", stage="fill_data")
+                served[idx] = True
+        
+        if served.any():
+            self.ui.print_success(f"{served.sum()} pacientes completados desde la caché local")
+        return served
+    
+    def _cached_updates(self, row: pd.Series, key) -> Optional[Dict[str, str]]:
+        """
+        Obtiene los datos de una fila desde el registro de pacientes y la anamnesis guardada.
+        
+        Args:
+            row: Fila del DataFrame
+            key: Clave de RUN (nula si el RUN no es válido)
+        
+        Returns:
+            Diccionario columna → valor (vacío si no hay nada que completar),
+            o None si la fila necesita consultar Rayen
+        """
+        if pd.isna(key) or not settings.PATIENT_REGISTRY or settings.FORCE_REFRESH:
+            return None
+        
+        registro = patient_registry.get(key)
+        if registro is None:
+            return None
+        
+        lme = registro.lme(date.today())
+        if lme is None:
+            return None
+        
+        # Sin sexo registrado la ficha se vuelve a leer si a la fila le falta
+        if registro.sexo is None and is_empty(row.get("SEXO")):
+            return None
+        
+        updates = {}
+        if registro.sexo:
+            updates["SEXO"] = registro.sexo.value
+        if lme:
+            updates["CONSEJERIA"] = "LME"
+        
+        # Con fecha y tipo o déficit por completar hace falta la anamnesis
+        fecha = row.get("FECHA")
+        if fecha and not is_empty(fecha):
+            if is_empty(row.get("TIPO DE ATENCIÓN")) or is_empty(row.get("DÉFICIT")):
+                anamnesis = self._stored_anamnesis(key, fecha)
+                if anamnesis is None:
+                    return None
+                updates.update(self._classify_anamnesis(anamnesis))
+        
+        return updates
+    
+    def _stored_anamnesis(self, key, fecha) -> Optional[Anamnesis]:
+        """Busca la anamnesis guardada de un RUN y fecha (None si no hay o está desactivada)."""
+        if pd.isna(key) or not settings.ANAMNESIS_CACHE or settings.FORCE_REFRESH:
+            return None
+        return anamnesis_store.get(key, self._as_date(fecha))
+    
+    @staticmethod
+    def _as_date(fecha) -> date:
+        """Convierte una celda FECHA (fecha o texto dd-mm-aaaa) en date."""
+        if isinstance(fecha, str):
+            return pd.to_datetime(fecha, dayfirst=True).date()
+        return pd.Timestamp(fecha).date()
+    
+    def _nsp_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Marca las filas que ya tienen tipo de atención NSP (una sola pasada por la columna)."""
+        if "TIPO DE ATENCIÓN" not in df.columns:
+            return pd.Series(False, index=df.index)
+        return normalize_series(df["TIPO DE ATENCIÓN"]) == "NSP"
+    
+    def _fill_patient(
+        self,
+        scraper: WebScraperService,
+        run: str,
+        row: pd.Series
+    ) -> Optional[Dict[str, str]]:
+        """
+        Obtiene desde Rayen los datos faltantes de un paciente.
+        
+        Args:
+            scraper: Servicio de scraping
+            run: RUN del paciente
+            row: Fila del DataFrame con datos del paciente
+        
+        Returns:
+            Diccionario columna → valor detectado, o None si no se encontró el paciente
+        """
+        with span("fill_data.patient", run=run):
+            # Busca el paciente
+            if not self._search_patient(scraper, run):
+                return None
+            scraper.check_cancelled()
+            
+            # Extrae información general (SEXO, CONSEJERIA)
+            updates = self._extract_patient_data(scraper, row, run)
+            scraper.check_cancelled()
+            
+            # Procesa anamnesis para TIPO DE ATENCIÓN y DÉFICIT
+            fecha = row.get("FECHA")
+            if fecha and not is_empty(fecha):
+                # Intenta obtener anamnesis con timeout corto
+                anamnesis_data = self._process_anamnesis_quick(scraper, fecha, run)
+                
+                if anamnesis_data:
+                    updates.update(anamnesis_data)
+                else:
+                    self.ui.print_warning("  → No se pudo analizar anamnesis (no disponible)")
+            else:
+                self.ui.print_warning("  → Sin fecha, omitiendo análisis de anamnesis")
+            
+            return updates
+    
+    def _apply_updates(self, df: pd.DataFrame, idx, updates: Dict[str, str]) -> None:
+        """
+        Aplica los datos detectados solo en las celdas vacías.
+        
+        Args:
+            df: DataFrame con pacientes
+            idx: Índice de la fila
+            updates: Diccionario columna → valor
+        """
+        for key, value in updates.items():
+            if key in df.columns and not is_empty(value):
+                if is_empty(df.at[idx, key]):
+                    column = df[key]
+                    # Las categóricas solo aceptan valores de sus categorías
+                    if isinstance(column.dtype, pd.CategoricalDtype) and value not in column.cat.categories:
+                        df[key] = column.cat.add_categories([value])
+                    df.at[idx, key] = value
+                    metrics.inc("sayen_cells_filled_total", column=key)
+                    self.ui.print_success(f"  → {key}: {value}")
+    
+    @timed("fill_data.search_patient")
     def _search_patient(self, scraper: WebScraperService, run: str) -> bool:
         """
         Busca un paciente por RUN.
@@ -251,7 +517,7 @@ class FillDataScript:
             search_input.clear()
             search_input.send_keys(run, Keys.ENTER)
             
-            time.sleep(2)
+            scraper.pause(2)
             
             # Busca "Seguimiento"
             popover_input = scraper.wait.until(
@@ -263,23 +529,28 @@ class FillDataScript:
             search_button = scraper.driver.find_element(By.ID, "buttonSearch")
             search_button.click()
             
-            time.sleep(2)
+            scraper.pause(2)
             return True
             
         except TimeoutException:
             return False
     
+    @timed("fill_data.extract_patient_data")
     def _extract_patient_data(
         self, 
         scraper: WebScraperService, 
-        row: pd.Series
+        row: pd.Series,
+        run: str = ""
     ) -> dict:
         """
         Extrae datos del paciente desde la ficha.
         
+        Lo leído (sexo y edad) se guarda en el registro local de pacientes.
+        
         Args:
             scraper: Servicio de scraping
             row: Fila del DataFrame con datos del paciente
+            run: RUN del paciente (clave del registro)
             
         Returns:
             Diccionario con datos extraídos
@@ -316,18 +587,33 @@ class FillDataScript:
             if edad_str and self.patient_service.should_assign_lme(edad_str):
                 data["CONSEJERIA"] = "LME"
             
+            # Guarda lo leído para no volver a abrir la ficha en otras ejecuciones
+            # (si la ficha no cargó no hay nada que recordar)
+            key = rut_key(run)
+            if settings.PATIENT_REGISTRY and key is not None and ("SEXO" in data or edad_str):
+                patient_registry.remember(
+                    key,
+                    Sexo(data["SEXO"]) if "SEXO" in data else None,
+                    parse_age_to_months(edad_str) if edad_str else None,
+                )
+        
         except Exception as e:
-            logger.error(f"Error extrayendo datos del paciente: {e}")
+            logger.error("Error extrayendo datos del paciente: %s", e)
         
         return data
     
-    def _process_anamnesis_quick(self, scraper: WebScraperService, fecha) -> Dict[str, str]:
+    @timed("fill_data.process_anamnesis")
+    def _process_anamnesis_quick(self, scraper: WebScraperService, fecha, run: str = "") -> Dict[str, str]:
         """
         Procesa la sección de anamnesis con timeout reducido.
         
+        Si los textos de esa fecha ya están guardados se clasifican sin
+        recorrer el árbol; si no, se leen de Rayen y se guardan.
+        
         Args:
             scraper: Servicio de scraping
             fecha: Fecha del registro
+            run: RUN del paciente (clave de la anamnesis guardada)
             
         Returns:
             Diccionario con tipo de atención y déficit detectados
@@ -341,6 +627,12 @@ class FillDataScript:
             else:
                 fecha_dt = fecha
             
+            key = rut_key(run)
+            stored = self._stored_anamnesis(key, fecha_dt) if key is not None else None
+            if stored is not None:
+                logger.debug("Anamnesis de %s del %s desde la caché local", run, fecha_dt)
+                return self._classify_anamnesis(stored)
+            
             fecha_str = fecha_dt.strftime("%d-%m-%Y")
             
             # Busca el nodo de la fecha en el árbol (timeout corto)
@@ -357,7 +649,7 @@ class FillDataScript:
                     EC.presence_of_element_located((By.XPATH, fecha_xpath))
                 )
             except TimeoutException:
-                logger.debug(f"Fecha {fecha_str} no encontrada en el árbol")
+                logger.debug("Fecha %s no encontrada en el árbol", fecha_str)
                 return data
             
             # Expande si es necesario
@@ -369,13 +661,13 @@ class FillDataScript:
                     By.XPATH, ".//button[contains(@class,'rct-collapse')]"
                 )
                 expand_btn.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
             except:
                 pass
             
             # Click en la fecha
             fecha_elem.click()
-            time.sleep(0.5)
+            scraper.pause(0.5)
             
             # Busca Anamnesis (timeout corto)
             anamnesis_xpath = "//div[contains(@class,'tree-mainText') and normalize-space(.)='Anamnesis']"
@@ -397,13 +689,13 @@ class FillDataScript:
                     By.XPATH, ".//button[contains(@class,'rct-collapse')]"
                 )
                 expand_btn_anam.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
             except:
                 pass
             
             # Click en Anamnesis
             anamnesis_elem.click()
-            time.sleep(0.5)
+            scraper.pause(0.5)
             
             # Extrae textos de anamnesis
             text_elements = scraper.driver.find_elements(
@@ -423,25 +715,44 @@ class FillDataScript:
                     elif text_upper.startswith("HISTORIAL DE LA ENFERMEDAD") or text_upper.startswith("HISTORIA DE LA ENFERMEDAD"):
                         historial = text
             
-            # Combina textos
-            combined_text = f"{motivo_consulta}\n{historial}".strip()
+            anamnesis = Anamnesis(motivo=motivo_consulta, historial=historial)
+            data = self._classify_anamnesis(anamnesis)
             
-            # Analiza el texto para detectar TIPO y DÉFICIT
-            if combined_text:
-                tipo, deficit = self.patient_service.analyze_anamnesis(combined_text)
-                
-                if tipo:
-                    data["TIPO DE ATENCIÓN"] = tipo.value
-                
-                # Solo añade déficit si el tipo no es NSP
-                if deficit and tipo != TipoAtencion.NSP:
-                    data["DÉFICIT"] = deficit
+            # Guarda los textos para clasificarlos otra vez sin recorrer el árbol
+            if anamnesis.texto and key is not None and settings.ANAMNESIS_CACHE:
+                anamnesis_store.put(key, self._as_date(fecha_dt), anamnesis)
             
         except Exception as e:
-            logger.error(f"Error procesando anamnesis: {e}")
+            logger.error("Error procesando anamnesis: %s", e)
+        
+        return data
+    
+    def _classify_anamnesis(self, anamnesis: Anamnesis) -> Dict[str, str]:
+        """
+        Detecta TIPO DE ATENCIÓN y DÉFICIT en los textos de anamnesis.
+        
+        Args:
+            anamnesis: Motivo de consulta e historia de la enfermedad
+        
+        Returns:
+            Diccionario con tipo de atención y déficit detectados
+        """
+        data = {}
+        
+        # Analiza el texto combinado para detectar TIPO y DÉFICIT
+        if anamnesis.texto:
+            tipo, deficit = self.patient_service.analyze_anamnesis(anamnesis.texto)
+            
+            if tipo:
+                data["TIPO DE ATENCIÓN"] = tipo.value
+            
+            # Solo añade déficit si el tipo no es NSP
+            if deficit and tipo != TipoAtencion.NSP:
+                data["DÉFICIT"] = deficit
         
         return data
     
+    @timed("fill_data.update_excel")
     def _update_excel(self, excel_path: str, df: pd.DataFrame) -> None:
         """
         Actualiza el archivo Excel con los datos completados.
@@ -483,7 +794,8 @@ class FillDataScript:
 def main():
     """Punto de entrada del script."""
     script = FillDataScript()
-    script.run()
+    with metrics_exporter(), profiled("fill_data", enabled=profile_requested()):
+        script.run()
 
 
 if __name__ == "__main__":
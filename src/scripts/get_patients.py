@@ -3,9 +3,9 @@ Script principal para obtener pacientes citados (p1).
 """
 import sys
 import re
-import time
+import threading
 from datetime import date, datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,11 +14,18 @@ from selenium.common.exceptions import TimeoutException
 from src.domain.models import Paciente, RangoFechas
 from src.services.scraper_service import WebScraperService
 from src.services.patient_service import PatientService
-from src.services.excel_service import ExcelService
+from src.services.excel_service import ExcelService, IncrementalExcelWriter
+from src.services.cache_service import DayCache
+from src.services.schedule_service import ScheduleService
+from src.services.parallel_service import SessionPool, ParallelExecutor, worker_count
 from src.ui.console import ConsoleUI
 from src.config.settings import settings
 from src.config.constants import MESES_ES
 from src.core.logging import get_logger
+from src.core.timing import timed, span
+from src.core.metrics import metrics, metrics_exporter
+from src.core.profiling import profiled, profile_requested
+from src.core.exceptions import OperationCancelled
 from src.core.utils import format_rut, clean_name
 
 
@@ -32,6 +39,8 @@ class GetPatientsScript:
         self.ui = ConsoleUI()
         self.patient_service = PatientService()
         self.excel_service = ExcelService()
+        self._schedules: Dict[str, ScheduleService] = {}
+        self._schedules_lock = threading.Lock()
     
     def run(self) -> None:
         """Ejecuta el script principal."""
@@ -42,27 +51,30 @@ class GetPatientsScript:
             # Obtiene credenciales
             location, username, password = self.ui.get_credentials()
             
-            # Inicia scraping
+            # Inicia scraping, escribiendo cada día apenas se extrae (el Excel
+            # se guarda al salir del bloque, también si la extracción falla)
             self.ui.print_info("Iniciando proceso de extracción...")
-            patients = self._scrape_patients(rango, location, username, password)
+            filename = f"pacientes_citados_{rango.sufijo_archivo}.xlsx"
+            with IncrementalExcelWriter(filename) as writer:
+                for _, day_patients in self.iter_patients_by_day(rango, location, username, password):
+                    writer.append(day_patients)
             
-            if not patients:
+            if not writer.rows:
                 self.ui.print_warning("No se encontraron pacientes en el rango especificado")
                 return
             
-            # Guarda resultados
-            filename = f"pacientes_citados_{rango.anio}_{rango.mes:02d}_{rango.dia_inicio:02d}_{rango.dia_fin:02d}.xlsx"
-            filepath = self.excel_service.save_patients(patients, filename)
-            
-            self.ui.print_success(f"Proceso completado. {len(patients)} pacientes guardados en {filepath}")
+            self.ui.print_success(f"Proceso completado. {writer.rows} pacientes guardados en {writer.filepath}")
             
         except KeyboardInterrupt:
             self.ui.print_warning("\nProceso interrumpido por el usuario")
             sys.exit(0)
         except Exception as e:
-            logger.error(f"Error en script: {e}", exc_info=True)
+            logger.error("Error en script: %s", e, exc_info=True)
+            metrics.record_error(e)
             self.ui.print_error(f"Error: {e}")
             sys.exit(1)
+        finally:
+            self.ui.report_run("get_patients")
     
     def _scrape_patients(
         self, 
@@ -83,7 +95,34 @@ class GetPatientsScript:
         Returns:
             Lista de pacientes encontrados
         """
-        patients = []
+        return [
+            paciente
+            for _, day_patients in self.iter_patients_by_day(rango, location, username, password)
+            for paciente in day_patients
+        ]
+    
+    def iter_patients_by_day(
+        self, 
+        rango: RangoFechas,
+        location: str,
+        username: str,
+        password: str
+    ) -> Iterator[Tuple[date, List[Paciente]]]:
+        """
+        Extrae los pacientes del rango entregando cada día apenas está listo.
+        
+        Args:
+            rango: Rango de fechas
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+            
+        Yields:
+            Tuplas (fecha, pacientes del día) en orden de fecha
+        """
+        if settings.WORKERS > 1:
+            yield from self._iter_patients_parallel(rango, location, username, password)
+            return
         
         with WebScraperService(headless=settings.HEADLESS) as scraper:
             # Login
@@ -92,25 +131,171 @@ class GetPatientsScript:
             # Navega a pacientes citados
             scraper.navigate_to_menu("Box", "Pacientes citados")
             
-            # Procesa cada fecha
-            for fecha in rango.get_dates():
-                self.ui.print_info(f"Procesando {fecha.strftime('%d-%m-%Y')}...")
+            yield from self.iter_days(scraper, self.plan_dates(rango, location))
+    
+    def plan_dates(self, rango: RangoFechas, location: str) -> List[date]:
+        """
+        Obtiene las fechas del rango que requieren consultar Rayen.
+        
+        Args:
+            rango: Rango de fechas
+            location: Ubicación
+            
+        Returns:
+            Fechas hábiles ordenadas, sin feriados ni días vacíos conocidos
+        """
+        return self._schedule(location).plan(rango)
+    
+    def _schedule(self, location: str) -> ScheduleService:
+        """Obtiene el planificador del centro (uno por centro, compartido entre sesiones)."""
+        with self._schedules_lock:
+            if location not in self._schedules:
+                self._schedules[location] = ScheduleService(location)
+            return self._schedules[location]
+    
+    def iter_days(
+        self,
+        scraper: WebScraperService,
+        dates: List[date]
+    ) -> Iterator[Tuple[date, List[Paciente]]]:
+        """
+        Extrae día a día usando una sesión ya posicionada en "Pacientes citados".
+        
+        Args:
+            scraper: Servicio de scraping
+            dates: Fechas a procesar
+            
+        Yields:
+            Tuplas (fecha, pacientes del día); omite fechas no disponibles o con error
+        
+        Raises:
+            OperationCancelled: Si se canceló la sesión (cancel_event)
+        """
+        for fecha in dates:
+            scraper.check_cancelled()
+            self.ui.print_info(f"Procesando {fecha.strftime('%d-%m-%Y')}...")
+            
+            try:
+                day_patients = self._scrape_day(scraper, fecha)
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                logger.error("Error procesando fecha %s: %s", fecha, e)
+                metrics.record_error(e)
+                self.ui.print_error(f"  → Error: {e}")
+                continue
+            
+            if day_patients is None:
+                self.ui.print_warning(f"  → Fecha no disponible")
+                continue
+            
+            self.ui.print_success(f"  → {len(day_patients)} pacientes encontrados")
+            metrics.inc("sayen_patients_processed_total", len(day_patients), stage="get_patients")
+            yield fecha, day_patients
+    
+    def _iter_patients_parallel(
+        self, 
+        rango: RangoFechas,
+        location: str,
+        username: str,
+        password: str
+    ) -> Iterator[Tuple[date, List[Paciente]]]:
+        """
+        Extrae repartiendo las fechas entre varias sesiones.
+        
+        Los días que terminan antes de tiempo se retienen hasta completar
+        los anteriores, de modo que la salida mantiene el orden de fechas.
+        
+        Args:
+            rango: Rango de fechas
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+            
+        Yields:
+            Tuplas (fecha, pacientes del día) en orden de fecha
+        """
+        dates = self.plan_dates(rango, location)
+        ready = {}
+        next_idx = 0
+        
+        with SessionPool(
+            worker_count(len(dates)), location, username, password,
+            menu=("Box", "Pacientes citados"), headless=settings.HEADLESS
+        ) as pool:
+            # Cada sesión avanza por un mes para no cambiar de mes en el calendario
+            executor = ParallelExecutor(
+                pool.sessions, hedge=settings.HEDGING, affinity=ScheduleService.shard_key
+            )
+            
+            for result in executor.map(self._scrape_day, dates):
+                fecha_str = result.unit.strftime('%d-%m-%Y')
                 
-                try:
-                    # Selecciona la fecha
-                    if self._select_date(scraper, fecha):
-                        # Extrae pacientes del día
-                        day_patients = self._extract_day_patients(scraper, fecha)
-                        patients.extend(day_patients)
-                        self.ui.print_success(f"  → {len(day_patients)} pacientes encontrados")
-                    else:
-                        self.ui.print_warning(f"  → Fecha no disponible")
-                except Exception as e:
-                    logger.error(f"Error procesando fecha {fecha}: {e}")
-                    self.ui.print_error(f"  → Error: {e}")
+                if result.error is not None:
+                    logger.error("Error procesando fecha %s: %s", result.unit, result.error)
+                    metrics.record_error(result.error)
+                    self.ui.print_error(f"{fecha_str} → Error: {result.error}")
+                elif result.value is None:
+                    self.ui.print_warning(f"{fecha_str} → Fecha no disponible")
+                else:
+                    self.ui.print_success(
+                        f"{fecha_str} → {len(result.value)} pacientes encontrados "
+                        f"({result.elapsed:.1f}s{', hedged' if result.hedged else ''})"
+                    )
+                    metrics.inc("sayen_patients_processed_total", len(result.value), stage="get_patients")
+                
+                ready[result.unit] = result.value if result.error is None else None
+                
+                # Entrega en orden todos los días consecutivos ya listos
+                while next_idx < len(dates) and dates[next_idx] in ready:
+                    fecha = dates[next_idx]
+                    day_patients = ready.pop(fecha)
+                    next_idx += 1
+                    if day_patients is not None:
+                        yield fecha, day_patients
+    
+    def _scrape_day(self, scraper: WebScraperService, fecha: date) -> Optional[List[Paciente]]:
+        """
+        Selecciona una fecha y extrae sus pacientes.
         
-        return patients
+        Args:
+            scraper: Servicio de scraping
+            fecha: Fecha a procesar
+            
+        Returns:
+            Lista de pacientes del día o None si la fecha no está disponible
+        """
+        with span("get_patients.day", fecha=fecha):
+            # Los días pasados se sirven desde caché sin tocar el navegador
+            cache = self._day_cache(scraper)
+            if cache and not DayCache.is_recent(fecha):
+                cached = cache.get(fecha)
+                if cached is not None:
+                    logger.debug("Día %s servido desde caché", fecha)
+                    return cached.patients
+            
+            if not self._select_date(scraper, fecha):
+                return None
+            return self._extract_day_patients(scraper, fecha)
+    
+    def _day_cache(self, scraper: WebScraperService) -> Optional[DayCache]:
+        """
+        Obtiene la caché de días del centro de la sesión.
+        
+        Returns:
+            DayCache o None si la caché está deshabilitada o se fuerza refresco
+        """
+        if not settings.DAY_CACHE or settings.FORCE_REFRESH:
+            return None
+        return DayCache(scraper.location)
+    
+    @staticmethod
+    def _shows_no_data(scraper: WebScraperService) -> bool:
+        """Verifica si la tabla de citados muestra el aviso de día sin registros."""
+        markers = scraper.driver.find_elements(By.XPATH, "//div[contains(@class, 'rt-noData')]")
+        return any(marker.is_displayed() for marker in markers)
     
+    @timed("get_patients.select_date")
     def _select_date(self, scraper: WebScraperService, fecha: date) -> bool:
         """
         Selecciona una fecha en el calendario.
@@ -152,13 +337,14 @@ class GetPatientsScript:
             )
             day_element.click()
             
-            time.sleep(2)  # Espera carga de datos
+            scraper.pause(2)  # Espera carga de datos
             return True
             
         except TimeoutException:
-            logger.debug(f"No se pudo seleccionar la fecha {fecha}")
+            logger.debug("No se pudo seleccionar la fecha %s", fecha)
             return False
     
+    @timed("get_patients.adjust_month_year")
     def _adjust_month_year(self, scraper: WebScraperService, year: int, month: int):
         """
         Ajusta el mes y año en el datepicker.
@@ -190,14 +376,14 @@ class GetPatientsScript:
                     By.CLASS_NAME, "react-datepicker__year-read-view"
                 )
                 year_selector.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
                 
                 year_option = scraper.driver.find_element(
                     By.XPATH,
                     f"//div[contains(@class, 'react-datepicker__year-option') and text()='{year}']"
                 )
                 year_option.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
             
             # Ajusta mes
             else:
@@ -205,14 +391,14 @@ class GetPatientsScript:
                     By.CLASS_NAME, "react-datepicker__month-read-view"
                 )
                 month_selector.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
                 
                 month_option = scraper.driver.find_element(
                     By.XPATH,
                     f"//div[contains(@class, 'react-datepicker__month-option') and text()='{month_name}']"
                 )
                 month_option.click()
-                time.sleep(0.5)
+                scraper.pause(0.5)
     
     def _extract_day_patients(self, scraper: WebScraperService, fecha: date) -> List[Paciente]:
         """
@@ -236,6 +422,9 @@ class GetPatientsScript:
                 By.XPATH, "//div[contains(@class, 'rt-tr') and @role='row']"
             )
             
+            # Primera pasada: nombre y estado de cada fila (sin abrir popovers)
+            table = []
+            unreadable = 0
             for idx, row in enumerate(rows):
                 try:
                     # Extrae celdas
@@ -249,20 +438,41 @@ class GetPatientsScript:
                     if not nombre:
                         continue
                     
+                    table.append((idx, row, nombre, cells[1].text.strip().lower()))
+                    
+                except Exception as e:
+                    logger.debug("Error leyendo fila %s: %s", idx, e)
+                    unreadable += 1
+                    continue
+            
+            # Una tabla sin filas solo cuenta como día vacío si cargó y muestra el
+            # aviso de que no hay registros (si no, puede que aún no se dibujara)
+            empty_day = not table and not unreadable and self._shows_no_data(scraper)
+            
+            # Recuerda los días pasados sin pacientes para no volver a consultarlos
+            if empty_day and not DayCache.is_recent(fecha):
+                self._schedule(scraper.location).learn_empty(fecha)
+            
+            # Si la tabla no cambió respecto a la caché, no abre popovers
+            fingerprint = DayCache.fingerprint((nombre, estado) for _, _, nombre, estado in table)
+            cache = self._day_cache(scraper)
+            if cache:
+                cached = cache.get(fecha)
+                if cached is not None and cached.fingerprint == fingerprint:
+                    logger.debug("Tabla del %s sin cambios, usando caché", fecha)
+                    return cached.patients
+            
+            # Segunda pasada: popover de cada fila
+            failed = 0
+            for idx, row, nombre, estado in table:
+                scraper.check_cancelled()
+                
+                try:
                     # Verifica estado (NSP)
-                    estado = cells[1].text.strip().lower()
                     tipo_atencion = "NSP" if "no se present" in estado else "ASISTE"
                     
-                    # Click en la fila para abrir popover
-                    row.click()
-                    
-                    # Espera el popover
-                    scraper.wait.until(
-                        EC.visibility_of_element_located((By.CLASS_NAME, "popover-body"))
-                    )
-                    
-                    # Extrae información del popover
-                    popover_text = scraper.driver.find_element(By.CLASS_NAME, "popover-body").text
+                    # Abre el popover de la fila y extrae su información
+                    popover_text = self._read_popover(scraper, row)
                     
                     # Extrae RUN
                     run = self._extract_run(popover_text)
@@ -286,14 +496,43 @@ class GetPatientsScript:
                     patients.append(paciente)
                     
                 except Exception as e:
-                    logger.debug(f"Error procesando fila {idx}: {e}")
+                    failed += 1
+                    logger.debug("Error procesando fila %s: %s", idx, e)
                     continue
             
+            # Solo se guardan en caché los días extraídos por completo
+            if settings.DAY_CACHE and not failed and not unreadable and (patients or empty_day):
+                DayCache(scraper.location).put(fecha, fingerprint, patients)
+            
+        except OperationCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Error extrayendo pacientes del día: {e}")
+            logger.error("Error extrayendo pacientes del día: %s", e)
         
         return patients
     
+    @timed("get_patients.popover")
+    def _read_popover(self, scraper: WebScraperService, row) -> str:
+        """
+        Abre el popover de una fila y obtiene su texto.
+        
+        Args:
+            scraper: Servicio de scraping
+            row: Fila de la tabla
+            
+        Returns:
+            Texto del popover
+        """
+        # Click en la fila para abrir popover
+        row.click()
+        
+        # Espera el popover
+        scraper.wait.until(
+            EC.visibility_of_element_located((By.CLASS_NAME, "popover-body"))
+        )
+        
+        return scraper.driver.find_element(By.CLASS_NAME, "popover-body").text
+    
     def _extract_run(self, text: str) -> str:
         """Extrae el RUN del texto del popover."""
         # Busca formato con guión
@@ -326,7 +565,8 @@ class GetPatientsScript:
 def main():
     """Punto de entrada del script."""
     script = GetPatientsScript()
-    script.run()
+    with metrics_exporter(), profiled("get_patients", enabled=profile_requested()):
+        script.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+"""
+Script combinado: obtiene pacientes citados y completa sus datos (p1 + p2).
+
+Usa una sola sesión autenticada (o un pool de sesiones) y escribe el Excel
+una única vez al final.
+"""
+import sys
+import queue
+import threading
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.domain.models import Paciente, RangoFechas, TipoAtencion
+from src.services.scraper_service import WebScraperService
+from src.services.patient_service import PatientService
+from src.services.excel_service import ExcelService
+from src.services.parallel_service import SessionPool, ParallelExecutor, PENDING, worker_count
+from src.scripts.get_patients import GetPatientsScript
+from src.scripts.fill_data import FillDataScript
+from src.ui.console import ConsoleUI
+from src.config.settings import settings
+from src.core.logging import get_logger
+from src.core.exceptions import OperationCancelled
+from src.core.metrics import metrics, metrics_exporter
+from src.core.profiling import profiled, profile_requested
+
+
+logger = get_logger(__name__)
+
+
+class PipelineScript:
+    """Script para obtener pacientes citados y completar sus datos en una sola ejecución."""
+    
+    def __init__(self):
+        self.ui = ConsoleUI()
+        self.patient_service = PatientService()
+        self.excel_service = ExcelService()
+        self.getter = GetPatientsScript()
+        self.filler = FillDataScript()
+    
+    def run(self) -> None:
+        """Ejecuta el script principal."""
+        try:
+            # Solicita rango de fechas
+            rango = self.ui.request_date_range()
+            
+            # Obtiene credenciales
+            location, username, password = self.ui.get_credentials()
+            
+            # Extrae y completa
+            self.ui.print_info("Iniciando extracción y completado de datos...")
+            if settings.WORKERS > 1:
+                patients = self._run_pool(rango, location, username, password)
+            else:
+                patients = self._run_single(rango, location, username, password)
+            
+            if not patients:
+                self.ui.print_warning("No se encontraron pacientes en el rango especificado")
+                return
+            
+            # Guarda resultados (única escritura)
+            filename = f"pacientes_completos_{rango.sufijo_archivo}.xlsx"
+            filepath = self.excel_service.save_patients(patients, filename)
+            
+            self.ui.print_success(f"Proceso completado. {len(patients)} pacientes guardados en {filepath}")
+        
+        except KeyboardInterrupt:
+            self.ui.print_warning("\nProceso interrumpido por el usuario")
+            sys.exit(0)
+        except Exception as e:
+            logger.error("Error en script: %s", e, exc_info=True)
+            metrics.record_error(e)
+            self.ui.print_error(f"Error: {e}")
+            sys.exit(1)
+        finally:
+            self.ui.report_run("pipeline")
+    
+    def _run_single(
+        self,
+        rango: RangoFechas,
+        location: str,
+        username: str,
+        password: str
+    ) -> List[Paciente]:
+        """
+        Extrae y completa usando una única sesión.
+        
+        Args:
+            rango: Rango de fechas
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+        
+        Returns:
+            Lista de pacientes completados
+        """
+        patients = []
+        
+        with WebScraperService(headless=settings.HEADLESS) as scraper:
+            scraper.login(location, username, password)
+            
+            # Etapa 1: pacientes citados
+            scraper.navigate_to_menu("Box", "Pacientes citados")
+            for _, day_patients in self.getter.iter_days(scraper, self.getter.plan_dates(rango, location)):
+                patients.extend(day_patients)
+            
+            # Etapa 2: completado en la misma sesión
+            scraper.navigate_to_menu("Box", "Agregar documentos")
+            for paciente in patients:
+                if paciente.tipo_atencion == TipoAtencion.NSP:
+                    continue
+                
+                try:
+                    self._report_fill(paciente, self._fill_unit(scraper, paciente))
+                except Exception as e:
+                    logger.error("Error procesando paciente %s: %s", paciente.run, e)
+                    metrics.record_error(e)
+                    self.ui.print_error(f"{paciente.run} → Error: {e}")
+        
+        return patients
+    
+    def _run_pool(
+        self,
+        rango: RangoFechas,
+        location: str,
+        username: str,
+        password: str
+    ) -> List[Paciente]:
+        """
+        Extrae con una sesión y completa en paralelo con el resto del pool.
+        
+        Los pacientes pasan a la etapa de completado apenas se extrae su día.
+        
+        Args:
+            rango: Rango de fechas
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+        
+        Returns:
+            Lista de pacientes completados
+        """
+        patients: List[Paciente] = []
+        stream: "queue.Queue[Optional[Paciente]]" = queue.Queue()
+        dates = self.getter.plan_dates(rango, location)
+        
+        with WebScraperService(headless=settings.HEADLESS) as extractor:
+            extractor.login(location, username, password)
+            extractor.navigate_to_menu("Box", "Pacientes citados")
+            
+            producer = threading.Thread(
+                target=self._produce,
+                args=(extractor, dates, patients, stream),
+                name="sayen-extractor",
+                daemon=True
+            )
+            producer.start()
+            
+            try:
+                # Abre las sesiones de completado mientras la extracción avanza
+                with SessionPool(
+                    worker_count(settings.WORKERS - 1), location, username, password,
+                    menu=("Box", "Agregar documentos"), headless=settings.HEADLESS
+                ) as pool:
+                    executor = ParallelExecutor(pool.sessions, hedge=settings.HEDGING)
+                    
+                    units = self._stream_units(stream, executor.poll_interval)
+                    for result in executor.map(self._fill_unit, units):
+                        if result.error is not None:
+                            logger.error("Error procesando paciente %s: %s", result.unit.run, result.error)
+                            metrics.record_error(result.error)
+                            self.ui.print_error(f"{result.unit.run} → Error: {result.error}")
+                        else:
+                            self._report_fill(result.unit, result.value)
+            finally:
+                extractor.cancel_event.set()
+                producer.join()
+        
+        patients.sort(key=lambda p: p.fecha)
+        return patients
+    
+    def _produce(
+        self,
+        extractor: WebScraperService,
+        dates: List[date],
+        patients: List[Paciente],
+        stream: "queue.Queue[Optional[Paciente]]"
+    ) -> None:
+        """Extrae cada día y publica sus pacientes en la cola de completado."""
+        try:
+            for _, day_patients in self.getter.iter_days(extractor, dates):
+                for paciente in day_patients:
+                    patients.append(paciente)
+                    if paciente.tipo_atencion != TipoAtencion.NSP:
+                        stream.put(paciente)
+        except OperationCancelled:
+            # El completado terminó (o falló) antes que la extracción
+            logger.info("Extracción detenida: el completado ya no recibe pacientes")
+        finally:
+            stream.put(None)
+    
+    @staticmethod
+    def _stream_units(stream: "queue.Queue[Optional[Paciente]]", timeout: float) -> Iterator[object]:
+        """
+        Entrega los pacientes de la cola hasta el fin de la extracción.
+        
+        Si en `timeout` segundos no llega ninguno entrega PENDING, para que el
+        ejecutor informe los resultados terminados y duplique rezagadas
+        mientras se extrae el día siguiente.
+        """
+        while True:
+            try:
+                paciente = stream.get(timeout=timeout)
+            except queue.Empty:
+                yield PENDING
+                continue
+            if paciente is None:
+                return
+            yield paciente
+    
+    def _fill_unit(self, scraper: WebScraperService, paciente: Paciente) -> Optional[Dict[str, str]]:
+        """Completa los datos de un paciente en la sesión indicada."""
+        row = pd.Series(paciente.to_dict())
+        return self.filler._fill_patient(scraper, paciente.run, row)
+    
+    def _report_fill(self, paciente: Paciente, updates: Optional[Dict[str, str]]) -> None:
+        """Aplica al paciente los datos completados e informa el resultado."""
+        if updates is None:
+            self.ui.print_warning(f"{paciente.run} → Paciente no encontrado")
+            return
+        
+        applied = self.patient_service.merge_updates(paciente, updates)
+        metrics.inc("sayen_patients_processed_total", stage="fill_data")
+        for key in applied:
+            metrics.inc("sayen_cells_filled_total", column=key)
+        details = ", ".join(f"{key}: {value}" for key, value in applied.items())
+        self.ui.print_success(f"{paciente.run} → {details or 'sin datos nuevos'}")
+
+
+def main():
+    """Punto de entrada del script."""
+    script = PipelineScript()
+    with metrics_exporter(), profiled("pipeline", enabled=profile_requested()):
+        script.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Script para generar Excel sintéticos para pruebas de carga.
+
+Uso:
+    python -m src.scripts.synthetic_data --rows 100000 --shape fill --seed 7
+"""
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from src.services.synthetic_service import SyntheticDataGenerator
+from src.ui.console import ConsoleUI
+from src.config.settings import settings
+
+
+def main(argv=None) -> int:
+    """Punto de entrada del script."""
+    parser = argparse.ArgumentParser(description="Genera pacientes sintéticos con la forma de Rayen")
+    parser.add_argument("--rows", type=int, default=1_000, help="cantidad de pacientes")
+    parser.add_argument(
+        "--shape", choices=["citados", "fill", "ambos"], default="ambos",
+        help="citados = salida de get_patients, fill = entrada de fill_data"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="semilla para reproducir los datos")
+    parser.add_argument("--per-day", type=int, default=25, help="pacientes promedio por día")
+    parser.add_argument("--start", default="03-03-2025", help="primer día (dd-mm-aaaa)")
+    parser.add_argument("--anamnesis", action="store_true", help="agrega la columna ANAMNESIS (entrada fill)")
+    parser.add_argument("--output", type=Path, default=settings.DATA_DIR / "synthetic", help="directorio destino")
+    args = parser.parse_args(argv)
+    
+    ui = ConsoleUI()
+    inicio = datetime.strptime(args.start, "%d-%m-%Y").date()
+    shapes = ["citados", "fill"] if args.shape == "ambos" else [args.shape]
+    
+    for shape in shapes:
+        # Cada forma parte de la misma semilla para que ambas describan los mismos pacientes
+        generator = SyntheticDataGenerator(args.seed)
+        path = args.output / f"sintetico_{shape}_{args.rows}_s{args.seed}.xlsx"
+        ui.print_info(f"Generando {args.rows} pacientes ({shape})...")
+        
+        if shape == "citados":
+            files = generator.write_citados(path, args.rows, inicio=inicio, por_dia=args.per_day)
+        else:
+            files = generator.write_fill_input(
+                path, args.rows, anamnesis=args.anamnesis, inicio=inicio, por_dia=args.per_day
+            )
+        
+        for file in files:
+            ui.print_success(f"  → {file}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
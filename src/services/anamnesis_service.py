@@ -0,0 +1,157 @@
+"""
+Almacén local del texto de anamnesis por paciente y fecha.
+
+fill_data guarda, comprimidos con zlib, los textos "MOTIVO DE CONSULTA" e
+"HISTORIA DE LA ENFERMEDAD" que lee del árbol de Rayen. Las ejecuciones
+siguientes (o un cambio en TIPOS_ATENCION o TIPOS_DEFICIT) vuelven a
+clasificarlos desde aquí sin recorrer el árbol, mientras el texto no
+supere su vigencia.
+"""
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.config.settings import settings
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Límite de parámetros por consulta (SQLITE_MAX_VARIABLE_NUMBER en versiones antiguas)
+_CHUNK = 900
+# Separa motivo e historia dentro del texto comprimido
+_SEPARATOR = "\x00"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS anamnesis (
+    run_key INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    texto BLOB NOT NULL,
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (run_key, fecha)
+)
+"""
+
+AnamnesisKey = Tuple[int, date]
+
+
+@dataclass
+class Anamnesis:
+    """Textos de anamnesis de una atención."""
+    motivo: str
+    historial: str
+    
+    @property
+    def texto(self) -> str:
+        """Texto combinado que se clasifica."""
+        return f"{self.motivo}\n{self.historial}".strip()
+
+
+class AnamnesisStore:
+    """Textos de anamnesis comprimidos por (clave de RUN, fecha de atención)."""
+    
+    def __init__(self, path: Optional[Path] = None, ttl_days: Optional[int] = None):
+        """
+        Inicializa el almacén (la base se abre en el primer uso).
+        
+        Args:
+            path: Archivo SQLite (por defecto CACHE_DIR/anamnesis.sqlite3)
+            ttl_days: Días de vigencia de un texto (por defecto ANAMNESIS_CACHE_TTL_DAYS)
+        """
+        self.path = Path(path or settings.CACHE_DIR / "anamnesis.sqlite3")
+        self.ttl_days = settings.ANAMNESIS_CACHE_TTL_DAYS if ttl_days is None else ttl_days
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Consultas ya hechas en esta ejecución (None = no está o está vencido)
+        self._memo: Dict[AnamnesisKey, Optional[Anamnesis]] = {}
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+            # Descarta los textos vencidos al abrir
+            deleted = self._conn.execute("DELETE FROM anamnesis WHERE guardado < ?", (self._limit(),)).rowcount
+            self._conn.commit()
+            if deleted:
+                logger.info("%s textos de anamnesis vencidos eliminados", deleted)
+        return self._conn
+    
+    def _limit(self) -> str:
+        return (datetime.now() - timedelta(days=self.ttl_days)).isoformat(timespec="seconds")
+    
+    def get_many(self, keys: Iterable[AnamnesisKey]) -> Dict[AnamnesisKey, Anamnesis]:
+        """
+        Busca varias atenciones con una consulta por bloque de RUN.
+        
+        Args:
+            keys: Pares (clave de RUN, fecha)
+        
+        Returns:
+            Textos vigentes encontrados, por par
+        """
+        keys = [(int(run_key), fecha) for run_key, fecha in keys]
+        with self._lock:
+            pending = {key for key in keys if key not in self._memo}
+            if pending:
+                conn = self._connect()
+                runs = sorted({run_key for run_key, _ in pending})
+                for key in pending:
+                    self._memo[key] = None
+                for start in range(0, len(runs), _CHUNK):
+                    chunk = runs[start:start + _CHUNK]
+                    rows = conn.execute(
+                        "SELECT run_key, fecha, texto FROM anamnesis "
+                        f"WHERE guardado >= ? AND run_key IN ({','.join('?' * len(chunk))})",
+                        [self._limit(), *chunk],
+                    )
+                    for run_key, fecha, texto in rows:
+                        key = (run_key, date.fromisoformat(fecha))
+                        if key in pending:
+                            self._memo[key] = _decompress(texto)
+            
+            return {key: self._memo[key] for key in keys if self._memo[key] is not None}
+    
+    def get(self, run_key: int, fecha: date) -> Optional[Anamnesis]:
+        """Busca una atención (ver get_many)."""
+        return self.get_many([(run_key, fecha)]).get((int(run_key), fecha))
+    
+    def put(self, run_key: int, fecha: date, anamnesis: Anamnesis) -> None:
+        """
+        Guarda los textos de una atención.
+        
+        Args:
+            run_key: Clave de RUN
+            fecha: Fecha de la atención
+            anamnesis: Textos leídos de Rayen
+        """
+        texto = zlib.compress(f"{anamnesis.motivo}{_SEPARATOR}{anamnesis.historial}".encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO anamnesis (run_key, fecha, texto, guardado) VALUES (?, ?, ?, ?)",
+                (int(run_key), fecha.isoformat(), texto, datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.commit()
+            self._memo[(int(run_key), fecha)] = anamnesis
+    
+    def close(self) -> None:
+        """Cierra la base de datos."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._memo.clear()
+
+
+def _decompress(texto: bytes) -> Anamnesis:
+    motivo, _, historial = zlib.decompress(texto).decode("utf-8").partition(_SEPARATOR)
+    return Anamnesis(motivo=motivo, historial=historial)
+
+
+# Instancia global
+anamnesis_store = AnamnesisStore()
@@ -0,0 +1,124 @@
+"""
+Servicio de caché en disco para los días extraídos de Rayen.
+"""
+import re
+import json
+import hashlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Iterable, Tuple
+from dataclasses import dataclass
+
+from src.domain.models import Paciente
+from src.core.logging import get_logger
+from src.config.settings import settings
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedDay:
+    """Día almacenado en caché."""
+    fecha: date
+    fingerprint: str
+    patients: List[Paciente]
+
+
+class DayCache:
+    """Caché de pacientes extraídos por centro y fecha."""
+
+    def __init__(self, location: str, cache_dir: Optional[Path] = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            location: Centro de salud (clave de la caché)
+            cache_dir: Directorio base de la caché
+        """
+        slug = re.sub(r"[^\w.-]", "_", location.strip().lower()) or "default"
+        self.directory = (cache_dir or settings.CACHE_DIR) / "days" / slug
+
+    @staticmethod
+    def fingerprint(rows: Iterable[Tuple[str, str]]) -> str:
+        """
+        Calcula la huella de la tabla de un día.
+
+        Args:
+            rows: Pares (nombre, estado) de cada fila
+
+        Returns:
+            Hash hexadecimal de las filas
+        """
+        digest = hashlib.sha1()
+        for nombre, estado in rows:
+            digest.update(f"{nombre}\x1f{estado}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def is_recent(fecha: date) -> bool:
+        """Verifica si la fecha está dentro de la ventana que se revalida siempre."""
+        return fecha >= date.today() - timedelta(days=settings.DAY_CACHE_RECENT_DAYS)
+
+    def get(self, fecha: date) -> Optional[CachedDay]:
+        """
+        Obtiene un día desde la caché.
+
+        Args:
+            fecha: Fecha a buscar
+
+        Returns:
+            Día almacenado o None si no existe, está dañado o venció
+        """
+        path = self._path(fecha)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            saved_at = datetime.fromisoformat(data["saved_at"])
+            if saved_at < datetime.now() - timedelta(days=settings.DAY_CACHE_TTL_DAYS):
+                logger.debug("Caché de %s vencida (guardada el %s)", fecha, saved_at)
+                return None
+
+            return CachedDay(
+                fecha=fecha,
+                fingerprint=data["fingerprint"],
+                patients=[Paciente.from_dict(p) for p in data["patients"]]
+            )
+        except Exception as e:
+            logger.warning("Caché dañada para %s, se ignora: %s", fecha, e)
+            return None
+
+    def put(self, fecha: date, fingerprint: str, patients: List[Paciente]) -> None:
+        """
+        Guarda un día en la caché.
+
+        Args:
+            fecha: Fecha del día
+            fingerprint: Huella de la tabla
+            patients: Pacientes extraídos
+        """
+        path = self._path(fecha)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = {
+            "fecha": fecha.isoformat(),
+            "fingerprint": fingerprint,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "patients": [p.to_dict() for p in patients],
+        }
+
+        # Escritura atómica para no dejar archivos a medio escribir
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+        logger.debug("Día %s guardado en caché (%s pacientes)", fecha, len(patients))
+
+    def _path(self, fecha: date) -> Path:
+        """Ruta del archivo de caché de una fecha."""
+        return self.directory / f"{fecha.isoformat()}.json"
@@ -0,0 +1,120 @@
+"""
+Clasificadores por palabras clave compilados una sola vez.
+
+Cada clasificador arma al importarse una única expresión regular con todas
+sus palabras clave y el mapa palabra → valor final (enum o texto), y
+mantiene la precedencia de las búsquedas originales: gana la palabra de
+mayor prioridad presente en cualquier parte del texto, no la primera que
+aparece.
+"""
+import re
+from typing import Dict, Generic, Iterable, List, Optional, TypeVar, Union
+
+import pandas as pd
+
+from src.domain.models import TipoAtencion, Sexo
+from src.core.utils import normalize_text
+from src.config.constants import TIPOS_ATENCION, TIPOS_DEFICIT
+
+
+V = TypeVar("V")
+
+
+class KeywordClassifier(Generic[V]):
+    """Asigna a un texto el valor de la palabra clave de mayor prioridad que contiene."""
+    
+    def __init__(self, keywords: Dict[str, V]):
+        """
+        Compila el clasificador.
+        
+        Args:
+            keywords: Palabra clave (ya normalizada) → valor, de mayor a menor prioridad
+        """
+        self._keywords = list(keywords)
+        self._values = [keywords[keyword] for keyword in self._keywords]
+        self._priority = {keyword: i for i, keyword in enumerate(self._keywords)}
+        
+        # En cada posición la alternancia prueba primero la palabra de mayor prioridad
+        self._pattern = re.compile("|".join(re.escape(keyword) for keyword in self._keywords))
+    
+    def match(self, normalized: str) -> Optional[V]:
+        """
+        Clasifica un texto ya normalizado.
+        
+        Args:
+            normalized: Texto en mayúsculas y sin acentos
+        
+        Returns:
+            Valor de la palabra clave de mayor prioridad presente, o None
+        """
+        best = None
+        found = self._pattern.search(normalized)
+        while found is not None:
+            priority = self._priority[found.group()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+            # Sigue desde el carácter siguiente: las palabras pueden solaparse
+            found = self._pattern.search(normalized, found.start() + 1)
+        return None if best is None else self._values[best]
+    
+    def classify(self, text: str) -> Optional[V]:
+        """Normaliza y clasifica un texto."""
+        return self.match(normalize_text(text))
+    
+    def classify_many(self, texts: Union[Iterable[str], pd.Series]) -> Union[List[Optional[V]], pd.Series]:
+        """
+        Clasifica varios textos en una sola llamada.
+        
+        Los valores vacíos (None, NaN, "") se clasifican como None y cada
+        texto distinto se clasifica una sola vez.
+        
+        Args:
+            texts: Lista de textos o Series de pandas
+        
+        Returns:
+            Lista de valores, o Series con el mismo índice si se entregó una Series
+        """
+        if isinstance(texts, pd.Series):
+            return pd.Series(self.classify_many(texts.tolist()), index=texts.index, dtype="object")
+        
+        cache: Dict[str, Optional[V]] = {}
+        results = []
+        for text in texts:
+            text = as_text(text)
+            if text not in cache:
+                cache[text] = self.classify(text)
+            results.append(cache[text])
+        return results
+
+
+def as_text(value) -> str:
+    """Convierte una celda en texto ("" para None y NaN)."""
+    if isinstance(value, str):
+        return value
+    if value is None or pd.isna(value):
+        return ""
+    return str(value)
+
+
+def _attention_keywords() -> Dict[str, TipoAtencion]:
+    """Palabras de TIPOS_ATENCION de la más larga a la más corta, con su enum."""
+    by_value = {tipo.value: tipo for tipo in TipoAtencion}
+    return {
+        key: by_value[TIPOS_ATENCION[key]]
+        for key in sorted(TIPOS_ATENCION, key=len, reverse=True)
+        if TIPOS_ATENCION[key] in by_value
+    }
+
+
+# Instancias globales
+attention_classifier: KeywordClassifier[TipoAtencion] = KeywordClassifier(_attention_keywords())
+deficit_classifier: KeywordClassifier[str] = KeywordClassifier({deficit: deficit for deficit in TIPOS_DEFICIT})
+sex_classifier: KeywordClassifier[Sexo] = KeywordClassifier({
+    "HOMBRE": Sexo.MASCULINO,
+    "MASCULINO": Sexo.MASCULINO,
+    "VARON": Sexo.MASCULINO,
+    "MUJER": Sexo.FEMENINO,
+    "FEMENINO": Sexo.FEMENINO,
+})
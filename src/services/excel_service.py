@@ -1,20 +1,51 @@
 """
 Servicio para manejo de archivos Excel.
 """
+from datetime import date, datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill
 
-from src.domain.models import Paciente
+from src.domain.models import Paciente, Sexo, TipoAtencion
 from src.core.logging import get_logger
 from src.core.exceptions import ExcelProcessingError
-from src.core.utils import is_empty
+from src.core.utils import is_empty, empty_mask, map_distinct, run_text, parse_rut_series
+from src.config.constants import TIPOS_DEFICIT, RANGOS_EDAD
 
 
 logger = get_logger(__name__)
 
+# Orden de columnas del Excel de pacientes citados
+EXPORT_COLUMNS = [
+    "FECHA", "VACIO1", "VACIO2", "SECTOR", "NOMBRE",
+    "RUN", "TIPO DE ATENCIÓN", "EDAD", "DÉFICIT", "SEXO", "CONSEJERIA"
+]
+
+# Columnas de pocos valores distintos que se cargan como categóricas, con
+# las categorías conocidas de antemano (fill_data escribe estos valores)
+CATEGORY_COLUMNS = {
+    "SEXO": [s.value for s in Sexo],
+    "SECTOR": [],
+    "EDAD": list(RANGOS_EDAD.values()),
+    "TIPO DE ATENCIÓN": [t.value for t in TipoAtencion],
+    "DÉFICIT": list(TIPOS_DEFICIT),
+    "CONSEJERIA": ["LME"],
+}
+
+# Columna con la clave entera del RUN que agrega apply_schema
+RUN_KEY_COLUMN = "RUN_KEY"
+
+# Texto de exportación de cada valor de enum
+_ENUM_TEXT = {None: "", **{e: e.value for e in Sexo}, **{e: e.value for e in TipoAtencion}}
+
+# Colores alternados por fecha
+YELLOW_FILL = PatternFill(start_color="FFF200", end_color="FFF200", fill_type="solid")
+PINK_FILL = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+
 
 class ExcelService:
     """Servicio para operaciones con archivos Excel."""
@@ -37,26 +68,12 @@ class ExcelService:
             Ruta del archivo guardado
         """
         try:
-            # Convierte pacientes a DataFrame
-            data = [p.to_dict() for p in patients]
-            df = pd.DataFrame(data)
-            
-            # Agrega columnas vacías si es necesario
-            for col in ["VACIO1", "VACIO2"]:
-                if col not in df.columns:
-                    df.insert(1, col, "")
-            
-            # Ordena columnas
-            column_order = [
-                "FECHA", "VACIO1", "VACIO2", "SECTOR", "NOMBRE",
-                "RUN", "TIPO DE ATENCIÓN", "EDAD", "DÉFICIT", "SEXO", "CONSEJERIA"
-            ]
-            df = df.reindex(columns=[c for c in column_order if c in df.columns])
+            df = ExcelService.patients_frame(patients)
             
             # Guarda Excel
             filepath = Path(filename)
             df.to_excel(filepath, index=False)
-            logger.info(f"Excel guardado: {filepath}")
+            logger.info("Excel guardado: %s", filepath)
             
             # Aplica colores si se solicita
             if apply_colors:
@@ -65,9 +82,46 @@ class ExcelService:
             return filepath
             
         except Exception as e:
-            logger.error(f"Error guardando Excel: {e}")
+            logger.error("Error guardando Excel: %s", e)
             raise ExcelProcessingError(f"Error guardando Excel: {e}")
     
+    @staticmethod
+    def patients_frame(patients: List[Paciente]) -> pd.DataFrame:
+        """
+        Construye el DataFrame de exportación columna por columna.
+        
+        Equivale a armar un to_dict por paciente, pero cada fecha distinta
+        se formatea una sola vez y los enums se traducen con una tabla.
+        
+        Args:
+            patients: Lista de pacientes
+        
+        Returns:
+            DataFrame con las columnas de EXPORT_COLUMNS, en ese orden
+        """
+        fechas: Dict[Optional[date], str] = {None: ""}
+        fecha_col = []
+        for paciente in patients:
+            texto = fechas.get(paciente.fecha)
+            if texto is None:
+                texto = fechas[paciente.fecha] = paciente.fecha.strftime("%d-%m-%Y") if paciente.fecha else ""
+            fecha_col.append(texto)
+        
+        vacio = [""] * len(patients)
+        return pd.DataFrame({
+            "FECHA": fecha_col,
+            "VACIO1": vacio,
+            "VACIO2": vacio,
+            "SECTOR": [p.sector or "" for p in patients],
+            "NOMBRE": [p.nombre for p in patients],
+            "RUN": [p.run for p in patients],
+            "TIPO DE ATENCIÓN": [_ENUM_TEXT[p.tipo_atencion] for p in patients],
+            "EDAD": [p.edad_rango or "" for p in patients],
+            "DÉFICIT": [p.deficit or "" for p in patients],
+            "SEXO": [_ENUM_TEXT[p.sexo] for p in patients],
+            "CONSEJERIA": [p.consejeria or "" for p in patients],
+        }, columns=EXPORT_COLUMNS)
+    
     @staticmethod
     def _apply_date_colors(filepath: Path) -> None:
         """Aplica colores alternados por fecha en la columna FECHA."""
@@ -75,10 +129,6 @@ class ExcelService:
             wb = load_workbook(filepath)
             ws = wb.active
             
-            # Define colores
-            yellow_fill = PatternFill(start_color="FFF200", end_color="FFF200", fill_type="solid")
-            pink_fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
-            
             # Alterna colores por fecha
             last_date = None
             use_yellow = True
@@ -90,21 +140,22 @@ class ExcelService:
                     use_yellow = not use_yellow
                     last_date = current_date
                 
-                ws[f"A{row}"].fill = yellow_fill if use_yellow else pink_fill
+                ws[f"A{row}"].fill = YELLOW_FILL if use_yellow else PINK_FILL
             
             wb.save(filepath)
             logger.debug("Colores aplicados al Excel")
             
         except Exception as e:
-            logger.warning(f"No se pudieron aplicar colores: {e}")
+            logger.warning("No se pudieron aplicar colores: %s", e)
     
     @staticmethod
-    def load_patients(filepath: str) -> pd.DataFrame:
+    def load_patients(filepath: str, typed: bool = False) -> pd.DataFrame:
         """
         Carga pacientes desde un archivo Excel.
         
         Args:
             filepath: Ruta del archivo Excel
+            typed: Si aplicar los tipos del libro de pacientes (ver apply_schema)
             
         Returns:
             DataFrame con los datos
@@ -112,13 +163,53 @@ class ExcelService:
         try:
             df = pd.read_excel(filepath)
             df.columns = df.columns.str.strip().str.upper()
-            logger.info(f"Excel cargado: {filepath}")
+            if typed:
+                df = ExcelService.apply_schema(df)
+            logger.info("Excel cargado: %s", filepath)
             return df
             
         except Exception as e:
-            logger.error(f"Error cargando Excel: {e}")
+            logger.error("Error cargando Excel: %s", e)
             raise ExcelProcessingError(f"Error cargando Excel: {e}")
     
+    @staticmethod
+    def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica los tipos del libro de pacientes a un DataFrame cargado.
+        
+        - SEXO, SECTOR, EDAD, TIPO DE ATENCIÓN, DÉFICIT y CONSEJERIA pasan
+          a categóricas (incluyen los valores que fill_data puede escribir).
+        - FECHA pasa a fecha (NaT si no se puede interpretar).
+        - RUN/RUT pasa a texto limpio y se agrega RUN_KEY con su cuerpo
+          como entero (nulo si no es numérico).
+        
+        Args:
+            df: DataFrame con encabezados en mayúsculas
+        
+        Returns:
+            El mismo DataFrame, con las columnas convertidas
+        """
+        for col, known in CATEGORY_COLUMNS.items():
+            if col not in df.columns:
+                continue
+            column = df[col]
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype("object").astype("category")
+            missing = [value for value in known if value not in column.cat.categories]
+            df[col] = column.cat.add_categories(missing) if missing else column
+        
+        if "FECHA" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["FECHA"]):
+            df["FECHA"] = map_distinct(df["FECHA"], _parse_fecha, empty=pd.NaT, dtype="datetime64[ns]", text=False)
+        elif "FECHA" in df.columns:
+            df["FECHA"] = df["FECHA"].dt.normalize()
+        
+        run_col = next((col for col in ("RUN", "RUT") if col in df.columns), None)
+        if run_col:
+            df[run_col] = map_distinct(df[run_col], run_text, empty="", text=False)
+            df[RUN_KEY_COLUMN] = parse_rut_series(df[run_col])["RUN_KEY"]
+        
+        return df
+    
     @staticmethod
     def update_excel_inplace(
         filepath: str,
@@ -164,29 +255,156 @@ class ExcelService:
                     ws.cell(row=1, column=col_idx, value=canonical)
                     header_map[canonical.upper()] = col_idx
                 
-                # Actualiza valores
+                # Actualiza valores (solo las filas con dato nuevo, según la máscara)
                 updated = 0
-                for i in range(2, min(ws.max_row + 1, len(updates) + 2)):
-                    df_idx = i - 2
-                    if df_idx >= len(updates):
-                        break
+                if canonical in updates.columns:
+                    column = updates[canonical]
+                    last_row = min(ws.max_row + 1, len(updates) + 2)
+                    for df_idx in np.flatnonzero(~empty_mask(column).to_numpy()):
+                        i = int(df_idx) + 2
+                        if i >= last_row:
+                            break
                     
-                    if canonical in updates.columns:
-                        new_value = updates.at[updates.index[df_idx], canonical]
-                        
-                        if not is_empty(new_value):
-                            cell = ws.cell(row=i, column=col_idx)
-                            
-                            if not only_empty or is_empty(cell.value):
-                                cell.value = new_value
-                                updated += 1
+                        cell = ws.cell(row=i, column=col_idx)
+                        if not only_empty or is_empty(cell.value):
+                            cell.value = column.iat[df_idx]
+                            updated += 1
                 
                 stats[canonical] = updated
             
             wb.save(filepath)
-            logger.info(f"Excel actualizado: {filepath}")
+            logger.info("Excel actualizado: %s", filepath)
             return stats
             
         except Exception as e:
-            logger.error(f"Error actualizando Excel: {e}")
-            raise ExcelProcessingError(f"Error actualizando Excel: {e}")
\ No newline at end of file
+            logger.error("Error actualizando Excel: %s", e)
+            raise ExcelProcessingError(f"Error actualizando Excel: {e}")
+
+
+def _parse_fecha(value) -> pd.Timestamp:
+    """Convierte una celda FECHA (fecha de Excel o texto dd-mm-aaaa) en fecha, o NaT."""
+    if isinstance(value, (datetime, date)):
+        return pd.Timestamp(value).normalize()
+    try:
+        return pd.to_datetime(str(value).strip(), dayfirst=True).normalize()
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+
+
+class IncrementalExcelWriter:
+    """
+    Escribe pacientes en un Excel a medida que se extraen.
+    
+    Las filas van a un libro write_only que openpyxl vuelca a disco, por lo
+    que la memoria no crece con el rango, y el Excel se guarda una sola vez
+    en close. Cada llamada a append agrega además el día a un CSV de
+    respaldo junto al Excel, que close elimina: si la ejecución se corta
+    antes de guardar, el CSV conserva los días ya procesados. El respaldo
+    de una ejecución anterior no se sobrescribe: se renombra con su fecha.
+    """
+    
+    def __init__(self, filename: str, apply_colors: bool = True):
+        """
+        Inicializa el writer.
+        
+        Args:
+            filename: Nombre del archivo (se sobrescribe al cerrar)
+            apply_colors: Si aplicar colores alternados por fecha
+        """
+        self.filepath = Path(filename)
+        self.checkpoint = self.filepath.with_suffix(".parcial.csv")
+        self.apply_colors = apply_colors
+        self.rows = 0
+        self._wb: Optional[Workbook] = None
+        self._ws = None
+        self._last_date = None
+        self._use_yellow = True
+    
+    def __enter__(self):
+        """Entrada del context manager."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Guarda lo escrito hasta ahora, también si hubo un error."""
+        self.close()
+        return False
+    
+    def append(self, patients: List[Paciente]) -> int:
+        """
+        Agrega pacientes al libro y al respaldo CSV.
+        
+        Args:
+            patients: Pacientes a agregar
+        
+        Returns:
+            Cantidad de filas agregadas
+        """
+        if not patients:
+            return 0
+        
+        try:
+            df = ExcelService.patients_frame(patients)
+            
+            if self._wb is None:
+                self._keep_previous_checkpoint()
+                self._wb = Workbook(write_only=True)
+                self._ws = self._wb.create_sheet()
+                self._ws.append(EXPORT_COLUMNS)
+            
+            for values in df.itertuples(index=False, name=None):
+                self._ws.append(self._colored(values) if self.apply_colors else values)
+            
+            df.to_csv(self.checkpoint, mode="a" if self.rows else "w", header=not self.rows, index=False)
+            self.rows += len(patients)
+            logger.debug("%s filas agregadas a %s", len(patients), self.filepath)
+            return len(patients)
+        
+        except Exception as e:
+            logger.error("Error agregando filas al Excel: %s", e)
+            raise ExcelProcessingError(f"Error agregando filas al Excel: {e}")
+    
+    def close(self) -> Optional[Path]:
+        """
+        Guarda el Excel y elimina el respaldo CSV.
+        
+        Returns:
+            Ruta del archivo guardado, o None si no se agregaron filas
+        """
+        if self._wb is None:
+            return None
+        
+        try:
+            self._wb.save(self.filepath)
+        except Exception as e:
+            logger.error("Error guardando Excel: %s", e)
+            raise ExcelProcessingError(f"Error guardando Excel: {e}")
+        finally:
+            self._wb = None
+            self._ws = None
+        
+        self.checkpoint.unlink(missing_ok=True)
+        logger.info("Excel guardado: %s (%s filas)", self.filepath, self.rows)
+        return self.filepath
+    
+    def _keep_previous_checkpoint(self) -> None:
+        """Renombra el respaldo que dejó una ejecución interrumpida."""
+        if not self.checkpoint.exists():
+            return
+        
+        modified = datetime.fromtimestamp(self.checkpoint.stat().st_mtime)
+        kept = self.checkpoint.with_name(
+            f"{self.filepath.stem}.parcial-{modified:%Y%m%d-%H%M%S}.csv"
+        )
+        self.checkpoint.replace(kept)
+        logger.warning("Respaldo de una ejecución anterior conservado en %s", kept)
+    
+    def _colored(self, values: tuple) -> tuple:
+        """Fila con el color alternado por fecha en la celda FECHA."""
+        fecha = values[0]
+        if fecha != self._last_date:
+            self._use_yellow = not self._use_yellow
+            self._last_date = fecha
+        
+        cell = WriteOnlyCell(self._ws, value=fecha)
+        cell.fill = YELLOW_FILL if self._use_yellow else PINK_FILL
+        return (cell, *values[1:])
@@ -0,0 +1,208 @@
+"""
+Servicio de medición de las peticiones al backend de Rayen.
+
+Lee el log de rendimiento de Chrome (eventos Network del protocolo CDP)
+y atribuye cada petición a la etapa del script en curso.
+"""
+import re
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.core.logging import get_logger
+from src.config.settings import settings
+
+
+logger = get_logger(__name__)
+
+# Tipos de recurso considerados peticiones al backend
+BACKEND_RESOURCE_TYPES = {"XHR", "Fetch", "Document"}
+
+# Segmentos de ruta variables (ids numéricos, RUTs, UUIDs, hashes)
+_ID_SEGMENT = re.compile(r"^(\d[\d.\-kK]*|[0-9a-fA-F\-]{16,})$")
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """
+    Agrupa una URL en su endpoint (método + ruta sin parámetros ni ids).
+    
+    Args:
+        method: Método HTTP
+        url: URL completa
+    
+    Returns:
+        Clave del endpoint (ej: "GET clinico.rayenaps.cl/api/pacientes/:id")
+    """
+    parts = urlsplit(url)
+    segments = [":id" if _ID_SEGMENT.match(seg) else seg for seg in parts.path.split("/")]
+    return f"{method} {parts.netloc}{'/'.join(segments)}"
+
+
+class NetworkStats:
+    """Agregado de peticiones por endpoint y por etapa."""
+    
+    def __init__(self):
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+    
+    def add(self, record: Dict) -> None:
+        """Registra una petición terminada."""
+        with self._lock:
+            self._records.append(record)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+    
+    def by_endpoint(self) -> Dict[str, Dict]:
+        """
+        Resume las peticiones por endpoint.
+        
+        Returns:
+            Diccionario endpoint → estadísticas, del más lento al más rápido (p95 total)
+        """
+        with self._lock:
+            records = list(self._records)
+        
+        groups: Dict[str, List[Dict]] = {}
+        for record in records:
+            groups.setdefault(record["endpoint"], []).append(record)
+        
+        summary = {}
+        for endpoint, items in groups.items():
+            statuses: Dict[str, int] = {}
+            steps: Dict[str, int] = {}
+            for item in items:
+                statuses[str(item["status"])] = statuses.get(str(item["status"]), 0) + 1
+                steps[item["step"]] = steps.get(item["step"], 0) + 1
+            
+            summary[endpoint] = {
+                "count": len(items),
+                "ttfb_ms": _stats([i["ttfb_ms"] for i in items]),
+                "download_ms": _stats([i["download_ms"] for i in items]),
+                "total_ms": _stats([i["total_ms"] for i in items]),
+                "bytes": sum(i["bytes"] for i in items),
+                "status": statuses,
+                "steps": steps,
+            }
+        
+        return dict(sorted(summary.items(), key=lambda kv: kv[1]["total_ms"]["p95"], reverse=True))
+    
+    def write_report(self, name: str, directory: Optional[Path] = None) -> Path:
+        """
+        Escribe el reporte por endpoint como JSON junto a los tiempos por etapa.
+        
+        Args:
+            name: Nombre del script que se ejecutó
+            directory: Directorio destino (por defecto settings.LOG_DIR)
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = (directory or settings.LOG_DIR) / f"network_{name}_{self.started_at:%Y%m%d_%H%M%S}.json"
+        data = {
+            "script": name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "requests": len(self),
+            "endpoints": self.by_endpoint(),
+        }
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        return path
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    """p50, p95 y máximo de una lista de valores."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+    
+    return {"p50": percentile(0.50), "p95": percentile(0.95), "max": round(ordered[-1], 1)}
+
+
+class NetworkCollector:
+    """Procesa el log de rendimiento de una sesión de Chrome."""
+    
+    def __init__(self, stats: NetworkStats):
+        """
+        Inicializa el colector.
+        
+        Args:
+            stats: Agregado donde se registran las peticiones terminadas
+        """
+        self.stats = stats
+        self._pending: Dict[str, Dict] = {}
+    
+    def process(self, entries: List[Dict], step: str) -> None:
+        """
+        Procesa entradas del log de rendimiento.
+        
+        Args:
+            entries: Entradas devueltas por driver.get_log("performance")
+            step: Etapa del script a la que se atribuyen las peticiones
+        """
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            
+            method = message.get("method", "")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+            
+            if method == "Network.requestWillBeSent":
+                if params.get("type") not in BACKEND_RESOURCE_TYPES:
+                    continue
+                request = params.get("request", {})
+                if request.get("url", "").startswith("data:"):
+                    continue
+                self._pending[request_id] = {
+                    "endpoint": endpoint_key(request.get("method", "GET"), request.get("url", "")),
+                    "step": step,
+                    "sent": params.get("timestamp", 0.0),
+                }
+            
+            elif method == "Network.responseReceived" and request_id in self._pending:
+                response = params.get("response", {})
+                timing = response.get("timing") or {}
+                pending = self._pending[request_id]
+                pending["status"] = response.get("status", 0)
+                pending["received"] = params.get("timestamp", 0.0)
+                if timing:
+                    pending["ttfb_ms"] = timing.get("receiveHeadersEnd", 0.0) - timing.get("sendStart", 0.0)
+            
+            elif method == "Network.loadingFinished" and request_id in self._pending:
+                self._finish(request_id, params.get("timestamp", 0.0), params.get("encodedDataLength", 0))
+            
+            elif method == "Network.loadingFailed" and request_id in self._pending:
+                self._pending[request_id]["status"] = "failed"
+                self._finish(request_id, params.get("timestamp", 0.0), 0)
+    
+    def _finish(self, request_id: str, finished: float, size: float) -> None:
+        """Registra una petición terminada en el agregado."""
+        pending = self._pending.pop(request_id)
+        received = pending.get("received", finished)
+        
+        self.stats.add({
+            "endpoint": pending["endpoint"],
+            "step": pending["step"] or "(sin etapa)",
+            "status": pending.get("status", 0),
+            "ttfb_ms": max(0.0, pending.get("ttfb_ms", 0.0)),
+            "download_ms": max(0.0, (finished - received) * 1000),
+            "total_ms": max(0.0, (finished - pending["sent"]) * 1000),
+            "bytes": int(size),
+        })
+
+
+# Instancia global
+network_stats = NetworkStats()
@@ -0,0 +1,358 @@
+"""
+Servicio de ejecución paralela sobre varias sesiones de Rayen.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.services.scraper_service import WebScraperService
+from src.core.logging import get_logger
+from src.config.settings import settings
+
+
+logger = get_logger(__name__)
+
+# Lo entrega una fuente de unidades (stream) cuando aún no hay unidad lista:
+# el ejecutor sigue entregando resultados y duplicando rezagadas mientras espera
+PENDING = object()
+
+
+@dataclass
+class UnitResult:
+    """Resultado de una unidad de trabajo ejecutada en paralelo."""
+    unit: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+    hedged: bool = False
+
+
+class LatencyTracker:
+    """Ventana de latencias recientes para estimar percentiles."""
+    
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        """
+        Inicializa el tracker.
+        
+        Args:
+            window: Cantidad máxima de muestras consideradas
+            min_samples: Muestras mínimas antes de estimar percentiles
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float) -> None:
+        """Registra una latencia."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Calcula el percentil q (0-1) de las latencias registradas.
+        
+        Returns:
+            Latencia del percentil o None si aún no hay muestras suficientes
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SessionPool:
+    """Conjunto de sesiones autenticadas y posicionadas en el mismo menú."""
+    
+    def __init__(
+        self,
+        size: int,
+        location: str,
+        username: str,
+        password: str,
+        menu: Sequence[str],
+        headless: Optional[bool] = None
+    ):
+        """
+        Inicializa el pool.
+        
+        Args:
+            size: Cantidad de sesiones
+            location: Ubicación
+            username: Usuario
+            password: Contraseña
+            menu: Ítems del menú a recorrer tras el login
+            headless: Si ejecutar sin interfaz gráfica
+        """
+        self.size = max(1, size)
+        self.location = location
+        self.username = username
+        self.password = password
+        self.menu = tuple(menu)
+        self.headless = headless
+        self.sessions: List[WebScraperService] = []
+    
+    def __enter__(self):
+        """Abre todas las sesiones en paralelo."""
+        self.open()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Cierra todas las sesiones."""
+        self.close()
+        return False
+    
+    def open(self) -> None:
+        """Inicia, autentica y posiciona cada sesión del pool."""
+        logger.info("Abriendo %s sesiones en paralelo", self.size)
+        
+        with ThreadPoolExecutor(max_workers=self.size) as pool:
+            futures = [pool.submit(self._open_session) for _ in range(self.size)]
+        
+        errors = []
+        for future in futures:
+            if future.exception() is None:
+                self.sessions.append(future.result())
+            else:
+                errors.append(future.exception())
+        
+        if errors:
+            self.close()
+            raise errors[0]
+    
+    def close(self) -> None:
+        """Cierra todas las sesiones abiertas."""
+        for session in self.sessions:
+            session.cleanup()
+        self.sessions = []
+    
+    def _open_session(self) -> WebScraperService:
+        """Abre una sesión individual."""
+        session = WebScraperService(headless=self.headless)
+        try:
+            session.setup_driver()
+            session.login(self.location, self.username, self.password)
+            session.navigate_to_menu(*self.menu)
+        except Exception:
+            session.cleanup()
+            raise
+        return session
+
+
+class ParallelExecutor:
+    """
+    Ejecuta unidades de trabajo repartidas entre varias sesiones.
+    
+    En modo hedging, cuando una unidad supera el percentil de latencia
+    observado y hay una sesión libre, se lanza la misma unidad en esa sesión.
+    Se usa el primer resultado y se cancela el otro intento.
+    """
+    
+    def __init__(
+        self,
+        sessions: Sequence[WebScraperService],
+        hedge: bool = False,
+        percentile: float = 0.95,
+        poll_interval: float = 0.25,
+        tracker: Optional[LatencyTracker] = None,
+        affinity: Optional[Callable[[Any], Hashable]] = None
+    ):
+        """
+        Inicializa el ejecutor.
+        
+        Args:
+            sessions: Sesiones disponibles (una tarea a la vez por sesión)
+            hedge: Si lanzar intentos duplicados para unidades rezagadas
+            percentile: Percentil de latencia que dispara el hedging
+            poll_interval: Intervalo de revisión de tareas en curso (segundos)
+            tracker: Tracker de latencias a usar
+            affinity: Clave de shard de cada unidad; cada sesión sigue con
+                unidades de su mismo shard mientras queden
+        """
+        if not sessions:
+            raise ValueError("Se requiere al menos una sesión")
+        
+        self.sessions = list(sessions)
+        self.hedge = hedge
+        self.percentile = percentile
+        self.poll_interval = poll_interval
+        self.tracker = tracker or LatencyTracker()
+        self.affinity = affinity
+    
+    def map(
+        self,
+        fn: Callable[[WebScraperService, Any], Any],
+        units: Iterable[Any]
+    ) -> Iterator[UnitResult]:
+        """
+        Ejecuta fn(sesión, unidad) para cada unidad.
+        
+        Args:
+            fn: Función a ejecutar
+            units: Unidades de trabajo (se consumen de forma perezosa; un
+                stream puede entregar PENDING para no bloquear al ejecutor)
+        
+        Yields:
+            UnitResult en orden de término
+        """
+        source = _UnitSource(units, self.affinity)
+        idle: Deque[WebScraperService] = deque(self.sessions)
+        running: Dict[Future, Tuple[int, Any, WebScraperService, float, bool]] = {}
+        attempts: Dict[int, int] = {}
+        hedged = set()
+        done = set()
+        
+        with ThreadPoolExecutor(
+            max_workers=len(self.sessions), thread_name_prefix="sayen-worker"
+        ) as pool:
+            while not source.exhausted or running:
+                # Asigna trabajo nuevo a las sesiones libres (las unidades se
+                # obtienen a medida que se necesitan, la fuente puede ser un stream)
+                while idle and not source.exhausted:
+                    item = source.take(idle[0])
+                    if item is None:
+                        break
+                    idx, unit = item
+                    self._start(pool, fn, idx, unit, idle.popleft(), running, attempts, False)
+                
+                # Duplica unidades rezagadas en sesiones libres
+                if self.hedge and idle:
+                    self._hedge_stragglers(pool, fn, idle, running, attempts, hedged)
+                
+                finished, _ = wait(
+                    list(running), timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                )
+                
+                for future in finished:
+                    idx, unit, session, started, is_hedge = running.pop(future)
+                    idle.append(session)
+                    attempts[idx] -= 1
+                    
+                    if idx in done:
+                        continue  # Intento perdedor
+                    
+                    error = future.exception()
+                    if error is not None and attempts[idx] > 0:
+                        continue  # Queda otro intento en curso
+                    
+                    done.add(idx)
+                    elapsed = time.perf_counter() - started
+                    if error is None:
+                        self.tracker.add(elapsed)
+                    
+                    # Cancela los demás intentos de la misma unidad
+                    for other_idx, _, other_session, _, _ in running.values():
+                        if other_idx == idx:
+                            other_session.cancel_event.set()
+                    
+                    yield UnitResult(
+                        unit=unit,
+                        value=future.result() if error is None else None,
+                        error=error,
+                        elapsed=elapsed,
+                        hedged=is_hedge
+                    )
+    
+    def _start(
+        self,
+        pool: ThreadPoolExecutor,
+        fn: Callable,
+        idx: int,
+        unit: Any,
+        session: WebScraperService,
+        running: Dict,
+        attempts: Dict[int, int],
+        is_hedge: bool
+    ) -> None:
+        """Lanza un intento de la unidad en la sesión indicada."""
+        session.cancel_event.clear()
+        future = pool.submit(fn, session, unit)
+        running[future] = (idx, unit, session, time.perf_counter(), is_hedge)
+        attempts[idx] = attempts.get(idx, 0) + 1
+    
+    def _hedge_stragglers(
+        self,
+        pool: ThreadPoolExecutor,
+        fn: Callable,
+        idle: Deque[WebScraperService],
+        running: Dict,
+        attempts: Dict[int, int],
+        hedged: set
+    ) -> None:
+        """Lanza intentos duplicados para las unidades que superan el percentil."""
+        threshold = self.tracker.percentile(self.percentile)
+        if threshold is None:
+            return
+        
+        now = time.perf_counter()
+        for idx, unit, _, started, _ in list(running.values()):
+            if not idle:
+                break
+            if idx in hedged or now - started <= threshold:
+                continue
+            
+            hedged.add(idx)
+            logger.info(
+                "Unidad %s supera p%d (%.1fs), lanzando intento duplicado",
+                unit, int(self.percentile * 100), threshold
+            )
+            self._start(pool, fn, idx, unit, idle.popleft(), running, attempts, True)
+
+
+class _UnitSource:
+    """Fuente de unidades para el ejecutor, con afinidad opcional por shard."""
+    
+    def __init__(self, units: Iterable[Any], affinity: Optional[Callable[[Any], Hashable]]):
+        self.affinity = affinity
+        self.exhausted = False
+        self._iterator = iter(units)
+        self._next_idx = 0
+        self._buckets: Dict[Hashable, Deque[Tuple[int, Any]]] = {}
+        self._owner: Dict[int, Hashable] = {}
+        self._stealing: Dict[int, bool] = {}
+        
+        if affinity is not None:
+            # Con afinidad se necesitan todas las unidades para agruparlas
+            for idx, unit in enumerate(unit for unit in self._iterator if unit is not PENDING):
+                self._buckets.setdefault(affinity(unit), deque()).append((idx, unit))
+            self.exhausted = not self._buckets
+    
+    def take(self, session: WebScraperService) -> Optional[Tuple[int, Any]]:
+        """Obtiene la siguiente unidad para la sesión indicada."""
+        if self.affinity is None:
+            try:
+                unit = next(self._iterator)
+            except StopIteration:
+                self.exhausted = True
+                return None
+            if unit is PENDING:
+                return None
+            self._next_idx += 1
+            return self._next_idx - 1, unit
+        
+        key = self._owner.get(id(session))
+        if key not in self._buckets:
+            # Prefiere un shard que ninguna otra sesión esté procesando; si no
+            # queda ninguno, ayuda con el shard más grande
+            owned = set(self._owner.values())
+            free = [k for k in self._buckets if k not in owned]
+            key = free[0] if free else max(self._buckets, key=lambda k: len(self._buckets[k]))
+            self._owner[id(session)] = key
+            self._stealing[id(session)] = not free
+        
+        # Quien ayuda toma desde el final del shard para no chocar con su dueño
+        bucket = self._buckets[key]
+        item = bucket.pop() if self._stealing.get(id(session)) else bucket.popleft()
+        if not bucket:
+            del self._buckets[key]
+            self.exhausted = not self._buckets
+        return item
+
+
+def worker_count(units: int) -> int:
+    """Cantidad de sesiones a abrir para la cantidad de unidades dada."""
+    return max(1, min(settings.WORKERS, units))
@@ -2,17 +2,31 @@
 Servicio de lógica de negocio para pacientes.
 """
 import re
+from bisect import bisect_right
 from datetime import date
 from typing import List, Optional, Dict, Tuple
 
+import pandas as pd
+
 from src.domain.models import Paciente, TipoAtencion, Sexo, RangoFechas
 from src.core.logging import get_logger
-from src.core.utils import normalize_text, parse_age_to_months
-from src.config.constants import TIPOS_ATENCION, TIPOS_DEFICIT, RANGOS_EDAD
+from src.core.utils import normalize_text, parse_age_to_months, parse_age_series, map_distinct
+from src.config.constants import RANGOS_EDAD
+from src.services.classifier_service import (
+    attention_classifier, deficit_classifier, sex_classifier, as_text
+)
 
 
 logger = get_logger(__name__)
 
+_DAYS_PATTERN = re.compile(r"(\d+)\s*d[ií]as?")
+
+# Rangos de edad ordenados por su inicio, para buscarlos con bisect
+_RANGES = sorted(RANGOS_EDAD.items())
+_RANGE_STARTS = [start for (start, _), _ in _RANGES]
+_RANGE_ENDS = [end for (_, end), _ in _RANGES]
+_RANGE_LABELS = [label for _, label in _RANGES]
+
 
 class PatientService:
     """Servicio para operaciones con pacientes."""
@@ -32,17 +46,30 @@ class PatientService:
         
         if total_months == 0:
             # Verifica si hay días
-            if re.search(r"(\d+)\s*d[ií]as?", age_text):
+            if _DAYS_PATTERN.search(age_text):
                 return "Menor de 7 meses"
             return ""
         
         # Busca el rango correspondiente
-        for (min_months, max_months), label in RANGOS_EDAD.items():
-            if min_months <= total_months <= max_months:
-                return label
+        i = bisect_right(_RANGE_STARTS, total_months) - 1
+        if i >= 0 and total_months <= _RANGE_ENDS[i]:
+            return _RANGE_LABELS[i]
         
         return ""
     
+    @staticmethod
+    def extract_age_ranges(ages: pd.Series) -> pd.Series:
+        """
+        Extrae el rango de edad de una columna completa.
+        
+        Args:
+            ages: Columna con textos de edad
+        
+        Returns:
+            Series con el rango de cada fila ("" si no se reconoce), mismo índice
+        """
+        return map_distinct(ages, PatientService.extract_age_range, empty="")
+    
     @staticmethod
     def detect_attention_type(text: str) -> Optional[TipoAtencion]:
         """
@@ -54,18 +81,7 @@ class PatientService:
         Returns:
             Tipo de atención detectado o None
         """
-        normalized = normalize_text(text)
-        
-        # Busca coincidencias (de más larga a más corta)
-        for key in sorted(TIPOS_ATENCION.keys(), key=len, reverse=True):
-            if key in normalized:
-                value = TIPOS_ATENCION[key]
-                # Mapea al enum
-                for tipo in TipoAtencion:
-                    if tipo.value == value:
-                        return tipo
-        
-        return None
+        return attention_classifier.classify(text)
     
     @staticmethod
     def detect_deficit(text: str) -> Optional[str]:
@@ -78,13 +94,7 @@ class PatientService:
         Returns:
             Déficit detectado o None
         """
-        normalized = normalize_text(text)
-        
-        for deficit in TIPOS_DEFICIT:
-            if deficit in normalized:
-                return deficit
-        
-        return None
+        return deficit_classifier.classify(text)
     
     @staticmethod
     def parse_sex(text: str) -> Optional[Sexo]:
@@ -97,14 +107,7 @@ class PatientService:
         Returns:
             Sexo parseado o None
         """
-        normalized = normalize_text(text)
-        
-        if any(word in normalized for word in ["HOMBRE", "MASCULINO", "VARON"]):
-            return Sexo.MASCULINO
-        elif any(word in normalized for word in ["MUJER", "FEMENINO", "MUJER"]):
-            return Sexo.FEMENINO
-        
-        return None
+        return sex_classifier.classify(text)
     
     @staticmethod
     def should_assign_lme(age_text: str) -> bool:
@@ -120,6 +123,19 @@ class PatientService:
         total_months = parse_age_to_months(age_text)
         return total_months < 4
     
+    @staticmethod
+    def lme_mask(ages: pd.Series) -> pd.Series:
+        """
+        Aplica should_assign_lme a una columna completa.
+        
+        Args:
+            ages: Columna con textos de edad
+        
+        Returns:
+            Series booleana (True si la edad es menor a 4 meses), mismo índice
+        """
+        return parse_age_series(ages) < 4
+    
     @staticmethod
     def analyze_anamnesis(text: str) -> Tuple[Optional[TipoAtencion], Optional[str]]:
         """
@@ -131,11 +147,68 @@ class PatientService:
         Returns:
             Tupla con (tipo_atencion, deficit)
         """
-        tipo = PatientService.detect_attention_type(text)
-        deficit = PatientService.detect_deficit(text) if tipo != TipoAtencion.NSP else None
+        # Se normaliza una sola vez para ambos clasificadores
+        normalized = normalize_text(text)
+        tipo = attention_classifier.match(normalized)
+        deficit = deficit_classifier.match(normalized) if tipo != TipoAtencion.NSP else None
         
         return tipo, deficit
     
+    @staticmethod
+    def analyze_anamnesis_many(texts) -> List[Tuple[Optional[TipoAtencion], Optional[str]]]:
+        """
+        Analiza varios textos de anamnesis en una sola llamada.
+        
+        Args:
+            texts: Lista o Series de textos (los vacíos dan (None, None))
+        
+        Returns:
+            Lista de tuplas (tipo_atencion, deficit), en el mismo orden
+        """
+        cache: Dict[str, Tuple[Optional[TipoAtencion], Optional[str]]] = {}
+        results = []
+        for text in texts:
+            text = as_text(text)
+            if text not in cache:
+                cache[text] = PatientService.analyze_anamnesis(text)
+            results.append(cache[text])
+        return results
+    
+    @staticmethod
+    def merge_updates(paciente: Paciente, updates: Dict[str, str]) -> Dict[str, str]:
+        """
+        Aplica datos completados (con claves de columna Excel) a un paciente.
+        
+        Solo completa los campos que el paciente tiene vacíos.
+        
+        Args:
+            paciente: Paciente a actualizar
+            updates: Diccionario columna → valor
+        
+        Returns:
+            Diccionario con los valores efectivamente aplicados
+        """
+        applied = {}
+        
+        for key, value in updates.items():
+            if not value:
+                continue
+            
+            if key == "SEXO" and paciente.sexo is None:
+                paciente.sexo = Sexo(value)
+            elif key == "CONSEJERIA" and not paciente.consejeria:
+                paciente.consejeria = value
+            elif key == "TIPO DE ATENCIÓN" and paciente.tipo_atencion is None:
+                paciente.tipo_atencion = TipoAtencion(value)
+            elif key == "DÉFICIT" and not paciente.deficit:
+                paciente.deficit = value
+            else:
+                continue
+            
+            applied[key] = value
+        
+        return applied
+    
     @staticmethod
     def create_from_scraped_data(data: Dict) -> Paciente:
         """
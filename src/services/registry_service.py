@@ -0,0 +1,210 @@
+"""
+Registro local de datos demográficos de pacientes.
+
+Guarda en SQLite, por RUN, el sexo y la edad que fill_data lee de la ficha
+de Rayen, con la fecha en que se vieron. Como estos datos casi no cambian,
+las filas que solo necesitan SEXO o CONSEJERIA se completan desde el
+registro sin abrir la ficha, mientras el dato no supere su vigencia.
+"""
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from src.domain.models import Sexo
+from src.config.settings import settings
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Límite de parámetros por consulta (SQLITE_MAX_VARIABLE_NUMBER en versiones antiguas)
+_CHUNK = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pacientes (
+    run_key INTEGER PRIMARY KEY,
+    sexo TEXT,
+    edad_meses INTEGER,
+    edad_fecha TEXT,
+    creado TEXT NOT NULL,
+    visto TEXT NOT NULL
+)
+"""
+
+
+@dataclass
+class RegistroPaciente:
+    """Datos demográficos de un paciente vistos en Rayen."""
+    run_key: int
+    sexo: Optional[Sexo]
+    edad_meses: Optional[int]
+    edad_fecha: Optional[date]
+    visto: datetime
+    
+    def lme(self, hoy: date) -> Optional[bool]:
+        """
+        Determina si corresponde consejería LME (menor de 4 meses) a la fecha indicada.
+        
+        La edad se leyó en meses completos, por lo que hoy puede ser un mes
+        mayor que la suma de lo leído y lo transcurrido; si ese margen cruza
+        los 4 meses no se puede decidir sin volver a leer la ficha.
+        
+        Args:
+            hoy: Fecha de referencia
+        
+        Returns:
+            True o False si la edad lo determina, None si hay que consultar Rayen
+        """
+        if self.edad_meses is None or self.edad_fecha is None:
+            # La ficha no mostraba edad: fill_data tampoco asigna LME
+            return False
+        
+        transcurridos = (hoy.year - self.edad_fecha.year) * 12 + hoy.month - self.edad_fecha.month
+        if hoy.day < self.edad_fecha.day:
+            transcurridos -= 1
+        
+        minima = self.edad_meses + max(0, transcurridos)
+        if minima >= 4:
+            return False
+        if minima + 1 < 4:
+            return True
+        return None
+
+
+class PatientRegistry:
+    """Registro SQLite de pacientes por clave de RUN (cuerpo sin dígito verificador)."""
+    
+    def __init__(self, path: Optional[Path] = None, ttl_days: Optional[int] = None):
+        """
+        Inicializa el registro (la base se abre en el primer uso).
+        
+        Args:
+            path: Archivo SQLite (por defecto CACHE_DIR/registry.sqlite3)
+            ttl_days: Días de vigencia de un dato (por defecto PATIENT_REGISTRY_TTL_DAYS)
+        """
+        self.path = Path(path or settings.CACHE_DIR / "registry.sqlite3")
+        self.ttl_days = settings.PATIENT_REGISTRY_TTL_DAYS if ttl_days is None else ttl_days
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Consultas ya hechas en esta ejecución (None = no está o está vencido)
+        self._memo: Dict[int, Optional[RegistroPaciente]] = {}
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+        return self._conn
+    
+    def get_many(self, keys: Iterable[int]) -> Dict[int, RegistroPaciente]:
+        """
+        Busca varios pacientes con una consulta por bloque.
+        
+        Cada clave se consulta a la base una sola vez por ejecución.
+        
+        Args:
+            keys: Claves de RUN
+        
+        Returns:
+            Registros vigentes encontrados, por clave
+        """
+        keys = [int(key) for key in keys]
+        with self._lock:
+            pending = [key for key in set(keys) if key not in self._memo]
+            if pending:
+                conn = self._connect()
+                limite = (datetime.now() - timedelta(days=self.ttl_days)).isoformat(timespec="seconds")
+                for start in range(0, len(pending), _CHUNK):
+                    chunk = pending[start:start + _CHUNK]
+                    for key in chunk:
+                        self._memo[key] = None
+                    rows = conn.execute(
+                        "SELECT run_key, sexo, edad_meses, edad_fecha, visto FROM pacientes "
+                        f"WHERE visto >= ? AND run_key IN ({','.join('?' * len(chunk))})",
+                        [limite, *chunk],
+                    )
+                    for row in rows:
+                        self._memo[row[0]] = _from_row(row)
+            
+            return {key: self._memo[key] for key in keys if self._memo[key] is not None}
+    
+    def get(self, key: int) -> Optional[RegistroPaciente]:
+        """Busca un paciente (ver get_many)."""
+        return self.get_many([key]).get(int(key))
+    
+    def remember(
+        self,
+        key: int,
+        sexo: Optional[Sexo],
+        edad_meses: Optional[int],
+        visto: Optional[datetime] = None
+    ) -> RegistroPaciente:
+        """
+        Guarda lo leído de la ficha de un paciente.
+        
+        Args:
+            key: Clave de RUN
+            sexo: Sexo leído (None si la ficha no lo mostraba)
+            edad_meses: Edad en meses completos (None si la ficha no la mostraba)
+            visto: Momento de la lectura (por defecto ahora)
+        
+        Returns:
+            Registro guardado
+        """
+        visto = visto or datetime.now()
+        registro = RegistroPaciente(
+            run_key=int(key),
+            sexo=sexo,
+            edad_meses=edad_meses,
+            edad_fecha=visto.date() if edad_meses is not None else None,
+            visto=visto,
+        )
+        marca = visto.isoformat(timespec="seconds")
+        
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO pacientes (run_key, sexo, edad_meses, edad_fecha, creado, visto) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_key) DO UPDATE SET sexo = excluded.sexo, edad_meses = excluded.edad_meses, "
+                "edad_fecha = excluded.edad_fecha, visto = excluded.visto",
+                (
+                    registro.run_key,
+                    sexo.value if sexo else None,
+                    edad_meses,
+                    registro.edad_fecha.isoformat() if registro.edad_fecha else None,
+                    marca,
+                    marca,
+                ),
+            )
+            conn.commit()
+            self._memo[registro.run_key] = registro
+        
+        return registro
+    
+    def close(self) -> None:
+        """Cierra la base de datos."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._memo.clear()
+
+
+def _from_row(row) -> RegistroPaciente:
+    run_key, sexo, edad_meses, edad_fecha, visto = row
+    return RegistroPaciente(
+        run_key=run_key,
+        sexo=Sexo(sexo) if sexo else None,
+        edad_meses=edad_meses,
+        edad_fecha=date.fromisoformat(edad_fecha) if edad_fecha else None,
+        visto=datetime.fromisoformat(visto),
+    )
+
+
+# Instancia global
+patient_registry = PatientRegistry()
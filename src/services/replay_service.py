@@ -0,0 +1,237 @@
+"""
+Grabación y reproducción de sesiones WebDriver.
+
+La grabación guarda cada comando que el driver envía a ChromeDriver junto
+con su respuesta cruda y su duración, en un JSONL comprimido con gzip. La
+reproducción atiende esos mismos comandos desde el archivo, sin navegador,
+de modo que el código Python de los scripts (parseo, clasificación,
+actualización del DataFrame y escritura de Excel) se ejecuta a máxima
+velocidad y de forma determinista.
+
+Las esperas se reproducen con un reloj virtual: cada comando avanza el
+reloj lo que tardó al grabarse y las pausas lo avanzan sin dormir, por lo
+que WebDriverWait hace los mismos sondeos que en la sesión original.
+
+El texto que se escribe en los campos de usuario y contraseña no se graba;
+el resto de la grabación sí contiene datos de pacientes (nombres, RUN,
+anamnesis) y debe tratarse con el mismo cuidado que los Excel generados.
+"""
+import gzip
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, Optional, Set, Tuple
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+from selenium.webdriver.support import wait as selenium_wait
+
+from src.core.exceptions import ReplayError
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+RECORDING_VERSION = 1
+# Reemplaza el texto escrito en campos de credenciales
+REDACTED = "***"
+
+
+def _command_key(command: str, params: Optional[Dict]) -> str:
+    """Clave de un comando (el id de sesión cambia entre grabación y reproducción)."""
+    params = {k: v for k, v in (params or {}).items() if k != "sessionId"}
+    return f"{command} {json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+
+def _redact(params: Dict) -> Dict:
+    """Parámetros de sendKeysToElement sin el texto escrito."""
+    return {**params, "text": REDACTED, "value": [REDACTED]}
+
+
+class SessionRecorder:
+    """Graba los comandos de un driver en un archivo .jsonl.gz."""
+    
+    def __init__(self, path: Path):
+        """
+        Abre el archivo de grabación.
+        
+        Args:
+            path: Archivo destino (.jsonl.gz)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commands = 0
+        self._redacting = False
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._write({"version": RECORDING_VERSION, "created": datetime.now().isoformat(timespec="seconds")})
+    
+    def attach(self, driver) -> None:
+        """
+        Graba desde ahora todo lo que el driver envía a ChromeDriver.
+        
+        Se intercepta el command_executor (y no driver.execute) para guardar
+        las respuestas tal como llegan, antes de convertirlas en WebElement.
+        
+        Args:
+            driver: Driver de Selenium ya iniciado
+        """
+        execute = driver.command_executor.execute
+        
+        def recording_execute(command, params=None):
+            start = time.perf_counter()
+            response = execute(command, params)
+            elapsed = time.perf_counter() - start
+            record = {
+                "command": command,
+                "params": {k: v for k, v in (params or {}).items() if k != "sessionId"},
+                "response": response,
+                "elapsed": round(elapsed, 4),
+            }
+            if self._redacting and command == Command.SEND_KEYS_TO_ELEMENT:
+                record["params"] = _redact(record["params"])
+                record["redacted"] = True
+            # Se serializa antes de que Selenium modifique la respuesta
+            self._write(record)
+            self.commands += 1
+            return response
+        
+        driver.command_executor.execute = recording_execute
+    
+    @contextmanager
+    def redacted(self) -> Iterator[None]:
+        """Graba sin su texto el sendKeysToElement de los comandos del bloque (credenciales)."""
+        self._redacting = True
+        try:
+            yield
+        finally:
+            self._redacting = False
+    
+    def _write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+    
+    def close(self) -> None:
+        """Cierra el archivo de grabación."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        logger.info("Sesión grabada en %s (%s comandos)", self.path, self.commands)
+
+
+class VirtualClock:
+    """Reloj que avanza solo cuando se le indica (reemplaza a time en WebDriverWait)."""
+    
+    def __init__(self):
+        self._now = 0.0
+        self._lock = threading.Lock()
+    
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._now
+    
+    def sleep(self, seconds: float) -> None:
+        """Avanza el reloj sin dormir."""
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+
+class ReplayExecutor:
+    """Responde los comandos WebDriver desde una grabación."""
+    
+    def __init__(self, path: Path, clock: VirtualClock):
+        """
+        Carga la grabación.
+        
+        Las respuestas se agrupan por comando y parámetros y se entregan en
+        el orden grabado; si un comando se repite más veces que al grabar
+        (un sondeo extra), se vuelve a entregar su última respuesta.
+        
+        Args:
+            path: Archivo de grabación (.jsonl.gz)
+            clock: Reloj virtual que avanza con la duración de cada comando
+        """
+        self.path = Path(path)
+        self.clock = clock
+        self._queues: Dict[str, Deque[Tuple[Dict, float]]] = {}
+        self._last: Dict[str, Tuple[Dict, float]] = {}
+        # Elementos cuyo texto se grabó oculto: se acepta cualquier texto
+        self._redacted: Set[str] = set()
+        self._lock = threading.Lock()
+        
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != RECORDING_VERSION:
+                raise ReplayError(f"Versión de grabación no soportada: {header.get('version')}")
+            for line in f:
+                record = json.loads(line)
+                if record.get("redacted"):
+                    self._redacted.add(record["params"].get("id"))
+                key = _command_key(record["command"], record["params"])
+                self._queues.setdefault(key, deque()).append((record["response"], record["elapsed"]))
+        
+        logger.info("Reproduciendo %s (%s comandos distintos)", self.path, len(self._queues))
+    
+    def execute(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Entrega la respuesta grabada de un comando.
+        
+        Raises:
+            ReplayError: Si el comando no aparece en la grabación
+        """
+        if command == Command.NEW_SESSION:
+            return {"value": {"sessionId": "replay", "capabilities": {"browserName": "chrome"}}}
+        
+        if command == Command.SEND_KEYS_TO_ELEMENT and (params or {}).get("id") in self._redacted:
+            params = _redact(params)
+        
+        key = _command_key(command, params)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise ReplayError(f"Comando no grabado: {key[:200]}")
+            response, elapsed = self._last[key]
+        
+        self.clock.sleep(elapsed)
+        # Copia para que Selenium no modifique la respuesta guardada
+        return json.loads(json.dumps(response))
+    
+    def close(self) -> None:
+        """Sin conexiones que cerrar (lo llama WebDriver.quit)."""
+
+
+class ReplayDriver(RemoteWebDriver):
+    """Driver que reproduce una sesión grabada, sin navegador."""
+    
+    def __init__(self, path: Path):
+        """
+        Inicia la reproducción.
+        
+        Mientras dura, WebDriverWait usa el reloj virtual de la sesión.
+        
+        Args:
+            path: Archivo de grabación (.jsonl.gz)
+        """
+        self.clock = VirtualClock()
+        self._patched_time = selenium_wait.time
+        selenium_wait.time = self.clock
+        super().__init__(command_executor=ReplayExecutor(path, self.clock), options=Options())
+    
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        """Equivalente a ChromiumDriver.execute_cdp_cmd."""
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+    
+    def quit(self) -> None:
+        """Termina la reproducción y restaura el reloj de WebDriverWait."""
+        try:
+            super().quit()
+        finally:
+            selenium_wait.time = self._patched_time
@@ -0,0 +1,122 @@
+"""
+Servicio de planificación de las fechas a consultar en Rayen.
+"""
+import re
+import json
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from src.domain.models import RangoFechas
+from src.core.logging import get_logger
+from src.config.settings import settings
+
+
+logger = get_logger(__name__)
+
+
+class ScheduleService:
+    """
+    Planifica las fechas de un rango omitiendo las que no requieren navegador.
+    
+    Omite fines de semana, feriados nacionales, feriados adicionales
+    configurados y los días pasados que el centro mostró vacíos hace menos
+    de EMPTY_DAYS_TTL_DAYS días (solo con DAY_CACHE activo).
+    """
+    
+    def __init__(self, location: str, cache_dir: Optional[Path] = None):
+        """
+        Inicializa el servicio.
+        
+        Args:
+            location: Centro de salud
+            cache_dir: Directorio base de la caché
+        """
+        slug = re.sub(r"[^\w.-]", "_", location.strip().lower()) or "default"
+        self.path = (cache_dir or settings.CACHE_DIR) / "empty_days" / f"{slug}.json"
+        self._lock = threading.Lock()
+        # Día vacío → momento en que se observó
+        self._empty: Optional[Dict[date, datetime]] = None
+    
+    def plan(self, rango: RangoFechas) -> List[date]:
+        """
+        Obtiene las fechas que deben consultarse.
+        
+        Args:
+            rango: Rango de fechas
+        
+        Returns:
+            Fechas ordenadas
+        """
+        omitir = self.extra_holidays()
+        if settings.DAY_CACHE and not settings.FORCE_REFRESH:
+            omitir |= self.empty_days()
+        
+        dates = rango.get_dates(excluir_feriados=settings.SKIP_HOLIDAYS, omitir=omitir)
+        logger.info("%s fechas planificadas entre %s y %s", len(dates), rango.inicio, rango.fin)
+        return dates
+    
+    @staticmethod
+    def shard_key(fecha: date) -> tuple:
+        """Clave del shard mensual de una fecha."""
+        return fecha.year, fecha.month
+    
+    @staticmethod
+    def extra_holidays() -> Set[date]:
+        """Feriados adicionales configurados (elecciones, feriados regionales)."""
+        extras = set()
+        for value in settings.EXTRA_HOLIDAYS.split(","):
+            value = value.strip()
+            if not value:
+                continue
+            try:
+                extras.add(datetime.strptime(value, "%d-%m-%Y").date())
+            except ValueError:
+                logger.warning("Feriado adicional inválido en configuración: %s", value)
+        return extras
+    
+    def empty_days(self) -> Set[date]:
+        """Días pasados que el centro mostró sin pacientes, dentro de su vigencia."""
+        limite = datetime.now() - timedelta(days=settings.EMPTY_DAYS_TTL_DAYS)
+        with self._lock:
+            return {fecha for fecha, visto in self._load().items() if visto >= limite}
+    
+    def learn_empty(self, fecha: date) -> None:
+        """
+        Registra un día sin pacientes para omitirlo en próximas ejecuciones.
+        
+        Args:
+            fecha: Fecha observada vacía
+        """
+        if not settings.DAY_CACHE:
+            return
+        
+        with self._lock:
+            empty = self._load()
+            empty[fecha] = datetime.now()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({d.isoformat(): visto.isoformat(timespec="seconds") for d, visto in sorted(empty.items())}, f)
+            tmp_path.replace(self.path)
+        
+        logger.debug("Día %s registrado como vacío", fecha)
+    
+    def _load(self) -> Dict[date, datetime]:
+        """Carga (una vez) los días vacíos con el momento en que se observaron."""
+        if self._empty is None:
+            self._empty = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    # El formato anterior (lista sin fecha de observación) se descarta
+                    # y los días se vuelven a consultar
+                    if isinstance(data, dict):
+                        self._empty = {
+                            date.fromisoformat(d): datetime.fromisoformat(visto) for d, visto in data.items()
+                        }
+                except Exception as e:
+                    logger.warning("No se pudo leer %s: %s", self.path, e)
+        return self._empty
@@ -3,8 +3,9 @@ Servicio de web scraping con Selenium.
 """
 import os
 import time
-from typing import Optional, Tuple
-from contextlib import contextmanager
+import threading
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager, nullcontext
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,29 +13,80 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.command import Command
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from src.core.logging import get_logger
-from src.core.exceptions import ScrapingError, AuthenticationError
+from src.core.timing import timed, stage_timer
+from src.core.tracing import tracer
+from src.core.metrics import metrics
+from src.core.exceptions import ScrapingError, AuthenticationError, OperationCancelled
 from src.config.settings import settings
+from src.services.network_service import NetworkCollector, network_stats
+from src.services.replay_service import SessionRecorder, ReplayDriver, VirtualClock
 
 
 logger = get_logger(__name__)
 
+# Métricas de Performance.getMetrics que se conservan
+BROWSER_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "JSEventListeners")
+
+
+class BrowserMemoryLog:
+    """Muestras de memoria del navegador tomadas al cerrar cada sesión."""
+    
+    def __init__(self):
+        self.samples: List[Dict[str, float]] = []
+        self._lock = threading.Lock()
+    
+    def add(self, sample: Dict[str, float]) -> None:
+        """Registra una muestra."""
+        with self._lock:
+            self.samples.append(sample)
+    
+    def peak(self) -> Dict[str, float]:
+        """Máximo de cada métrica entre todas las sesiones."""
+        with self._lock:
+            samples = list(self.samples)
+        return {
+            name: max(sample.get(name, 0.0) for sample in samples)
+            for name in BROWSER_METRICS
+        } if samples else {}
+    
+    def reset(self) -> None:
+        """Descarta las muestras registradas."""
+        with self._lock:
+            self.samples = []
+
 
 class WebScraperService:
     """Servicio para automatización web con Selenium."""
     
-    def __init__(self, headless: Optional[bool] = None):
+    def __init__(
+        self,
+        headless: Optional[bool] = None,
+        record: Optional[str] = None,
+        replay: Optional[str] = None
+    ):
         """
         Inicializa el servicio.
         
         Args:
             headless: Si ejecutar sin interfaz gráfica
+            record: Archivo donde grabar la sesión (por defecto settings.RECORD_SESSION)
+            replay: Grabación a reproducir sin navegador (por defecto settings.REPLAY_SESSION)
         """
         self.headless = headless if headless is not None else settings.HEADLESS
+        self.record = record if record is not None else settings.RECORD_SESSION
+        self.replay = replay if replay is not None else settings.REPLAY_SESSION
+        self.recorder: Optional[SessionRecorder] = None
+        self.clock: Optional[VirtualClock] = None
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
+        self.cancel_event = threading.Event()
+        self.location: str = ""
+        self.network: Optional[NetworkCollector] = None
+        self._drain_network = None
     
     def __enter__(self):
         """Entrada del context manager."""
@@ -46,58 +98,175 @@ class WebScraperService:
         self.cleanup()
         return False
     
+    @timed("scraper.setup_driver")
     def setup_driver(self) -> None:
-        """Configura e inicializa el driver de Chrome."""
+        """Configura e inicializa el driver de Chrome (o el de reproducción)."""
+        if (self.record or self.replay) and settings.WORKERS > 1:
+            logger.warning("La grabación y reproducción de sesiones suponen WORKERS=1")
+        
         try:
-            # Silencia logs de Chrome en Windows
-            if os.name == "nt":
-                os.environ["CHROME_LOG_FILE"] = "NUL"
+            if self.replay:
+                self.driver = ReplayDriver(self.replay)
+                self.clock = self.driver.clock
             else:
-                os.environ["CHROME_LOG_FILE"] = "/dev/null"
+                self.driver = self._start_chrome()
             
-            options = Options()
+            self.wait = WebDriverWait(self.driver, settings.SELENIUM_TIMEOUT)
             
-            if self.headless:
-                options.add_argument("--headless=new")
-                options.add_argument("--window-size=1920,1080")
+            if self.record:
+                self.recorder = SessionRecorder(self.record)
+                self.recorder.attach(self.driver)
             
-            # Opciones para reducir ruido y mejorar estabilidad
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--log-level=3")
-            options.add_argument("--disable-logging")
-            options.add_argument("--disable-notifications")
-            options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-            options.add_experimental_option("useAutomationExtension", False)
+            if tracer.enabled:
+                self._trace_driver_commands()
             
-            # Configurar Service según la versión de Selenium
-            try:
-                service = Service(log_output=os.devnull)
-            except:
-                service = Service()
+            if settings.NETWORK_LOG:
+                self._collect_network()
             
-            self.driver = webdriver.Chrome(options=options, service=service)
-            self.wait = WebDriverWait(self.driver, settings.SELENIUM_TIMEOUT)
+            if settings.BROWSER_METRICS:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
             
+            metrics.inc("sayen_active_sessions")
             logger.info("Driver de Chrome inicializado correctamente")
             
         except WebDriverException as e:
-            logger.error(f"Error al inicializar el driver: {e}")
+            logger.error("Error al inicializar el driver: %s", e)
             raise ScrapingError(f"No se pudo inicializar el navegador: {e}")
     
+    def _start_chrome(self) -> webdriver.Chrome:
+        """Inicia Chrome con las opciones del proyecto."""
+        # Silencia logs de Chrome en Windows
+        if os.name == "nt":
+            os.environ["CHROME_LOG_FILE"] = "NUL"
+        else:
+            os.environ["CHROME_LOG_FILE"] = "/dev/null"
+        
+        options = Options()
+        
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        
+        # Opciones para reducir ruido y mejorar estabilidad
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--log-level=3")
+        options.add_argument("--disable-logging")
+        options.add_argument("--disable-notifications")
+        options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+        options.add_experimental_option("useAutomationExtension", False)
+        
+        # Log de rendimiento con los eventos de red (CDP)
+        if settings.NETWORK_LOG:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        
+        # Configurar Service según la versión de Selenium
+        try:
+            service = Service(log_output=os.devnull)
+        except:
+            service = Service()
+        
+        return webdriver.Chrome(options=options, service=service)
+    
+    def _trace_driver_commands(self) -> None:
+        """Registra cada comando WebDriver como span de la traza."""
+        execute = self.driver.execute
+        
+        def traced_execute(driver_command, params=None):
+            with tracer.span(driver_command, cat="webdriver"):
+                return execute(driver_command, params)
+        
+        # WebElement también ejecuta sus comandos a través de driver.execute
+        self.driver.execute = traced_execute
+    
+    def _collect_network(self) -> None:
+        """
+        Atribuye las peticiones al backend a la etapa del script en curso.
+        
+        El log de rendimiento se vacía cada vez que cambia la etapa del hilo
+        que usa la sesión, de modo que las peticiones quedan asociadas a la
+        etapa durante la cual se emitieron.
+        """
+        execute = self.driver.execute
+        self.network = NetworkCollector(network_stats)
+        state = {"step": stage_timer.current_stage()}
+        
+        def drain() -> None:
+            try:
+                entries = execute(Command.GET_LOG, {"type": "performance"})["value"]
+                self.network.process(entries, state["step"])
+            except WebDriverException as e:
+                logger.debug("No se pudo leer el log de rendimiento: %s", e)
+        
+        def collecting_execute(driver_command, params=None):
+            step = stage_timer.current_stage()
+            if step != state["step"]:
+                drain()
+                state["step"] = step
+            return execute(driver_command, params)
+        
+        self._drain_network = drain
+        self.driver.execute = collecting_execute
+    
     def cleanup(self) -> None:
         """Limpia recursos del driver."""
         if self.driver:
+            if self._drain_network:
+                self._drain_network()
+                self._drain_network = None
+            if settings.BROWSER_METRICS:
+                sample = self.browser_metrics()
+                if sample:
+                    browser_memory.add(sample)
             try:
                 self.driver.quit()
                 logger.info("Driver cerrado correctamente")
             except Exception as e:
-                logger.error(f"Error al cerrar el driver: {e}")
+                logger.error("Error al cerrar el driver: %s", e)
             finally:
+                if self.recorder:
+                    self.recorder.close()
+                    self.recorder = None
                 self.driver = None
                 self.wait = None
+                metrics.inc("sayen_active_sessions", -1)
     
+    def browser_metrics(self) -> Dict[str, float]:
+        """
+        Lee la memoria del navegador con CDP (Performance.getMetrics).
+        
+        Returns:
+            Diccionario métrica → valor (heap de JS en bytes, nodos del DOM,
+            documentos y listeners), vacío si no se pudo leer
+        """
+        try:
+            result = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+        except WebDriverException as e:
+            logger.debug("No se pudieron leer las métricas del navegador: %s", e)
+            return {}
+        return {
+            item["name"]: item["value"]
+            for item in result.get("metrics", [])
+            if item["name"] in BROWSER_METRICS
+        }
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Espera a que la página reaccione.
+        
+        Al reproducir una sesión no duerme: solo avanza el reloj virtual.
+        
+        Args:
+            seconds: Segundos de espera
+        """
+        if self.clock:
+            self.clock.sleep(seconds)
+        else:
+            time.sleep(seconds)
+    
+    @timed("scraper.login")
     def login(self, location: str, username: str, password: str) -> None:
         """
         Realiza el login en Rayen APS.
@@ -111,7 +280,7 @@ class WebScraperService:
             AuthenticationError: Si falla el login
         """
         try:
-            logger.info(f"Iniciando sesión para usuario {username} en {location}")
+            logger.info("Iniciando sesión para usuario %s en %s", username, location)
             
             self.driver.get(settings.BASE_URL)
             
@@ -119,8 +288,10 @@ class WebScraperService:
             self.wait.until(EC.presence_of_element_located((By.ID, "location")))
             
             self.driver.find_element(By.ID, "location").send_keys(location)
-            self.driver.find_element(By.ID, "username").send_keys(username)
-            self.driver.find_element(By.ID, "password").send_keys(password)
+            # Las credenciales no quedan en la grabación de la sesión
+            with self.recorder.redacted() if self.recorder else nullcontext():
+                self.driver.find_element(By.ID, "username").send_keys(username)
+                self.driver.find_element(By.ID, "password").send_keys(password)
             
             # Click en botón de login
             login_btn = self.wait.until(
@@ -130,21 +301,33 @@ class WebScraperService:
             )
             login_btn.click()
             
-            time.sleep(5)  # Espera para carga completa
+            self.pause(5)  # Espera para carga completa
             
             # Verifica que el login fue exitoso
             if "login" in self.driver.current_url.lower():
                 raise AuthenticationError("Login falló - verificar credenciales")
             
+            self.location = location
             logger.info("Login exitoso")
             
         except TimeoutException:
             logger.error("Timeout durante el login")
             raise AuthenticationError("Timeout durante el login")
         except Exception as e:
-            logger.error(f"Error durante el login: {e}")
+            logger.error("Error durante el login: %s", e)
             raise AuthenticationError(f"Error durante el login: {e}")
     
+    def check_cancelled(self) -> None:
+        """
+        Interrumpe la operación en curso si fue cancelada.
+        
+        Raises:
+            OperationCancelled: Si otra sesión ya completó la misma unidad
+        """
+        if self.cancel_event.is_set():
+            raise OperationCancelled("Operación cancelada")
+    
+    @timed("scraper.wait_for_loader")
     def wait_for_loader(self) -> None:
         """Espera a que desaparezca el loader de carga."""
         try:
@@ -164,12 +347,13 @@ class WebScraperService:
             for btn in modal.find_elements(By.XPATH, ".//button"):
                 if btn.is_displayed():
                     btn.click()
-                    time.sleep(1)
+                    self.pause(1)
                     logger.debug("Modal cerrado")
                     break
         except:
             pass
     
+    @timed("scraper.navigate_to_menu")
     def navigate_to_menu(self, *menu_items: str) -> None:
         """
         Navega por el menú usando los textos especificados.
@@ -183,7 +367,7 @@ class WebScraperService:
                 EC.element_to_be_clickable((By.ID, "navbar-main-menu"))
             )
             navbar_menu.click()
-            time.sleep(1)
+            self.pause(1)
         except:
             logger.debug("No se encontró navbar-main-menu o ya está abierto")
         
@@ -208,8 +392,8 @@ class WebScraperService:
                         )
                         element.click()
                         clicked = True
-                        logger.debug(f"Click en menú: {item}")
-                        time.sleep(2)
+                        logger.debug("Click en menú: %s", item)
+                        self.pause(2)
                         break
                     except:
                         continue
@@ -218,7 +402,7 @@ class WebScraperService:
                     raise ScrapingError(f"No se pudo encontrar el elemento del menú: {item}")
                     
             except Exception as e:
-                logger.error(f"Error navegando al menú {item}: {e}")
+                logger.error("Error navegando al menú %s: %s", item, e)
                 raise
     
     def get_element_text(self, selector: str, by: By = By.XPATH, timeout: int = 10) -> str:
@@ -239,5 +423,9 @@ class WebScraperService:
             )
             return element.text.strip()
         except TimeoutException:
-            logger.debug(f"Elemento no encontrado: {selector}")
-            return ""
\ No newline at end of file
+            logger.debug("Elemento no encontrado: %s", selector)
+            return ""
+
+
+# Instancia global
+browser_memory = BrowserMemoryLog()
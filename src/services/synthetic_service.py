@@ -0,0 +1,342 @@
+"""
+Generador de datos sintéticos con la forma de los datos de Rayen.
+
+Permite probar y medir a escala sin datos reales de pacientes.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from src.domain.models import Paciente, TipoAtencion, Sexo
+from src.domain.feriados import es_feriado
+from src.domain.validators import digito_verificador
+from src.services.excel_service import EXPORT_COLUMNS, YELLOW_FILL, PINK_FILL
+from src.services.patient_service import PatientService
+from src.config.constants import TIPOS_ATENCION, TIPOS_DEFICIT
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Filas de datos por hoja de Excel (límite del formato menos el encabezado)
+MAX_FILAS_EXCEL = 1_048_575
+
+# Columnas del Excel de entrada de fill_data
+FILL_COLUMNS = [
+    "FECHA", "SECTOR", "NOMBRE", "RUT", "EDAD",
+    "TIPO DE ATENCIÓN", "SEXO", "CONSEJERIA", "DÉFICIT"
+]
+
+NOMBRES_FEMENINOS = [
+    "SOFÍA", "ISIDORA", "AGUSTINA", "EMILIA", "JOSEFA", "FLORENCIA", "TRINIDAD",
+    "AMANDA", "MAITE", "ANTONELLA", "MARÍA JOSÉ", "CATALINA", "FERNANDA", "MONSERRAT",
+]
+NOMBRES_MASCULINOS = [
+    "BENJAMÍN", "MATEO", "VICENTE", "AGUSTÍN", "TOMÁS", "MAXIMILIANO", "GASPAR",
+    "JOAQUÍN", "CRISTÓBAL", "LUCAS", "JUAN PABLO", "MARTÍN", "FACUNDO", "BASTIÁN",
+]
+APELLIDOS = [
+    "GONZÁLEZ", "MUÑOZ", "ROJAS", "DÍAZ", "PÉREZ", "SOTO", "CONTRERAS", "SILVA",
+    "MARTÍNEZ", "SEPÚLVEDA", "MORALES", "RODRÍGUEZ", "LÓPEZ", "FUENTES", "HERNÁNDEZ",
+    "TORRES", "ARAYA", "FLORES", "ESPINOZA", "VALENZUELA", "CASTILLO", "NÚÑEZ",
+    "TAPIA", "REYES", "GUTIÉRREZ", "CASTRO", "PIZARRO", "ÁLVAREZ", "VÁSQUEZ", "SÁNCHEZ",
+]
+APODOS = ["SOFI", "BENJA", "TOMY", "JOSE", "CATA", "MAXI", "FLOR", "JUANPA", "NICO", "ISI"]
+SECTORES = ["ROJO", "AZUL", "VERDE", "AMARILLO", "NARANJO", "MORADO"]
+
+# Frases de relleno; no contienen claves de TIPOS_ATENCION ni TIPOS_DEFICIT
+MOTIVOS = [
+    "control de salud infantil",
+    "evaluación del desarrollo psicomotor",
+    "control de niño sano según calendario",
+    "seguimiento de estimulación temprana",
+    "aplicación de pauta breve",
+]
+HISTORIAS = [
+    "madre refiere buen dormir y alimentación adecuada",
+    "se entregan indicaciones de estimulación en el hogar",
+    "acude acompañado de su abuela",
+    "se revisa carnet de vacunas, al día",
+    "cuidadora consulta por hábitos de sueño",
+]
+
+ACENTOS = {"A": "Á", "E": "É", "I": "Í", "O": "Ó", "U": "Ú", "N": "Ñ"}
+
+
+@dataclass
+class RegistroSintetico:
+    """Paciente sintético con los textos tal como los muestra Rayen."""
+    run: str
+    nombre: str
+    fecha: date
+    sector: str
+    edad: str
+    sexo: Sexo
+    anamnesis: str
+    tipo_atencion: Optional[TipoAtencion]
+    deficit: Optional[str]
+    
+    @property
+    def edad_rango(self) -> str:
+        """Rango de edad que asignaría get_patients."""
+        return PatientService.extract_age_range(self.edad)
+    
+    def to_paciente(self) -> Paciente:
+        """Paciente equivalente al que produce get_patients (sin datos completados)."""
+        return Paciente(
+            run=self.run,
+            nombre=self.nombre,
+            fecha=self.fecha,
+            sector=self.sector,
+            edad_rango=self.edad_rango,
+            tipo_atencion=TipoAtencion.NSP if self.tipo_atencion == TipoAtencion.NSP else None
+        )
+
+
+class SyntheticDataGenerator:
+    """Generador reproducible de pacientes sintéticos."""
+    
+    def __init__(self, seed: int = 0):
+        """
+        Inicializa el generador.
+        
+        Args:
+            seed: Semilla; la misma semilla produce los mismos datos
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._frases = sorted(TIPOS_ATENCION.items())
+    
+    def run(self) -> str:
+        """RUN válido con formato (ej: "23.456.789-K")."""
+        cuerpo = self.rng.randint(20_000_000, 27_999_999)
+        return f"{cuerpo:,}".replace(",", ".") + f"-{digito_verificador(cuerpo)}"
+    
+    def nombre(self, sexo: Sexo, alias_ratio: float = 0.15) -> str:
+        """Nombre en orden de Rayen (apellidos y nombre), a veces con apodo entre paréntesis."""
+        nombres = NOMBRES_MASCULINOS if sexo == Sexo.MASCULINO else NOMBRES_FEMENINOS
+        nombre = f"{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)} {self.rng.choice(nombres)}"
+        
+        if self.rng.random() < alias_ratio:
+            abre, cierra = self.rng.choice([("(", ")"), ("(", ")"), ("（", "）")])
+            nombre += f" {abre}{self.rng.choice(APODOS)}{cierra}"
+        
+        return nombre
+    
+    def edad(self) -> str:
+        """Edad en las formas "X años Y meses", "Y meses Z días" o "Z días"."""
+        forma = self.rng.random()
+        if forma < 0.08:
+            dias = self.rng.randint(1, 29)
+            return f"{dias} día" if dias == 1 else f"{dias} días"
+        
+        meses_totales = self.rng.randint(1, 83)
+        anios, meses = divmod(meses_totales, 12)
+        partes = []
+        if anios:
+            partes.append(f"{anios} año" if anios == 1 else f"{anios} años")
+        if meses:
+            partes.append(f"{meses} mes" if meses == 1 else f"{meses} meses")
+        if not anios and self.rng.random() < 0.5:
+            partes.append(f"{self.rng.randint(1, 29)} días")
+        return " ".join(partes)
+    
+    def variar(self, frase: str) -> str:
+        """Cambia mayúsculas, acentos y espacios sin alterar el texto normalizado."""
+        letras = [
+            ACENTOS[ch] if ch in ACENTOS and ch != "N" and self.rng.random() < 0.15 else ch
+            for ch in frase
+        ]
+        texto = "".join(letras)
+        
+        casing = self.rng.random()
+        if casing < 0.3:
+            texto = texto.lower()
+        elif casing < 0.55:
+            texto = texto.title()
+        elif casing < 0.7:
+            texto = texto.capitalize()
+        
+        if self.rng.random() < 0.2:
+            texto = texto.replace(" ", "  ", 1)
+        return texto
+    
+    def anamnesis(self) -> Tuple[str, Optional[TipoAtencion], Optional[str]]:
+        """
+        Texto de anamnesis con una frase de tipo de atención y, a veces, un déficit.
+        
+        Returns:
+            Tupla (texto, tipo de atención esperado, déficit esperado)
+        """
+        clave, valor = self.rng.choice(self._frases)
+        tipo = TipoAtencion(valor)
+        
+        deficit = None
+        if tipo != TipoAtencion.NSP and self.rng.random() < 0.3:
+            deficit = self.rng.choice(TIPOS_DEFICIT)
+        
+        motivo = f"MOTIVO DE CONSULTA: {self.rng.choice(MOTIVOS)}, {self.variar(clave)}"
+        historia = f"HISTORIA DE LA ENFERMEDAD: {self.rng.choice(HISTORIAS)}"
+        if deficit:
+            historia += f". Evaluación con {self.variar(deficit)}"
+        
+        return f"{motivo}\n{historia}", tipo, deficit
+    
+    def registro(self, fecha: date) -> RegistroSintetico:
+        """Genera un paciente sintético para la fecha indicada."""
+        sexo = self.rng.choice([Sexo.MASCULINO, Sexo.FEMENINO])
+        texto, tipo, deficit = self.anamnesis()
+        
+        return RegistroSintetico(
+            run=self.run(),
+            nombre=self.nombre(sexo),
+            fecha=fecha,
+            sector=self.rng.choice(SECTORES),
+            edad=self.edad(),
+            sexo=sexo,
+            anamnesis=texto,
+            tipo_atencion=tipo,
+            deficit=deficit
+        )
+    
+    def registros(
+        self,
+        rows: int,
+        inicio: date = date(2025, 3, 3),
+        por_dia: int = 25
+    ) -> Iterator[RegistroSintetico]:
+        """
+        Genera pacientes repartidos en días hábiles consecutivos.
+        
+        Args:
+            rows: Cantidad de pacientes
+            inicio: Primer día
+            por_dia: Pacientes promedio por día
+        
+        Yields:
+            Pacientes ordenados por fecha
+        """
+        fecha = inicio
+        generados = 0
+        while generados < rows:
+            while fecha.weekday() >= 5 or es_feriado(fecha):
+                fecha += timedelta(days=1)
+            
+            del_dia = min(rows - generados, self.rng.randint(por_dia // 2, por_dia * 3 // 2) or 1)
+            for _ in range(del_dia):
+                yield self.registro(fecha)
+            
+            generados += del_dia
+            fecha += timedelta(days=1)
+    
+    def write_citados(self, path: Path, rows: int, **kwargs) -> List[Path]:
+        """
+        Escribe pacientes con la forma de ExcelService.save_patients.
+        
+        Args:
+            path: Archivo destino
+            rows: Cantidad de pacientes
+            kwargs: Parámetros de registros()
+        
+        Returns:
+            Archivos escritos (más de uno si se supera el límite de filas de Excel)
+        """
+        def filas(registros: Iterator[RegistroSintetico]) -> Iterator[Tuple[str, list]]:
+            for registro in registros:
+                datos = registro.to_paciente().to_dict()
+                datos["VACIO1"] = datos["VACIO2"] = ""
+                yield datos["FECHA"], [datos[col] for col in EXPORT_COLUMNS]
+        
+        return _write_streaming(path, EXPORT_COLUMNS, filas(self.registros(rows, **kwargs)))
+    
+    def write_fill_input(self, path: Path, rows: int, anamnesis: bool = False, **kwargs) -> List[Path]:
+        """
+        Escribe pacientes con la forma del Excel de entrada de fill_data.
+        
+        Los RUN alternan formatos y los nombres conservan los apodos, como en
+        archivos preparados a mano.
+        
+        Args:
+            path: Archivo destino
+            rows: Cantidad de pacientes
+            anamnesis: Si agregar una columna ANAMNESIS con el texto generado
+            kwargs: Parámetros de registros()
+        
+        Returns:
+            Archivos escritos (más de uno si se supera el límite de filas de Excel)
+        """
+        columns = FILL_COLUMNS + (["ANAMNESIS"] if anamnesis else [])
+        # Generador aparte para que los pacientes coincidan con write_citados
+        formatos = random.Random(f"{self.seed}-formatos")
+        
+        def filas(registros: Iterator[RegistroSintetico]) -> Iterator[Tuple[str, list]]:
+            for registro in registros:
+                run = registro.run
+                if formatos.random() < 0.3:
+                    run = run.replace(".", "")
+                
+                fecha = registro.fecha.strftime("%d-%m-%Y")
+                tipo = "NSP" if registro.tipo_atencion == TipoAtencion.NSP else ""
+                fila = [fecha, registro.sector, registro.nombre, run, registro.edad_rango, tipo, "", "", ""]
+                if anamnesis:
+                    fila.append(registro.anamnesis)
+                yield fecha, fila
+        
+        return _write_streaming(path, columns, filas(self.registros(rows, **kwargs)))
+
+
+def _write_streaming(path: Path, columns: List[str], filas: Iterator[Tuple[str, list]]) -> List[Path]:
+    """
+    Escribe filas en modo write_only (memoria constante), con colores por fecha.
+    
+    Args:
+        path: Archivo destino
+        columns: Encabezados
+        filas: Tuplas (fecha, valores) ordenadas por fecha
+    
+    Returns:
+        Archivos escritos
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fecha_col = columns.index("FECHA")
+    written = []
+    wb = ws = None
+    count = 0
+    last_date = None
+    use_yellow = True
+    
+    def close() -> None:
+        wb.save(written[-1])
+        logger.info("Excel sintético guardado: %s (%s filas)", written[-1], count)
+    
+    for fecha, valores in filas:
+        if ws is None or count == MAX_FILAS_EXCEL:
+            if ws is not None:
+                close()
+            parte = len(written) + 1
+            written.append(path if parte == 1 else path.with_name(f"{path.stem}_parte{parte}{path.suffix}"))
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Sheet1")
+            ws.append(columns)
+            count = 0
+        
+        if fecha != last_date:
+            use_yellow = not use_yellow
+            last_date = fecha
+        
+        cell = WriteOnlyCell(ws, value=valores[fecha_col])
+        cell.fill = YELLOW_FILL if use_yellow else PINK_FILL
+        valores = list(valores)
+        valores[fecha_col] = cell
+        ws.append(valores)
+        count += 1
+    
+    if ws is not None:
+        close()
+    return written
@@ -0,0 +1,2 @@
+# src/simulator/__init__.py
+"""Simulador local de Rayen APS para pruebas sin el sistema clínico."""
@@ -0,0 +1,70 @@
+"""
+Ejecuta el simulador de Rayen APS.
+
+Uso:
+    python -m src.simulator --rows 5000 --latency 200 --jitter 80 --fault-rate 0.01
+
+Luego, en otra consola:
+    RAYEN_BASE_URL=http://127.0.0.1:8765/ python -m src.scripts.get_patients
+"""
+import sys
+import argparse
+from datetime import datetime
+
+from src.simulator.server import RayenSimulator, SimulatorConfig
+from src.ui.console import ConsoleUI
+
+
+def main(argv=None) -> int:
+    """Punto de entrada del simulador."""
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="Simulador local de Rayen APS")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="semilla de los datos sintéticos")
+    parser.add_argument("--rows", type=int, default=defaults.rows, help="cantidad de pacientes")
+    parser.add_argument("--start", default=defaults.inicio.strftime("%d-%m-%Y"), help="primer día (dd-mm-aaaa)")
+    parser.add_argument("--per-day", type=int, default=defaults.por_dia, help="pacientes promedio por día")
+    parser.add_argument("--latency", type=float, default=defaults.latency_ms, help="latencia por petición (ms)")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter_ms, help="variación de la latencia (ms)")
+    parser.add_argument("--fault-rate", type=float, default=defaults.fault_rate, help="proporción de errores 500")
+    parser.add_argument("--slow-rate", type=float, default=defaults.slow_rate, help="proporción de respuestas lentas")
+    parser.add_argument("--slow-factor", type=float, default=defaults.slow_factor, help="multiplicador de las lentas")
+    parser.add_argument("--username", default="", help="usuario aceptado (vacío = cualquiera)")
+    parser.add_argument("--password", default="", help="contraseña aceptada (vacío = cualquiera)")
+    args = parser.parse_args(argv)
+    
+    config = SimulatorConfig(
+        host=args.host,
+        port=args.port,
+        seed=args.seed,
+        rows=args.rows,
+        inicio=datetime.strptime(args.start, "%d-%m-%Y").date(),
+        por_dia=args.per_day,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        fault_rate=args.fault_rate,
+        slow_rate=args.slow_rate,
+        slow_factor=args.slow_factor,
+        username=args.username,
+        password=args.password,
+    )
+    
+    ui = ConsoleUI()
+    simulator = RayenSimulator(config)
+    simulator.start()
+    ui.print_success(f"Simulador escuchando en {simulator.url}")
+    ui.print_info(f"Configure RAYEN_BASE_URL={simulator.url} para usarlo desde los scripts (Ctrl+C para salir)")
+    
+    try:
+        simulator.wait()
+    except KeyboardInterrupt:
+        ui.print_warning("\nDeteniendo simulador...")
+    finally:
+        simulator.stop()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+Servidor del simulador de Rayen APS.
+
+Reproduce las partes de Rayen que usan los scripts: formulario de login,
+menú principal, calendario de pacientes citados con popovers, búsqueda de
+pacientes por RUN y árbol de anamnesis. Los datos salen del generador
+sintético, de modo que un Excel generado con la misma semilla, filas,
+fecha de inicio y pacientes por día describe a los mismos pacientes.
+"""
+import re
+import json
+import time
+import random
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from src.domain.models import TipoAtencion, Sexo
+from src.services.synthetic_service import SyntheticDataGenerator, RegistroSintetico, HISTORIAS, MOTIVOS
+from src.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+
+@dataclass
+class SimulatorConfig:
+    """Configuración del simulador."""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    seed: int = 0
+    rows: int = 5_000
+    inicio: date = date(2025, 3, 3)
+    por_dia: int = 25
+    latency_ms: float = 150.0
+    jitter_ms: float = 50.0
+    fault_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_factor: float = 10.0
+    username: str = ""
+    password: str = ""
+
+
+class SimulatedData:
+    """Pacientes del simulador indexados por fecha y por RUN."""
+    
+    def __init__(self, config: SimulatorConfig):
+        """
+        Genera los pacientes a partir de la configuración.
+        
+        Args:
+            config: Configuración del simulador
+        """
+        generator = SyntheticDataGenerator(config.seed)
+        self.por_fecha: Dict[date, List[RegistroSintetico]] = {}
+        self.por_run: Dict[str, RegistroSintetico] = {}
+        
+        for registro in generator.registros(config.rows, inicio=config.inicio, por_dia=config.por_dia):
+            self.por_fecha.setdefault(registro.fecha, []).append(registro)
+            self.por_run[normalize_run(registro.run)] = registro
+        
+        logger.info("Simulador con %s pacientes en %s días", len(self.por_run), len(self.por_fecha))
+    
+    def historial(self, registro: RegistroSintetico) -> List[Dict[str, str]]:
+        """Atenciones del árbol clínico: la del día citado y controles anteriores."""
+        rng = random.Random(registro.run)
+        atenciones = []
+        for meses in range(rng.randint(0, 2), 0, -1):
+            fecha = registro.fecha - timedelta(days=30 * meses + rng.randint(0, 10))
+            atenciones.append({
+                "fecha": fecha.strftime("%d-%m-%Y"),
+                "motivo": f"MOTIVO DE CONSULTA: {rng.choice(MOTIVOS)}",
+                "historia": f"HISTORIA DE LA ENFERMEDAD: {rng.choice(HISTORIAS)}",
+            })
+        
+        motivo, historia = registro.anamnesis.split("\n", 1)
+        atenciones.append({"fecha": registro.fecha.strftime("%d-%m-%Y"), "motivo": motivo, "historia": historia})
+        return atenciones
+
+
+def normalize_run(run: str) -> str:
+    """RUN sin puntos ni guión, en mayúsculas."""
+    return re.sub(r"[^\dkK]", "", str(run)).upper()
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """Atiende las páginas y la API del simulador."""
+    
+    server: "SimulatorServer"
+    
+    def log_message(self, format, *args):
+        logger.debug("simulador: " + format, *args)
+    
+    # Páginas
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        
+        if url.path in ("/", "/login"):
+            self._send_html(self.server.page("login.html", error="error" in query))
+        elif url.path == "/app":
+            if self._session() is None:
+                self._redirect("/")
+            else:
+                self._send_html(self.server.page("app.html"))
+        elif url.path.startswith("/api/"):
+            self._api(url.path[len("/api/"):], query)
+        else:
+            self.send_error(404)
+    
+    def do_POST(self):
+        if urlsplit(self.path).path != "/login":
+            self.send_error(404)
+            return
+        
+        length = int(self.headers.get("Content-Length", 0))
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+        self.server.delay()
+        
+        if not self.server.check_credentials(form):
+            self._redirect("/login?error=1")
+            return
+        
+        token = self.server.open_session(form.get("location", ""))
+        self.send_response(303)
+        self.send_header("Location", "/app")
+        self.send_header("Set-Cookie", f"sim_session={token}; Path=/; HttpOnly")
+        self.end_headers()
+    
+    # API
+    
+    def _api(self, endpoint: str, query: Dict[str, str]) -> None:
+        """Responde un endpoint JSON con latencia y fallas simuladas."""
+        self.server.delay()
+        if self.server.should_fail():
+            self._send_json({"error": "Error interno simulado"}, status=500)
+            return
+        
+        data = self.server.data
+        if endpoint == "citados":
+            try:
+                fecha = date.fromisoformat(query.get("fecha", ""))
+            except ValueError:
+                self._send_json({"error": "Fecha inválida"}, status=400)
+                return
+            registros = data.por_fecha.get(fecha, [])
+            self._send_json({
+                "fecha": fecha.strftime("%d-%m-%Y"),
+                "rows": [
+                    {
+                        "run": normalize_run(r.run),
+                        "hora": f"{8 + i // 4:02d}:{(i % 4) * 15:02d}",
+                        "estado": "No se presenta" if r.tipo_atencion == TipoAtencion.NSP else "Atendido",
+                        "nombre": r.nombre,
+                    }
+                    for i, r in enumerate(registros)
+                ],
+            })
+        
+        elif endpoint == "popover":
+            registro = data.por_run.get(normalize_run(query.get("run", "")))
+            if registro is None:
+                self._send_json({"error": "Paciente no encontrado"}, status=404)
+                return
+            self._send_json({"run": registro.run, "sector": registro.sector, "edad": registro.edad})
+        
+        elif endpoint == "paciente":
+            registro = data.por_run.get(normalize_run(query.get("run", "")))
+            if registro is None:
+                self._send_json({"error": "Paciente no encontrado"}, status=404)
+                return
+            self._send_json({"run": registro.run, "nombre": registro.nombre})
+        
+        elif endpoint == "ficha":
+            registro = data.por_run.get(normalize_run(query.get("run", "")))
+            if registro is None:
+                self._send_json({"error": "Paciente no encontrado"}, status=404)
+                return
+            self._send_json({
+                "run": registro.run,
+                "nombre": registro.nombre,
+                "edad": registro.edad,
+                "sexo": "Hombre" if registro.sexo == Sexo.MASCULINO else "Mujer",
+                "atenciones": [{"fecha": a["fecha"]} for a in data.historial(registro)],
+            })
+        
+        elif endpoint == "anamnesis":
+            registro = data.por_run.get(normalize_run(query.get("run", "")))
+            atenciones = data.historial(registro) if registro else []
+            atencion = next((a for a in atenciones if a["fecha"] == query.get("fecha")), None)
+            if atencion is None:
+                self._send_json({"error": "Documento no encontrado"}, status=404)
+                return
+            self._send_json(atencion)
+        
+        else:
+            self._send_json({"error": "Endpoint desconocido"}, status=404)
+    
+    # Utilidades
+    
+    def _session(self) -> Optional[str]:
+        """Centro de la sesión de la cookie, o None si no hay sesión."""
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "sim_session":
+                return self.server.sessions.get(value)
+        return None
+    
+    def _redirect(self, location: str) -> None:
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.end_headers()
+    
+    def _send_html(self, body: str) -> None:
+        self._send(body.encode("utf-8"), "text/html; charset=utf-8")
+    
+    def _send_json(self, data, status: int = 200) -> None:
+        self._send(json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json", status)
+    
+    def _send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    """Servidor HTTP con los datos y la configuración del simulador."""
+    
+    daemon_threads = True
+    
+    def __init__(self, config: SimulatorConfig):
+        """
+        Inicializa el servidor (sin empezar a atender).
+        
+        Args:
+            config: Configuración del simulador
+        """
+        super().__init__((config.host, config.port), SimulatorHandler)
+        self.config = config
+        self.data = SimulatedData(config)
+        self.sessions: Dict[str, str] = {}
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self._pages = {path.name: path.read_text(encoding="utf-8") for path in STATIC_DIR.glob("*.html")}
+    
+    @property
+    def url(self) -> str:
+        """URL base para RAYEN_BASE_URL."""
+        return f"http://{self.config.host}:{self.server_address[1]}/"
+    
+    def page(self, name: str, **context) -> str:
+        """Página estática con la configuración del cliente incrustada."""
+        client = {"inicio": self.config.inicio.isoformat(), "error": context.get("error", False)}
+        return self._pages[name].replace("/*CONFIG*/", json.dumps(client))
+    
+    def delay(self) -> None:
+        """Espera la latencia configurada (con jitter y respuestas lentas ocasionales)."""
+        with self._rng_lock:
+            seconds = self.config.latency_ms + self._rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+            if self._rng.random() < self.config.slow_rate:
+                seconds *= self.config.slow_factor
+        if seconds > 0:
+            time.sleep(seconds / 1000)
+    
+    def should_fail(self) -> bool:
+        """Decide si inyectar una falla en la respuesta actual."""
+        with self._rng_lock:
+            return self._rng.random() < self.config.fault_rate
+    
+    def check_credentials(self, form: Dict[str, str]) -> bool:
+        """Valida el formulario de login (cualquier valor no vacío si no hay credenciales fijas)."""
+        if not all(form.get(field) for field in ("location", "username", "password")):
+            return False
+        if self.config.username and form["username"] != self.config.username:
+            return False
+        if self.config.password and form["password"] != self.config.password:
+            return False
+        return True
+    
+    def open_session(self, location: str) -> str:
+        """Registra una sesión nueva y devuelve su token."""
+        token = secrets.token_hex(16)
+        self.sessions[token] = location
+        return token
+
+
+class RayenSimulator:
+    """Simulador ejecutándose en un hilo de fondo."""
+    
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        """
+        Inicializa el simulador.
+        
+        Args:
+            config: Configuración (por defecto SimulatorConfig())
+        """
+        self.config = config or SimulatorConfig()
+        self.server: Optional[SimulatorServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+    
+    @property
+    def url(self) -> str:
+        """URL base del simulador."""
+        return self.server.url
+    
+    def start(self) -> None:
+        """Inicia el servidor en segundo plano."""
+        self.server = SimulatorServer(self.config)
+        self._thread = threading.Thread(target=self.server.serve_forever, name="sayen-simulator", daemon=True)
+        self._thread.start()
+        logger.info("Simulador de Rayen escuchando en %s", self.url)
+    
+    def wait(self) -> None:
+        """
+        Bloquea hasta que el servidor se detenga.
+        
+        Espera en intervalos cortos para que Ctrl+C interrumpa también en Windows.
+        """
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(0.5)
+    
+    def stop(self) -> None:
+        """Detiene el servidor."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self._thread.join()
+            self.server = None
@@ -5,11 +5,18 @@ import sys
 import os
 import getpass
 from typing import Optional, Tuple
-from datetime import date
+from datetime import date, datetime
 
 from src.domain.models import RangoFechas
 from src.config.settings import settings
 from src.core.utils import is_empty
+from src.core.timing import timed, stage_timer
+from src.core.tracing import tracer
+from src.core.logging import get_logger
+from src.services.network_service import network_stats
+
+
+logger = get_logger(__name__)
 
 # Habilitar colores ANSI en Windows
 if os.name == 'nt':
@@ -84,6 +91,68 @@ class ConsoleUI:
         self.print_colored(text, 'cyan')
         self.print_colored(separator, 'cyan')
     
+    def print_timings(self, summary: dict) -> None:
+        """
+        Imprime el resumen de tiempos por etapa.
+        
+        Args:
+            summary: Diccionario etapa → {count, total, p50, p95, max}
+        """
+        self.print_header("Tiempos por etapa")
+        width = max(len(stage) for stage in summary)
+        self.print_colored(
+            f"{'Etapa':<{width}}  {'n':>6}  {'p50':>8}  {'p95':>8}  {'max':>8}  {'total':>9}", 'cyan'
+        )
+        for stage, stats in summary.items():
+            self.print_colored(
+                f"{stage:<{width}}  {stats['count']:>6}  {stats['p50']:>7.2f}s  "
+                f"{stats['p95']:>7.2f}s  {stats['max']:>7.2f}s  {stats['total']:>8.1f}s"
+            )
+    
+    def report_run(self, script: str) -> None:
+        """
+        Muestra y guarda los tiempos por etapa, de red y la traza de ejecución.
+        
+        Args:
+            script: Nombre del script (prefijo de los archivos generados)
+        """
+        summary = stage_timer.summary()
+        if summary:
+            self.print_timings(summary)
+            path = stage_timer.write_report(script)
+            logger.info("Tiempos por etapa guardados en %s", path)
+        
+        if len(network_stats):
+            self.print_network(network_stats.by_endpoint())
+            path = network_stats.write_report(script)
+            logger.info("Tiempos de red por endpoint guardados en %s", path)
+        
+        if tracer.enabled:
+            path = tracer.write(script)
+            logger.info("Traza de ejecución guardada en %s", path)
+    
+    def print_network(self, endpoints: dict, top: int = 10) -> None:
+        """
+        Imprime los endpoints del backend más lentos.
+        
+        Args:
+            endpoints: Diccionario endpoint → estadísticas, ordenado del más lento
+            top: Cantidad de endpoints a mostrar
+        """
+        self.print_header("Endpoints más lentos")
+        shown = list(endpoints.items())[:top]
+        width = max(len(endpoint) for endpoint, _ in shown)
+        self.print_colored(
+            f"{'Endpoint':<{width}}  {'n':>6}  {'TTFB p95':>9}  {'desc. p95':>9}  {'total p95':>9}  Etapa principal",
+            'cyan'
+        )
+        for endpoint, stats in shown:
+            step = max(stats['steps'], key=stats['steps'].get)
+            self.print_colored(
+                f"{endpoint:<{width}}  {stats['count']:>6}  {stats['ttfb_ms']['p95']:>7.0f}ms  "
+                f"{stats['download_ms']['p95']:>7.0f}ms  {stats['total_ms']['p95']:>7.0f}ms  {step}"
+            )
+    
     def input_colored(self, prompt: str, color: str = 'cyan') -> str:
         """
         Solicita input con prompt coloreado.
@@ -112,15 +181,16 @@ class ConsoleUI:
         
         while True:
             try:
-                anio = int(self.input_colored("Año (ej: 2025): "))
-                mes = int(self.input_colored("Mes (1-12): "))
-                dia_inicio = int(self.input_colored("Día de inicio: "))
-                dia_fin = int(self.input_colored("Día de fin: "))
+                inicio = self._input_date("Fecha de inicio (dd-mm-aaaa): ")
+                fin = self._input_date("Fecha de fin (dd-mm-aaaa): ")
+                
+                if fin < inicio:
+                    raise ValueError("La fecha de inicio no puede ser posterior a la fecha de fin")
                 
-                rango = RangoFechas(anio, mes, dia_inicio, dia_fin)
+                rango = RangoFechas.entre(inicio, fin)
                 
                 # Muestra resumen
-                self.print_success(f"\nRango seleccionado: {dia_inicio}/{mes}/{anio} - {dia_fin}/{mes}/{anio}")
+                self.print_success(f"\nRango seleccionado: {inicio:%d/%m/%Y} - {fin:%d/%m/%Y}")
                 
                 confirm = self.input_colored("¿Es correcto? (s/n): ").lower()
                 if confirm == 's':
@@ -130,6 +200,19 @@ class ConsoleUI:
                 self.print_error(f"Error: {e}")
                 self.print_warning("Por favor, intenta nuevamente.\n")
     
+    def _input_date(self, prompt: str) -> date:
+        """
+        Solicita una fecha en formato dd-mm-aaaa.
+        
+        Raises:
+            ValueError: Si la fecha no es válida
+        """
+        value = self.input_colored(prompt).strip().replace("/", "-")
+        try:
+            return datetime.strptime(value, "%d-%m-%Y").date()
+        except ValueError:
+            raise ValueError(f"Fecha inválida: {value}")
+    
     def get_credentials(self) -> Tuple[str, str, str]:
         """
         Obtiene las credenciales del usuario.
@@ -159,6 +242,7 @@ class ConsoleUI:
         
         return location.strip(), username.strip(), password.strip()
     
+    @timed("ui.pause")
     def pause_or_timeout(self, seconds: int = 7) -> None:
         """
         Pausa con opción de continuar o timeout.
@@ -11,6 +11,7 @@ import customtkinter as ctk
 
 from src.config.settings import settings
 from src.core.logging import get_logger
+from src.core.profiling import PROFILE_FLAG, profile_requested
 
 
 logger = get_logger(__name__)
@@ -23,7 +24,7 @@ class SayenGUI(ctk.CTk):
         super().__init__()
         
         self.title("Sayen - Configuración y Lanzador")
-        self.geometry("650x550")
+        self.geometry("650x600")
         self.resizable(False, False)
         
         # Configurar icono
@@ -52,12 +53,12 @@ class SayenGUI(ctk.CTk):
             if icon_path.exists():
                 # En Windows, CustomTkinter hereda de CTk que hereda de Tk
                 self.iconbitmap(default=str(icon_path))
-                logger.debug(f"Icono cargado desde: {icon_path}")
+                logger.debug("Icono cargado desde: %s", icon_path)
             else:
-                logger.warning(f"Icono no encontrado en: {icon_path}")
+                logger.warning("Icono no encontrado en: %s", icon_path)
                 
         except Exception as e:
-            logger.error(f"Error al cargar el icono: {e}")
+            logger.error("Error al cargar el icono: %s", e)
     
     def _build_ui(self):
         """Construye la interfaz de usuario."""
@@ -238,6 +239,22 @@ class SayenGUI(ctk.CTk):
             hover_color="#e36209"
         )
         fill_data_btn.pack(side="left", padx=5)
+        
+        # Segunda fila de botones
+        btn_container_2 = ctk.CTkFrame(buttons_frame, fg_color="transparent")
+        btn_container_2.pack(fill="x", padx=10, pady=(0, 10))
+        
+        # Botón proceso combinado
+        pipeline_btn = ctk.CTkButton(
+            btn_container_2,
+            text="🔗 Obtener y Completar",
+            command=self._run_pipeline,
+            width=180,
+            height=35,
+            fg_color="#6f42c1",  # Morado
+            hover_color="#59359a"
+        )
+        pipeline_btn.pack(side="left", padx=5)
     
     def _build_log_area(self):
         """Construye el área de log."""
@@ -305,6 +322,10 @@ class SayenGUI(ctk.CTk):
         """Ejecuta el script de completar datos."""
         self._run_script("fill_data", "Completar Datos")
     
+    def _run_pipeline(self):
+        """Ejecuta el script combinado de obtener y completar."""
+        self._run_script("pipeline", "Obtener y Completar")
+    
     def _run_script(self, script_name: str, display_name: str):
         """
         Ejecuta un script en una nueva consola.
@@ -321,10 +342,15 @@ class SayenGUI(ctk.CTk):
                 cmd = [sys.executable, "-m", "src.scripts.get_patients"]
             elif script_name == "fill_data":
                 cmd = [sys.executable, "-m", "src.scripts.fill_data"]
+            elif script_name == "pipeline":
+                cmd = [sys.executable, "-m", "src.scripts.pipeline"]
             else:
                 self._log(f"❌ Script desconocido: {script_name}")
                 return
             
+            if profile_requested():
+                cmd.append(PROFILE_FLAG)
+            
             kwargs = {"cwd": str(settings.BASE_DIR)}
             
             # En Windows, abrir en nueva consola
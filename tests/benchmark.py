@@ -0,0 +1,273 @@
+"""
+Micro-benchmarks de las rutas críticas en Python puro y del I/O de Excel.
+
+Uso (desde la raíz del proyecto):
+    python -m tests.benchmark                    # ejecuta e imprime resultados
+    python -m tests.benchmark --save             # guarda los resultados como línea base
+    python -m tests.benchmark --compare          # compara contra la línea base
+    python -m tests.benchmark --sizes 1000,10000 --only excel
+
+En modo comparación marca como regresión toda medición que supere a la
+línea base en más del umbral (--threshold, 20% por defecto) y termina con
+código de salida 1 si encuentra alguna.
+"""
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.config.settings import settings
+from src.domain.models import Paciente, TipoAtencion, Sexo
+from src.services.patient_service import PatientService
+from src.services.excel_service import ExcelService
+from src.core.utils import normalize_text, normalize_series, parse_age_to_months, format_rut, clean_name, is_empty, empty_mask, parse_rut_series
+
+
+BASELINE_PATH = settings.DATA_DIR / "benchmarks" / "baseline.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+NOMBRES = ["María José", "Juan Pablo", "Sofía", "Benjamín", "Agustín", "Martina", "Isidora", "Tomás"]
+APELLIDOS = ["González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Núñez"]
+SECTORES = ["SECTOR ROJO", "SECTOR AZUL", "SECTOR VERDE", "SECTOR AMARILLO"]
+EDADES = ["3 años 2 meses", "5 meses 12 días", "18 días", "1 año", "11 meses", "4 años 11 meses"]
+ANAMNESIS = [
+    "Atención presencial, madre refiere rezago en lenguaje",
+    "Paciente no se presenta a control",
+    "Llamado telefónico efectivo. Se indica control en riesgo",
+    "VIDEOLLAMADA INEFECTIVA, sin respuesta",
+    "Visita domicilaria integral efectiva, NANEAS",
+    "Control sin observaciones relevantes para el desarrollo psicomotor del niño",
+]
+
+
+def _sample_texts(rng: random.Random, n: int = 1_000) -> Dict[str, List]:
+    """Entradas representativas para los micro-benchmarks."""
+    return {
+        "names": [
+            f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}  {rng.choice(NOMBRES)} (Sofi)"
+            for _ in range(n)
+        ],
+        "ruts": [f"{rng.randint(10_000_000, 25_000_000)}{rng.choice('0123456789K')}" for _ in range(n)],
+        "ages": [rng.choice(EDADES) for _ in range(n)],
+        "anamnesis": [rng.choice(ANAMNESIS) for _ in range(n)],
+        "values": [rng.choice(["", " nan ", None, float("nan"), "REZAGO", 12, "None"]) for _ in range(n)],
+    }
+
+
+def _patients(rng: random.Random, rows: int) -> List[Paciente]:
+    """Pacientes sintéticos ordenados por fecha."""
+    inicio = date(2025, 3, 3)
+    patients = []
+    for i in range(rows):
+        patients.append(Paciente(
+            run=f"{rng.randint(10_000_000, 25_000_000)}-{rng.choice('0123456789K')}",
+            nombre=f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)} {rng.choice(NOMBRES)}",
+            fecha=inicio + timedelta(days=i * 20 // max(rows, 1)),
+            sector=rng.choice(SECTORES),
+            edad_rango=PatientService.extract_age_range(rng.choice(EDADES)),
+            tipo_atencion=rng.choice([None, TipoAtencion.ASISTE, TipoAtencion.NSP]),
+        ))
+    return patients
+
+
+def _measure(func: Callable[[], None], repeat: int, number: int = 1) -> float:
+    """Mejor tiempo por llamada (segundos) entre `repeat` repeticiones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_micro(repeat: int = 5) -> Dict[str, float]:
+    """
+    Ejecuta los micro-benchmarks de funciones puras.
+    
+    Returns:
+        Diccionario nombre → segundos por operación
+    """
+    rng = random.Random(42)
+    data = _sample_texts(rng)
+    n = len(data["names"])
+    patients = _patients(rng, n)
+    anamnesis = pd.Series(data["anamnesis"])
+    ages = pd.Series(data["ages"])
+    values = pd.Series(data["values"], dtype="object")
+    ruts = pd.Series(data["ruts"])
+    kwargs = [dict(
+        run=p.run, nombre=p.nombre, fecha=p.fecha, sector=p.sector,
+        edad_rango=p.edad_rango, sexo=Sexo.FEMENINO, tipo_atencion=p.tipo_atencion
+    ) for p in patients]
+    
+    cases = {
+        "normalize_text": lambda: [normalize_text(t) for t in data["anamnesis"]],
+        "normalize_series": lambda: normalize_series(anamnesis),
+        "parse_age_to_months": lambda: [parse_age_to_months(t) for t in data["ages"]],
+        "format_rut": lambda: [format_rut(t) for t in data["ruts"]],
+        "parse_rut_series": lambda: parse_rut_series(ruts),
+        "clean_name": lambda: [clean_name(t) for t in data["names"]],
+        "is_empty": lambda: [is_empty(v) for v in data["values"]],
+        "empty_mask": lambda: empty_mask(values),
+        "detect_attention_type": lambda: [PatientService.detect_attention_type(t) for t in data["anamnesis"]],
+        "analyze_anamnesis": lambda: [PatientService.analyze_anamnesis(t) for t in data["anamnesis"]],
+        "analyze_anamnesis_many": lambda: PatientService.analyze_anamnesis_many(data["anamnesis"]),
+        "extract_age_range": lambda: [PatientService.extract_age_range(t) for t in data["ages"]],
+        "extract_age_ranges": lambda: PatientService.extract_age_ranges(ages),
+        "Paciente": lambda: [Paciente(**kw) for kw in kwargs],
+        "Paciente.to_dict": lambda: [p.to_dict() for p in patients],
+        "patients_frame": lambda: ExcelService.patients_frame(patients),
+    }
+    
+    return {name: _measure(func, repeat) / n for name, func in cases.items()}
+
+
+def run_excel(sizes: List[int], repeat: int = 3) -> Dict[str, float]:
+    """
+    Ejecuta los benchmarks de Excel para cada tamaño.
+    
+    Returns:
+        Diccionario "operación[filas]" → segundos por llamada
+    """
+    results = {}
+    rng = random.Random(7)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            patients = _patients(rng, rows)
+            path = Path(tmp) / f"bench_{rows}.xlsx"
+            # Los archivos grandes se miden una sola vez
+            reps = repeat if rows <= 10_000 else 1
+            
+            results[f"save_patients[{rows}]"] = _measure(
+                lambda: ExcelService.save_patients(patients, str(path)), reps
+            )
+            results[f"load_patients[{rows}]"] = _measure(
+                lambda: ExcelService.load_patients(str(path)), reps
+            )
+            loaded = ExcelService.load_patients(str(path))
+            results[f"apply_schema[{rows}]"] = _measure(
+                lambda: ExcelService.apply_schema(loaded.copy()), reps
+            )
+            
+            updates = pd.DataFrame({
+                "SEXO": [rng.choice(["MASCULINO", "FEMENINO"]) for _ in range(rows)],
+                "TIPO DE ATENCIÓN": [rng.choice(["", "ASISTE", "NSP"]) for _ in range(rows)],
+                "DÉFICIT": [rng.choice(["", "", "REZAGO"]) for _ in range(rows)],
+            })
+            mapping = {"SEXO": [], "TIPO DE ATENCIÓN": ["TIPO DE ATENCION"], "DÉFICIT": ["DEFICIT"]}
+            
+            # Cada repetición parte de una copia del archivo sin actualizar
+            template = Path(tmp) / f"template_{rows}.xlsx"
+            shutil.copyfile(path, template)
+            
+            def update() -> None:
+                shutil.copyfile(template, path)
+                ExcelService.update_excel_inplace(str(path), updates, mapping)
+            
+            results[f"update_excel_inplace[{rows}]"] = _measure(update, reps)
+    
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Compara resultados contra la línea base.
+    
+    Args:
+        results: Resultados actuales
+        baseline: Resultados de referencia
+        threshold: Aumento relativo tolerado (0.2 = 20%)
+    
+    Returns:
+        Nombres de las mediciones que empeoraron más allá del umbral
+    """
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base and value > base * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    """Formatea una duración con la unidad adecuada."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.2f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds:9.2f} s "
+
+
+def print_results(results: Dict[str, float], baseline: Optional[Dict[str, float]], regressions: List[str]) -> None:
+    """Imprime la tabla de resultados (con la variación si hay línea base)."""
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        line = f"{name:<{width}}  {_format_time(value)}"
+        if baseline and baseline.get(name):
+            change = value / baseline[name] - 1
+            line += f"  {change:+7.1%}"
+            if name in regressions:
+                line += "  REGRESIÓN"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de los benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks de Sayen")
+    parser.add_argument("--save", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--compare", action="store_true", help="compara contra la línea base")
+    parser.add_argument("--threshold", type=float, default=0.20, help="aumento tolerado (0.2 = 20%%)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="filas para Excel")
+    parser.add_argument("--only", choices=["micro", "excel"], help="ejecuta solo un grupo")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="archivo de línea base")
+    args = parser.parse_args(argv)
+    
+    results: Dict[str, float] = {}
+    if args.only in (None, "micro"):
+        results.update(run_micro())
+    if args.only in (None, "excel"):
+        results.update(run_excel([int(s) for s in args.sizes.split(",") if s.strip()]))
+    
+    baseline = None
+    regressions: List[str] = []
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"No existe línea base en {args.baseline}; ejecute con --save primero")
+            return 2
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    
+    print_results(results, baseline, regressions)
+    
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+    
+    if regressions:
+        print(f"\n{len(regressions)} regresiones sobre {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
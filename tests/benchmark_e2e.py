@@ -0,0 +1,224 @@
+"""
+Benchmark de extremo a extremo contra el simulador local de Rayen.
+
+Levanta el simulador con latencia fija y ejecuta, con Chrome sin ventana,
+la extracción de get_patients sobre un mes y el completado de fill_data
+sobre N filas. Informa pacientes por minuto, tiempos por etapa y memoria
+del navegador (CDP Performance.getMetrics).
+
+Uso (desde la raíz del proyecto):
+    python -m tests.benchmark_e2e                          # ambos escenarios
+    python -m tests.benchmark_e2e --only fill_data --rows 50 --workers 4
+    python -m tests.benchmark_e2e --save --engine selenium-dom --wait sleep
+    python -m tests.benchmark_e2e --history                # compara las ejecuciones guardadas
+
+Cada ejecución guardada queda como una línea de data/benchmarks/e2e.jsonl
+etiquetada con motor, workers y estrategia de espera, para comparar
+configuraciones entre sí.
+"""
+import sys
+import json
+import time
+import argparse
+import calendar
+import platform
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.settings import settings
+from src.domain.models import RangoFechas
+from src.simulator.server import RayenSimulator, SimulatorConfig
+from src.services.synthetic_service import SyntheticDataGenerator
+from src.services.scraper_service import browser_memory
+from src.scripts.get_patients import GetPatientsScript
+from src.scripts.fill_data import FillDataScript
+from src.core.timing import stage_timer
+from src.ui.console import ConsoleUI
+
+
+RESULTS_PATH = settings.DATA_DIR / "benchmarks" / "e2e.jsonl"
+CREDENTIALS = ("SIMULADOR", "benchmark", "benchmark")
+
+
+def run_get_patients(month: date) -> int:
+    """
+    Extrae con GetPatientsScript todos los días hábiles de un mes.
+    
+    Returns:
+        Cantidad de pacientes extraídos
+    """
+    ultimo = calendar.monthrange(month.year, month.month)[1]
+    rango = RangoFechas(anio=month.year, mes=month.month, dia_inicio=1, dia_fin=ultimo)
+    return len(GetPatientsScript()._scrape_patients(rango, *CREDENTIALS))
+
+
+def run_fill_data(simulator: RayenSimulator, rows: int) -> int:
+    """
+    Completa con FillDataScript un Excel de entrada con los pacientes del simulador.
+    
+    Returns:
+        Cantidad de filas procesadas
+    """
+    config = simulator.config
+    script = FillDataScript()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fill_input.xlsx"
+        SyntheticDataGenerator(config.seed).write_fill_input(
+            path, rows, inicio=config.inicio, por_dia=config.por_dia
+        )
+        df = script._prepare_dataframe(script.excel_service.load_patients(str(path)))
+    
+    script._process_patients(df, *CREDENTIALS)
+    return len(df)
+
+
+def measure(name: str, scenario, *args) -> Dict:
+    """
+    Ejecuta un escenario y reúne sus mediciones.
+    
+    Args:
+        name: Nombre del escenario
+        scenario: Función del escenario
+        args: Argumentos del escenario
+    
+    Returns:
+        Resultado con pacientes, duración, etapas y memoria del navegador
+    """
+    stage_timer.reset()
+    browser_memory.reset()
+    
+    start = time.perf_counter()
+    patients = scenario(*args)
+    seconds = time.perf_counter() - start
+    
+    return {
+        "scenario": name,
+        "patients": patients,
+        "seconds": round(seconds, 2),
+        "patients_per_min": round(patients / seconds * 60, 2) if seconds else 0.0,
+        "stages": stage_timer.summary(),
+        "browser": browser_memory.peak(),
+    }
+
+
+def print_result(ui: ConsoleUI, result: Dict) -> None:
+    """Imprime el resultado de un escenario."""
+    ui.print_header(f"{result['scenario']}: {result['patients_per_min']:.1f} pacientes/min")
+    ui.print_info(f"{result['patients']} pacientes en {result['seconds']:.1f}s")
+    
+    if result["stages"]:
+        ui.print_timings(result["stages"])
+    
+    browser = result["browser"]
+    if browser:
+        ui.print_info(
+            f"Navegador (máximo por sesión): heap JS {browser['JSHeapUsedSize'] / 2**20:.1f} MB usados "
+            f"de {browser['JSHeapTotalSize'] / 2**20:.1f} MB, {browser['Nodes']:.0f} nodos, "
+            f"{browser['JSEventListeners']:.0f} listeners"
+        )
+
+
+def print_history(path: Path) -> None:
+    """Imprime las ejecuciones guardadas, agrupadas por escenario."""
+    with open(path, "r", encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    
+    for scenario in sorted({run["scenario"] for run in runs}):
+        print(f"\n{scenario}")
+        print(f"{'fecha':<19}  {'motor':<14}  {'workers':>7}  {'espera':<10}  {'latencia':>8}  {'pac/min':>8}  {'heap MB':>7}")
+        for run in runs:
+            if run["scenario"] != scenario:
+                continue
+            heap = run["browser"].get("JSHeapUsedSize", 0) / 2**20
+            print(
+                f"{run['created']:<19}  {run['engine']:<14}  {run['workers']:>7}  {run['wait']:<10}  "
+                f"{run['latency_ms']:>6.0f}ms  {run['patients_per_min']:>8.1f}  {heap:>7.1f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del benchmark de extremo a extremo."""
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo contra el simulador")
+    parser.add_argument("--only", choices=["get_patients", "fill_data"], help="ejecuta solo un escenario")
+    parser.add_argument("--month", default="03-2025", help="mes para get_patients (mm-aaaa)")
+    parser.add_argument("--rows", type=int, default=100, help="filas para fill_data")
+    parser.add_argument("--per-day", type=int, default=25, help="pacientes promedio por día")
+    parser.add_argument("--seed", type=int, default=0, help="semilla de los datos del simulador")
+    parser.add_argument("--latency", type=float, default=150.0, help="latencia fija del simulador (ms)")
+    parser.add_argument("--workers", type=int, default=1, help="sesiones de navegador en paralelo")
+    parser.add_argument("--pause", type=int, default=0, help="pausa entre pacientes de fill_data (s)")
+    parser.add_argument("--engine", default="selenium-dom", help="etiqueta del motor de extracción")
+    parser.add_argument("--wait", default="sleep", help="etiqueta de la estrategia de espera")
+    parser.add_argument("--save", action="store_true", help="agrega el resultado al historial")
+    parser.add_argument("--history", action="store_true", help="muestra el historial y termina")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH, help="archivo de historial")
+    args = parser.parse_args(argv)
+    
+    if args.history:
+        if not args.results.exists():
+            print(f"No hay resultados guardados en {args.results}")
+            return 2
+        print_history(args.results)
+        return 0
+    
+    month = datetime.strptime(args.month, "%m-%Y").date()
+    settings.HEADLESS = True
+    settings.WORKERS = args.workers
+    settings.PATIENT_PAUSE = args.pause
+    settings.BROWSER_METRICS = True
+    settings.DAY_CACHE = False
+    # Los pacientes del simulador no deben quedar en el registro ni servir la siguiente medición
+    settings.PATIENT_REGISTRY = False
+    settings.ANAMNESIS_CACHE = False
+    
+    # Suficientes pacientes para cubrir el mes y las filas de fill_data
+    config = SimulatorConfig(
+        port=0,
+        seed=args.seed,
+        rows=max(args.rows, args.per_day * 3 // 2 * 23),
+        inicio=month,
+        por_dia=args.per_day,
+        latency_ms=args.latency,
+        jitter_ms=0.0,
+    )
+    
+    ui = ConsoleUI()
+    results = []
+    # Caché propia de la medición: los días vacíos aprendidos del simulador no
+    # deben omitirse en la siguiente ejecución ni en las reales
+    with tempfile.TemporaryDirectory() as cache_dir, RayenSimulator(config) as simulator:
+        settings.CACHE_DIR = Path(cache_dir)
+        settings.BASE_URL = simulator.url
+        if args.only in (None, "get_patients"):
+            results.append(measure("get_patients", run_get_patients, month))
+        if args.only in (None, "fill_data"):
+            results.append(measure("fill_data", run_fill_data, simulator, args.rows))
+    
+    for result in results:
+        print_result(ui, result)
+    
+    if args.save:
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+        created = datetime.now().isoformat(timespec="seconds")
+        with open(args.results, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({
+                    "created": created,
+                    "engine": args.engine,
+                    "workers": args.workers,
+                    "wait": args.wait,
+                    "pause": args.pause,
+                    "latency_ms": args.latency,
+                    "python": platform.python_version(),
+                    **result,
+                }, ensure_ascii=False) + "\n")
+        print(f"\nResultados agregados a {args.results}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())